@@ -5,10 +5,15 @@
     "name": "Account Asset Batch Compute",
     "summary": """
         Add the possibility to compute assets in batch""",
-    "version": "16.0.1.0.0",
+    "version": "16.0.1.1.0",
     "license": "AGPL-3",
     "author": "ACSONE SA/NV,ForgeFlow,Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/account-financial-tools",
     "depends": ["account_asset_management", "queue_job"],
-    "data": ["wizards/account_asset_compute_views.xml", "data/queue_data.xml"],
+    "data": [
+        "security/ir.model.access.csv",
+        "views/account_asset_compute_batch_views.xml",
+        "wizards/account_asset_compute_views.xml",
+        "data/queue_data.xml",
+    ],
 }
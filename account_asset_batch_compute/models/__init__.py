@@ -1 +1,3 @@
 from . import account_asset
+from . import account_asset_compute_batch
+from . import account_asset_compute_batch_chunk
@@ -12,19 +12,17 @@ class AccountAsset(models.Model):
         if self.env.context.get(
             "asset_batch_processing", False
         ) and not self.env.context.get("test_queue_job_no_delay", False):
-            results = []
-            log_error = ""
-            for record in self:
-                description = _(
-                    "Creating move for asset with id {rec_id} to {date_end}"
-                ).format(
-                    rec_id=record.id,
-                    date_end=date_end,
-                )
-                record.with_delay(description=description)._compute_entries(
-                    date_end, check_triggers=check_triggers
-                )
-            return results, log_error
+            batch_vals = {
+                "name": _("Compute Assets to {}").format(date_end),
+                "date_end": date_end,
+                "check_triggers": check_triggers,
+                "bulk_posting": self.env.context.get("asset_bulk_posting", False),
+            }
+            if self.env.context.get("asset_batch_chunk_size"):
+                batch_vals["chunk_size"] = self.env.context["asset_batch_chunk_size"]
+            batch = self.env["account.asset.compute.batch"].create(batch_vals)
+            batch._create_chunks(self)._enqueue()
+            return [], ""
         else:
             return super(AccountAsset, self)._compute_entries(
                 date_end, check_triggers=check_triggers
@@ -0,0 +1,160 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from collections import defaultdict
+
+from odoo import _, api, fields, models
+
+from odoo.addons.queue_job.job import identity_exact
+
+
+class AccountAssetComputeBatch(models.Model):
+    """Run of the asset computation split in chunks of assets.
+
+    The progress of the run is computed from its chunks: the chunk jobs only
+    write on their own chunk, so that they never compete for the same row.
+    """
+
+    _name = "account.asset.compute.batch"
+    _description = "Compute Assets Run"
+    _order = "id desc"
+
+    name = fields.Char(required=True, readonly=True)
+    date_end = fields.Date(string="Date", required=True, readonly=True)
+    check_triggers = fields.Boolean(readonly=True)
+    bulk_posting = fields.Boolean(readonly=True)
+    board_processes = fields.Integer(string="Parallel Processes", readonly=True)
+    chunk_size = fields.Integer(
+        string="Assets per Job",
+        required=True,
+        readonly=True,
+        default=100,
+    )
+    chunk_ids = fields.One2many(
+        comodel_name="account.asset.compute.batch.chunk",
+        inverse_name="batch_id",
+        string="Chunks",
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=[("draft", "Draft"), ("running", "Running"), ("done", "Done")],
+        compute="_compute_progress",
+    )
+    chunk_count = fields.Integer(compute="_compute_progress")
+    chunk_done_count = fields.Integer(compute="_compute_progress")
+    posted_count = fields.Integer(
+        string="Posted Lines",
+        compute="_compute_progress",
+    )
+    failed_count = fields.Integer(
+        string="Failed Lines",
+        compute="_compute_progress",
+    )
+    skipped_count = fields.Integer(
+        string="Skipped Lines",
+        compute="_compute_progress",
+        help="Lines of assets that were not running anymore when their "
+        "chunk was processed.",
+    )
+    error_log = fields.Text(compute="_compute_progress")
+
+    _sql_constraints = [
+        (
+            "chunk_size_positive",
+            "CHECK(chunk_size > 0)",
+            "The number of assets per job must be positive.",
+        )
+    ]
+
+    @api.depends(
+        "chunk_ids.state",
+        "chunk_ids.posted_count",
+        "chunk_ids.failed_count",
+        "chunk_ids.skipped_count",
+        "chunk_ids.error_log",
+    )
+    def _compute_progress(self):
+        for batch in self:
+            chunks = batch.chunk_ids
+            done_chunks = chunks.filtered(lambda c: c.state == "done")
+            if not chunks:
+                batch.state = "draft"
+            elif done_chunks == chunks:
+                batch.state = "done"
+            else:
+                batch.state = "running"
+            batch.chunk_count = len(chunks)
+            batch.chunk_done_count = len(done_chunks)
+            batch.posted_count = sum(chunks.mapped("posted_count"))
+            batch.failed_count = sum(chunks.mapped("failed_count"))
+            batch.skipped_count = sum(chunks.mapped("skipped_count"))
+            batch.error_log = "".join(chunks.filtered("error_log").mapped("error_log"))
+
+    def action_resume(self):
+        """Enqueue again the chunks that are not done."""
+        self._enqueue()
+
+    def action_view_moves(self):
+        self.ensure_one()
+        return {
+            "name": _("Created Asset Moves"),
+            "view_mode": "tree,form",
+            "res_model": "account.move",
+            "view_id": False,
+            "domain": [("id", "in", self.chunk_ids.move_ids.ids)],
+            "type": "ir.actions.act_window",
+        }
+
+    def _enqueue(self):
+        for batch in self:
+            description = _("Creating jobs to create moves for assets to {}").format(
+                batch.date_end
+            )
+            batch.with_delay(
+                description=description, identity_key=identity_exact
+            )._run()
+
+    def _run(self):
+        """Split the running assets in chunks and enqueue the pending ones.
+
+        The chunks are created once: running this job again, e.g. to resume
+        the run after a crash, only enqueues the chunks that are not done.
+        """
+        self.ensure_one()
+        if not self.chunk_ids:
+            assets = self.env["account.asset"].search([("state", "=", "open")])
+            self._create_chunks(assets)
+        self.chunk_ids.filtered(lambda c: c.state == "pending")._enqueue()
+
+    def _create_chunks(self, assets):
+        """Create the chunks of the assets with lines to post.
+
+        Each chunk holds at most ``chunk_size`` assets of the same company
+        and journal.
+        """
+        self.ensure_one()
+        if self.check_triggers:
+            self.env["account.asset.recompute.trigger"]._recompute_depreciation_boards(
+                assets.with_context(asset_board_processes=self.board_processes)
+            )
+        line_groups = self.env["account.asset.line"].read_group(
+            assets._get_due_depreciation_lines_domain(self.date_end),
+            ["asset_id"],
+            ["asset_id"],
+        )
+        asset_ids = {group["asset_id"][0] for group in line_groups}
+        assets_by_key = defaultdict(list)
+        for asset in assets.filtered(lambda a: a.id in asset_ids):
+            key = (asset.company_id.id, asset.profile_id.journal_id.id)
+            assets_by_key[key].append(asset.id)
+        vals_list = []
+        for (company_id, journal_id), ids in assets_by_key.items():
+            for i in range(0, len(ids), self.chunk_size):
+                vals_list.append(
+                    {
+                        "batch_id": self.id,
+                        "company_id": company_id,
+                        "journal_id": journal_id,
+                        "asset_ids": [(6, 0, ids[i : i + self.chunk_size])],
+                    }
+                )
+        return self.env["account.asset.compute.batch.chunk"].create(vals_list)
@@ -0,0 +1,117 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from psycopg2.errors import LockNotAvailable
+
+from odoo import _, fields, models
+
+from odoo.addons.queue_job.exception import RetryableJobError
+from odoo.addons.queue_job.job import identity_exact
+
+
+class AccountAssetComputeBatchChunk(models.Model):
+    _name = "account.asset.compute.batch.chunk"
+    _description = "Compute Assets Run Chunk"
+    _order = "id"
+
+    batch_id = fields.Many2one(
+        comodel_name="account.asset.compute.batch",
+        string="Run",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+        index=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+    )
+    journal_id = fields.Many2one(
+        comodel_name="account.journal",
+        string="Journal",
+        readonly=True,
+    )
+    asset_ids = fields.Many2many(
+        comodel_name="account.asset",
+        relation="account_asset_compute_batch_chunk_asset_rel",
+        column1="chunk_id",
+        column2="asset_id",
+        string="Assets",
+        readonly=True,
+    )
+    state = fields.Selection(
+        selection=[("pending", "Pending"), ("done", "Done")],
+        default="pending",
+        required=True,
+        readonly=True,
+    )
+    date_done = fields.Datetime(readonly=True)
+    move_ids = fields.Many2many(
+        comodel_name="account.move",
+        relation="account_asset_compute_batch_chunk_move_rel",
+        column1="chunk_id",
+        column2="move_id",
+        string="Journal Entries",
+        readonly=True,
+    )
+    posted_count = fields.Integer(string="Posted Lines", readonly=True)
+    failed_count = fields.Integer(string="Failed Lines", readonly=True)
+    skipped_count = fields.Integer(string="Skipped Lines", readonly=True)
+    error_log = fields.Text(readonly=True)
+
+    def _enqueue(self):
+        for chunk in self:
+            description = _(
+                "Creating moves for {count} assets of {journal} to {date_end}"
+            ).format(
+                count=len(chunk.asset_ids),
+                journal=chunk.journal_id.display_name,
+                date_end=chunk.batch_id.date_end,
+            )
+            chunk.with_delay(
+                description=description, identity_key=identity_exact
+            )._run()
+
+    def _run(self):
+        """Post the lines of the assets of the chunk due at the run date.
+
+        The chunk is locked while it is processed and its results are saved
+        in the same transaction as the entries, so that a chunk is never
+        processed twice, even when it is enqueued again by a resume.
+        """
+        self.ensure_one()
+        try:
+            self.env.cr.execute(
+                "SELECT id FROM account_asset_compute_batch_chunk "
+                "WHERE id = %s FOR UPDATE NOWAIT",
+                (self.id,),
+            )
+        except LockNotAvailable as err:
+            raise RetryableJobError(
+                _("The chunk is being processed by another job."), seconds=60
+            ) from err
+        self.invalidate_recordset(["state"])
+        if self.state == "done":
+            return
+        batch = self.batch_id
+        due_lines = self.env["account.asset.line"].search(
+            self.asset_ids._get_due_depreciation_lines_domain(batch.date_end)
+        )
+        assets = self.asset_ids.filtered(lambda a: a.state == "open")
+        skipped_lines = due_lines.filtered(lambda l: l.asset_id not in assets)
+        move_ids, error_log = assets.with_context(
+            asset_batch_processing=False, asset_bulk_posting=batch.bulk_posting
+        )._compute_entries(batch.date_end)
+        posted_lines = due_lines.filtered("move_check")
+        self.write(
+            {
+                "state": "done",
+                "date_done": fields.Datetime.now(),
+                "move_ids": [(6, 0, move_ids)],
+                "posted_count": len(posted_lines),
+                "failed_count": len(due_lines - posted_lines - skipped_lines),
+                "skipped_count": len(skipped_lines),
+                "error_log": error_log,
+            }
+        )
@@ -93,7 +93,9 @@ class TestAccountAssetBatchCompute(TransactionCase):
             lambda r: r.type == "depreciate" and r.move_id
         )
         self.assertTrue(len(depreciation_line) == 0)
-        wiz.with_context(test_queue_job_no_delay=False).asset_compute()
+        action = wiz.with_context(test_queue_job_no_delay=False).asset_compute()
+        batch = self.env["account.asset.compute.batch"].browse(action["res_id"])
+        self.assertEqual(batch.state, "draft")
         depreciation_line = self.asset01.depreciation_line_ids.filtered(
             lambda r: r.type == "depreciate" and r.move_id
         )
@@ -106,7 +108,7 @@ class TestAccountAssetBatchCompute(TransactionCase):
             jobs.job_function_id,
             self.env.ref(
                 "account_asset_batch_compute."
-                "job_function_account_asset_compute_asset_compute"
+                "job_function_account_asset_compute_batch_run"
             ),
         )
         self.assertTrue(len(jobs) == 1)
@@ -117,18 +119,20 @@ class TestAccountAssetBatchCompute(TransactionCase):
             lambda r: r.type == "depreciate" and r.move_id
         )
         self.assertTrue(len(depreciation_line) == 0)
-        job_name = "Creating move for asset with id {} to {}".format(
-            self.asset01.id,
-            self.nextmonth,
-        )
+        self.assertEqual(batch.state, "running")
+        self.assertEqual(batch.chunk_ids.asset_ids, self.asset01)
+        self.assertEqual(batch.chunk_ids.journal_id, self.journal)
         jobs = self.env["queue.job"].search(
-            [("name", "=", job_name)], order="date_created desc", limit=1
+            [("model_name", "=", "account.asset.compute.batch.chunk")],
+            order="date_created desc",
+            limit=1,
         )
         self.assertTrue(len(jobs) == 1)
         self.assertEqual(
             jobs.job_function_id,
             self.env.ref(
-                "account_asset_batch_compute.job_function_account_asset_compute_entries"
+                "account_asset_batch_compute."
+                "job_function_account_asset_compute_batch_chunk_run"
             ),
         )
         job = Job.load(self.env, jobs.uuid)
@@ -137,3 +141,72 @@ class TestAccountAssetBatchCompute(TransactionCase):
             lambda r: r.type == "depreciate" and r.move_id
         )
         self.assertEqual(len(depreciation_line), 1)
+        self.assertEqual(batch.state, "done")
+        self.assertEqual(batch.posted_count, 1)
+        self.assertEqual(batch.failed_count, 0)
+        self.assertEqual(batch.skipped_count, 0)
+        self.assertEqual(batch.chunk_ids.move_ids, depreciation_line.move_id)
+
+    def test_batch_chunks_resume(self):
+        assets = self.asset01
+        for _i in range(4):
+            assets |= self.asset01.copy({"date_start": self.asset01.date_start})
+        assets.validate()
+        other_profile = self.profile.copy(
+            {"journal_id": self.journal.copy({"code": "TJ2"}).id}
+        )
+        assets[-1].profile_id = other_profile
+        assets[-1].compute_depreciation_board()
+        batch = self.env["account.asset.compute.batch"].create(
+            {
+                "name": "Test run",
+                "date_end": self.nextmonth,
+                "chunk_size": 2,
+            }
+        )
+        chunks = batch._create_chunks(assets)
+        # 4 assets of the first journal in 2 chunks, 1 in its own chunk
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(sorted(len(chunk.asset_ids) for chunk in chunks), [1, 2, 2])
+        self.assertEqual(
+            chunks.filtered(lambda c: c.journal_id != self.journal).asset_ids,
+            assets[-1],
+        )
+        # A closed asset is skipped
+        skipped_chunk = chunks.filtered(lambda c: assets[0] in c.asset_ids)
+        assets[0].state = "close"
+        skipped_chunk.with_context(test_queue_job_no_delay=True)._run()
+        self.assertEqual(skipped_chunk.state, "done")
+        self.assertEqual(skipped_chunk.skipped_count, 1)
+        self.assertEqual(skipped_chunk.posted_count, 1)
+        self.assertEqual(batch.state, "running")
+        # Resuming the run only processes the remaining chunks
+        batch.with_context(test_queue_job_no_delay=True).action_resume()
+        self.assertEqual(batch.state, "done")
+        self.assertEqual(batch.posted_count, 4)
+        self.assertEqual(batch.skipped_count, 1)
+        posted_lines = assets.depreciation_line_ids.filtered("move_id")
+        self.assertEqual(len(posted_lines), 4)
+        # Processing a chunk again never posts its lines twice
+        chunks.write({"state": "pending"})
+        batch.with_context(test_queue_job_no_delay=True).action_resume()
+        self.assertEqual(batch.posted_count, 0)
+        self.assertEqual(assets.depreciation_line_ids.filtered("move_id"), posted_lines)
+
+    def test_batch_processing_dry_run(self):
+        wiz = self.wiz_obj.create(
+            {"batch_processing": True, "dry_run": True, "date_end": self.nextmonth}
+        )
+        self.asset01.validate()
+        batches = self.env["account.asset.compute.batch"].search([])
+        action = wiz.asset_compute()
+        # The simulation runs in the wizard, without any job
+        self.assertEqual(action["res_model"], "account.asset.compute")
+        self.assertEqual(self.env["account.asset.compute.batch"].search([]), batches)
+        self.assertTrue(wiz.log_id.dry_run)
+        self.assertEqual(wiz.log_id.move_count, 1)
+        self.assertFalse(
+            self.asset01.depreciation_line_ids.filtered(
+                lambda r: r.type == "depreciate" and r.move_id
+            )
+        )
@@ -9,20 +9,33 @@ class AccountAssetCompute(models.TransientModel):
     _inherit = "account.asset.compute"
 
     batch_processing = fields.Boolean()
+    chunk_size = fields.Integer(
+        string="Assets per Job",
+        default=100,
+        help="Number of assets processed by each job. The assets of a job "
+        "share the same company and journal.",
+    )
 
     def asset_compute(self):
         self.ensure_one()
-        if not self.batch_processing:
+        if not self.batch_processing or self.dry_run:
+            # a simulation is rolled back, it cannot run in jobs
             return super().asset_compute()
-        if not self.env.context.get("job_uuid") and not self.env.context.get(
-            "test_queue_job_no_delay"
-        ):
-            description = _("Creating jobs to create moves for assets to {}").format(
-                self.date_end,
-            )
-            job = self.with_delay(description=description).asset_compute()
-            return "Job created with uuid {}".format(job.uuid)
-        else:
-            return super(
-                AccountAssetCompute, self.with_context(asset_batch_processing=True)
-            ).asset_compute()
+        batch = self.env["account.asset.compute.batch"].create(
+            {
+                "name": _("Compute Assets to {}").format(self.date_end),
+                "date_end": self.date_end,
+                "check_triggers": True,
+                "bulk_posting": self.bulk_posting,
+                "board_processes": self.board_processes,
+                "chunk_size": self.chunk_size,
+            }
+        )
+        batch._enqueue()
+        return {
+            "name": _("Compute Assets Run"),
+            "res_id": batch.id,
+            "view_mode": "form",
+            "res_model": "account.asset.compute.batch",
+            "type": "ir.actions.act_window",
+        }
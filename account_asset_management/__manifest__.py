@@ -5,7 +5,7 @@
 
 {
     "name": "Assets Management",
-    "version": "16.0.1.0.0",
+    "version": "16.0.1.1.0",
     "license": "AGPL-3",
     "depends": ["account", "report_xlsx_helper"],
     "excludes": ["account_asset"],
@@ -28,6 +28,8 @@
         "views/menuitem.xml",
         "data/cron.xml",
         "wizard/wiz_account_asset_report.xml",
+        "views/account_asset_snapshot.xml",
+        "views/account_asset_compute_log.xml",
         "wizard/wiz_asset_move_reverse.xml",
     ],
 }
@@ -4,4 +4,6 @@ from . import account_asset_group
 from . import account_asset_profile
 from . import account_asset_line
 from . import account_asset_recompute_trigger
+from . import account_asset_snapshot
+from . import account_asset_compute_log
 from . import account_move
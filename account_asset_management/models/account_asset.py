@@ -2,10 +2,15 @@
 # Copyright 2019 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-import calendar
+import dataclasses
+import functools
 import logging
-from datetime import date
-from functools import reduce
+import multiprocessing
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from sys import exc_info
 from traceback import format_exception
 
@@ -15,8 +20,62 @@ from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 from odoo.osv import expression
 
+from ..tools.compute_metrics import compute_phase
+from ..tools.depreciation_kernel import (
+    DepreciationKernel,
+    DepreciationSpec,
+    FiscalYear,
+    FiscalYearCalendar,
+    IllegalMethodError,
+    ScheduleEntry,
+    compute_serialized_schedules,
+)
+
 _logger = logging.getLogger(__name__)
 
+# Number of depreciation lines posted at once in bulk posting mode
+POSTING_CHUNK_SIZE = 500
+# Number of depreciation tables computed by each task of a process pool
+BOARD_PROCESS_CHUNK_SIZE = 500
+# Fields of the assets on which the asset snapshots depend
+SNAPSHOT_ASSET_FIELDS = {
+    "state",
+    "date_remove",
+    "method",
+    "purchase_value",
+    "salvage_value",
+}
+# Methods of the assets computing the depreciation table before the kernel:
+# the kernel delegates to those that are overridden by other modules
+KERNEL_LEGACY_METHODS = (
+    "_compute_depreciation_schedule",
+    "_compute_depreciation_table",
+    "_group_lines",
+    "_get_fy_info",
+    "_get_fy_duration",
+    "_get_fy_duration_factor",
+    "_get_depreciation_start_date",
+    "_get_depreciation_stop_date",
+    "_get_first_period_amount",
+    "_get_amount_linear",
+    "_compute_year_amount",
+    "_compute_line_dates",
+    "_compute_depreciation_amount_per_fiscal_year",
+    "_compute_depreciation_table_lines",
+)
+# Depreciation parameters that can be changed in what-if forecasts
+FORECAST_OVERRIDE_FIELDS = {
+    "method",
+    "method_number",
+    "method_period",
+    "method_end",
+    "method_time",
+    "method_progress_factor",
+    "prorata",
+    "days_calc",
+    "use_leap_years",
+}
+
 READONLY_STATES = {
     "open": [("readonly", True)],
     "close": [("readonly", True)],
@@ -24,12 +83,213 @@ READONLY_STATES = {
 }
 
 
+def _board_process_importable(module_name):
+    """Return whether the processes computing depreciation tables can
+    import the module ``module_name``.
+
+    The processes are started by a forkserver, which does not know the
+    addons paths of the server: the module must be installed in a directory
+    of the Python path, e.g. as a Python package.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return False
+    module_path = os.path.splitext(os.path.realpath(sys.modules[module_name].__file__))[
+        0
+    ]
+    relative_path = os.path.join(*module_name.split("."))
+    return any(
+        module_path == os.path.realpath(os.path.join(path or os.curdir, relative_path))
+        for path in sys.path
+    )
+
+
 class DummyFy(object):
     def __init__(self, *args, **argv):
         for key, arg in argv.items():
             setattr(self, key, arg)
 
 
+class CompanyFiscalYearCalendar(FiscalYearCalendar):
+    """Fiscal years of a company."""
+
+    __slots__ = ("company",)
+
+    def __init__(self, company):
+        super().__init__(
+            company.fiscalyear_last_day, int(company.fiscalyear_last_month)
+        )
+        self.company = company
+
+    def _compute_fiscal_year(self, day):
+        fy_info = self.company.compute_fiscalyear_dates(day)
+        return FiscalYear(fy_info["date_from"], fy_info["date_to"])
+
+
+class AssetFiscalYearCalendar(FiscalYearCalendar):
+    """Fiscal years given by ``_get_fy_info`` of an asset."""
+
+    __slots__ = ("asset",)
+
+    def __init__(self, asset):
+        company = asset.company_id
+        super().__init__(
+            company.fiscalyear_last_day, int(company.fiscalyear_last_month)
+        )
+        self.asset = asset
+
+    def _compute_fiscal_year(self, day):
+        fy_info = self.asset._get_fy_info(day)
+        return FiscalYear(fy_info["date_from"], fy_info["date_to"])
+
+
+class AssetDepreciationKernelMixin:
+    """Steps of a kernel delegating to the methods of an asset that are
+    overridden by other modules, see ``KERNEL_LEGACY_METHODS``.
+
+    The delegated methods receive and return the dict based tables, of
+    which the ``fy`` key holds the fiscal year record given by the
+    ``_get_fy_info`` method of the asset.
+    """
+
+    __slots__ = ()
+
+    def _entry_vals(self, entry):
+        vals = entry.as_dict()
+        date_from = entry.fiscal_year.date_from
+        fiscal_year = self.fiscal_year_records.get(date_from)
+        if fiscal_year is None:
+            fiscal_year = self.asset._get_fy_info(date_from)["record"]
+            self.fiscal_year_records[date_from] = fiscal_year
+        vals["fy"] = fiscal_year
+        return vals
+
+    def compute_schedule(self):
+        if "_compute_depreciation_schedule" not in self.delegated:
+            return super().compute_schedule()
+        return [
+            ScheduleEntry.from_dict(entry)
+            for entry in self.asset._compute_depreciation_schedule()
+        ]
+
+    def compute_table(self):
+        if "_compute_depreciation_table" not in self.delegated:
+            return super().compute_table()
+        return [
+            ScheduleEntry.from_dict(entry)
+            for entry in self.asset._compute_depreciation_table()
+        ]
+
+    def group_lines(self, table):
+        if "_group_lines" not in self.delegated:
+            return super().group_lines(table)
+        entries = [self._entry_vals(entry) for entry in table]
+        self.asset._group_lines(entries)
+        table[:] = [ScheduleEntry.from_dict(entry) for entry in entries]
+
+    def fy_duration(self, fiscal_year, option="days"):
+        if "_get_fy_duration" not in self.delegated:
+            return super().fy_duration(fiscal_year, option=option)
+        return self.asset._get_fy_duration(fiscal_year, option=option)
+
+    def fy_duration_factor(self, entry, firstyear):
+        if "_get_fy_duration_factor" not in self.delegated:
+            return super().fy_duration_factor(entry, firstyear)
+        return self.asset._get_fy_duration_factor(self._entry_vals(entry), firstyear)
+
+    def depreciation_start_date(self, fiscal_year):
+        if "_get_depreciation_start_date" not in self.delegated:
+            return super().depreciation_start_date(fiscal_year)
+        return self.asset._get_depreciation_start_date(fiscal_year)
+
+    def depreciation_stop_date(self, depreciation_start_date):
+        if "_get_depreciation_stop_date" not in self.delegated:
+            return super().depreciation_stop_date(depreciation_start_date)
+        return self.asset._get_depreciation_stop_date(depreciation_start_date)
+
+    def first_period_amount(self, table, entry, depreciation_start_date, line_dates):
+        if "_get_first_period_amount" not in self.delegated:
+            return super().first_period_amount(
+                table, entry, depreciation_start_date, line_dates
+            )
+        return self.asset._get_first_period_amount(
+            [self._entry_vals(e) for e in table],
+            self._entry_vals(entry),
+            depreciation_start_date,
+            line_dates,
+        )
+
+    def amount_linear(self, depreciation_start_date, depreciation_stop_date, entry):
+        if "_get_amount_linear" not in self.delegated:
+            return super().amount_linear(
+                depreciation_start_date, depreciation_stop_date, entry
+            )
+        return self.asset._get_amount_linear(
+            depreciation_start_date, depreciation_stop_date, self._entry_vals(entry)
+        )
+
+    def year_amount(
+        self, residual_amount, depreciation_start_date, depreciation_stop_date, entry
+    ):
+        if "_compute_year_amount" not in self.delegated:
+            return super().year_amount(
+                residual_amount, depreciation_start_date, depreciation_stop_date, entry
+            )
+        return self.asset._compute_year_amount(
+            residual_amount,
+            depreciation_start_date,
+            depreciation_stop_date,
+            self._entry_vals(entry),
+        )
+
+    def line_dates(self, table, start_date, stop_date):
+        if "_compute_line_dates" not in self.delegated:
+            return super().line_dates(table, start_date, stop_date)
+        return self.asset._compute_line_dates(
+            [self._entry_vals(entry) for entry in table], start_date, stop_date
+        )
+
+    def amount_per_fiscal_year(
+        self, table, line_dates, depreciation_start_date, depreciation_stop_date
+    ):
+        if "_compute_depreciation_amount_per_fiscal_year" not in self.delegated:
+            return super().amount_per_fiscal_year(
+                table, line_dates, depreciation_start_date, depreciation_stop_date
+            )
+        return [
+            ScheduleEntry.from_dict(entry)
+            for entry in self.asset._compute_depreciation_amount_per_fiscal_year(
+                [self._entry_vals(entry) for entry in table],
+                line_dates,
+                depreciation_start_date,
+                depreciation_stop_date,
+            )
+        ]
+
+    def table_lines(
+        self, table, depreciation_start_date, depreciation_stop_date, line_dates
+    ):
+        if "_compute_depreciation_table_lines" not in self.delegated:
+            return super().table_lines(
+                table, depreciation_start_date, depreciation_stop_date, line_dates
+            )
+        entries = [self._entry_vals(entry) for entry in table]
+        self.asset._compute_depreciation_table_lines(
+            entries, depreciation_start_date, depreciation_stop_date, line_dates
+        )
+        table[:] = [ScheduleEntry.from_dict(entry) for entry in entries]
+
+
+@functools.lru_cache(maxsize=None)
+def asset_depreciation_kernel_class(kernel_class):
+    """Return the subclass of ``kernel_class`` delegating to the overridden
+    methods of an asset."""
+    return type(
+        "Asset%s" % kernel_class.__name__,
+        (AssetDepreciationKernelMixin, kernel_class),
+        {"__slots__": ("asset", "delegated", "fiscal_year_records")},
+    )
+
+
 class AccountAsset(models.Model):
     _name = "account.asset"
     _inherit = ["mail.thread", "mail.activity.mixin", "analytic.mixin"]
@@ -294,21 +554,50 @@ class AccountAsset(models.Model):
         "depreciation_base",
         "depreciation_line_ids.type",
         "depreciation_line_ids.amount",
-        "depreciation_line_ids.previous_id",
         "depreciation_line_ids.init_entry",
         "depreciation_line_ids.move_check",
     )
     def _compute_depreciation(self):
+        # The depreciated values of the stored assets are summed in a single
+        # query, so that their lines do not need to be loaded.
+        stored_assets = self.filtered("id")
+        depreciated_values = stored_assets._get_depreciated_values()
         for asset in self:
-            lines = asset.depreciation_line_ids.filtered(
-                lambda l: l.type in ("depreciate", "remove")
-                and (l.init_entry or l.move_check)
-            )
-            value_depreciated = sum(line.amount for line in lines)
+            if asset in stored_assets:
+                value_depreciated = depreciated_values.get(asset.id, 0.0)
+            else:
+                lines = asset.depreciation_line_ids.filtered(
+                    lambda l: l.type in ("depreciate", "remove")
+                    and (l.init_entry or l.move_check)
+                )
+                value_depreciated = sum(line.amount for line in lines)
             residual = asset.depreciation_base - value_depreciated
             depreciated = value_depreciated
             asset.update({"value_residual": residual, "value_depreciated": depreciated})
 
+    def _get_depreciated_values(self):
+        """Return the sum of the posted or initial balance depreciation and
+        removal lines per asset id.
+        """
+        if not self:
+            return {}
+        groups = (
+            self.env["account.asset.line"]
+            .sudo()
+            .read_group(
+                [
+                    ("asset_id", "in", self.ids),
+                    ("type", "in", ("depreciate", "remove")),
+                    "|",
+                    ("init_entry", "=", True),
+                    ("move_check", "=", True),
+                ],
+                ["amount:sum"],
+                ["asset_id"],
+            )
+        )
+        return {group["asset_id"][0]: group["amount"] for group in groups}
+
     @api.depends("profile_id")
     def _compute_group_ids(self):
         for asset in self:
@@ -425,46 +714,46 @@ class AccountAsset(models.Model):
     @api.model_create_multi
     def create(self, vals_list):
         asset_ids = super().create(vals_list)
-        create_asset_from_move_line = self.env.context.get(
-            "create_asset_from_move_line"
-        )
-        for asset_id in asset_ids:
-            if create_asset_from_move_line:
-                # Trigger compute of depreciation_base
-                asset_id.salvage_value = 0.0
-            asset_id._create_first_asset_line()
+        if self.env.context.get("create_asset_from_move_line"):
+            # Trigger compute of depreciation_base
+            asset_ids.salvage_value = 0.0
+        asset_ids._create_first_asset_line()
         return asset_ids
 
     def write(self, vals):
         res = super().write(vals)
-        for asset in self:
-            if self.env.context.get("asset_validate_from_write"):
-                continue
-            asset._create_first_asset_line()
-            if asset.profile_id.open_asset and self.env.context.get(
-                "create_asset_from_move_line"
-            ):
-                asset.compute_depreciation_board()
-                # extra context to avoid recursion
-                asset.with_context(asset_validate_from_write=True).validate()
+        if SNAPSHOT_ASSET_FIELDS.intersection(vals):
+            # the status and the residual values of all the snapshots change
+            self.env["account.asset.snapshot"]._mark_stale(
+                (asset.id, False) for asset in self
+            )
+        if self.env.context.get("asset_validate_from_write"):
+            return res
+        self._create_first_asset_line()
+        if self.env.context.get("create_asset_from_move_line"):
+            assets = self.filtered(lambda a: a.profile_id.open_asset)
+            assets.compute_depreciation_board()
+            # extra context to avoid recursion
+            assets.with_context(asset_validate_from_write=True).validate()
         return res
 
     def _create_first_asset_line(self):
-        self.ensure_one()
-        if self.depreciation_base and not self.depreciation_line_ids:
-            asset_line_obj = self.env["account.asset.line"]
-            line_name = self._get_depreciation_entry_name(0)
-            asset_line_vals = {
-                "amount": self.depreciation_base,
-                "asset_id": self.id,
-                "name": line_name,
-                "line_date": self.date_start,
-                "init_entry": True,
-                "type": "create",
-            }
-            asset_line = asset_line_obj.create(asset_line_vals)
-            if self.env.context.get("create_asset_from_move_line"):
-                asset_line.move_id = self.env.context["move_id"]
+        vals_list = []
+        for asset in self:
+            if asset.depreciation_base and not asset.depreciation_line_ids:
+                vals_list.append(
+                    {
+                        "amount": asset.depreciation_base,
+                        "asset_id": asset.id,
+                        "name": asset._get_depreciation_entry_name(0),
+                        "line_date": asset.date_start,
+                        "init_entry": True,
+                        "type": "create",
+                    }
+                )
+        asset_lines = self.env["account.asset.line"].create(vals_list)
+        if asset_lines and self.env.context.get("create_asset_from_move_line"):
+            asset_lines.move_id = self.env.context["move_id"]
 
     def unlink(self):
         for asset in self:
@@ -508,6 +797,7 @@ class AccountAsset(models.Model):
         return result
 
     def validate(self):
+        asset_ids_to_compute = []
         for asset in self:
             if asset.currency_id.is_zero(asset.value_residual):
                 asset.state = "close"
@@ -516,20 +806,14 @@ class AccountAsset(models.Model):
                 if not asset.depreciation_line_ids.filtered(
                     lambda l: l.type != "create"
                 ):
-                    asset.compute_depreciation_board()
+                    asset_ids_to_compute.append(asset.id)
+        self.browse(asset_ids_to_compute).compute_depreciation_board()
         return True
 
     def remove(self):
         self.ensure_one()
         ctx = dict(self.env.context, active_ids=self.ids, active_id=self.id)
-
-        early_removal = False
-        if self.method in ["linear-limit", "degr-limit"]:
-            if self.value_residual != self.salvage_value:
-                early_removal = True
-        elif self.value_residual:
-            early_removal = True
-        if early_removal:
+        if self._is_early_removal():
             ctx.update({"early_removal": True})
 
         return {
@@ -541,6 +825,15 @@ class AccountAsset(models.Model):
             "context": ctx,
         }
 
+    def _is_early_removal(self):
+        """Return whether the asset is removed before the end of its
+        depreciation.
+        """
+        self.ensure_one()
+        if self.method in ["linear-limit", "degr-limit"]:
+            return self.value_residual != self.salvage_value
+        return bool(self.value_residual)
+
     def set_to_draft(self):
         return self.write({"state": "draft"})
 
@@ -561,27 +854,9 @@ class AccountAsset(models.Model):
 
     def _group_lines(self, table):
         """group lines prior to depreciation start period."""
-
-        def group_lines(x, y):
-            y.update({"amount": x["amount"] + y["amount"]})
-            return y
-
-        depreciation_start_date = self.date_start
-        lines = table[0]["lines"]
-        lines1 = []
-        lines2 = []
-        flag = lines[0]["date"] < depreciation_start_date
-        for line in lines:
-            if flag:
-                lines1.append(line)
-                if line["date"] >= depreciation_start_date:
-                    flag = False
-            else:
-                lines2.append(line)
-        if lines1:
-            lines1 = [reduce(group_lines, lines1)]
-            lines1[0]["depreciated_value"] = 0.0
-        table[0]["lines"] = lines1 + lines2
+        entry = ScheduleEntry.from_dict(table[0])
+        self._get_depreciation_kernel(bypass="_group_lines").group_lines([entry])
+        table[0]["lines"] = [line.as_dict() for line in entry.lines]
 
     def _compute_depreciation_line(
         self,
@@ -592,6 +867,13 @@ class AccountAsset(models.Model):
         last_line,
         posted_lines,
     ):
+        """Create the depreciation lines of the part of the depreciation
+        table following ``last_line``, the last posted entry.
+
+        The boards are computed in batch by ``compute_depreciation_board``
+        without this method: it is only called, asset by asset, when another
+        module overrides it.
+        """
         company = self.company_id
         currency = company.currency_id
         fiscalyear_lock_date = company.fiscalyear_lock_date or fields.Date.to_date(
@@ -637,125 +919,551 @@ class AccountAsset(models.Model):
                     seq -= 1
             line_i_start = 0
 
-    def compute_depreciation_board(self):
+    def _prepare_depreciation_line_vals(
+        self,
+        depreciated_value_posted,
+        table_i_start,
+        line_i_start,
+        table,
+        posted_lines,
+    ):
+        """Return the values of the depreciation lines to create for the
+        part of the depreciation table following the last posted entry.
 
-        line_obj = self.env["account.asset.line"]
+        The lines are not linked to each other: ``previous_id`` is set by
+        ``account.asset.line._link_previous_lines`` once they are created.
+        """
+        self.ensure_one()
+        company = self.company_id
+        currency = company.currency_id
+        fiscalyear_lock_date = company.fiscalyear_lock_date or fields.Date.to_date(
+            "1901-01-01"
+        )
 
-        for asset in self:
-            currency = asset.company_id.currency_id
-            if currency.is_zero(asset.value_residual):
-                continue
-            domain = [
-                ("asset_id", "=", asset.id),
-                ("type", "=", "depreciate"),
+        vals_list = []
+        seq = len(posted_lines)
+        last_date = table[-1]["lines"][-1]["date"]
+        depreciated_value = depreciated_value_posted
+        amount_to_allocate = 0.0
+        for entry in table[table_i_start:]:
+            for line in entry["lines"][line_i_start:]:
+                seq += 1
+                name = self._get_depreciation_entry_name(seq)
+                amount = line["amount"]
+                if self.carry_forward_missed_depreciations:
+                    if line["init"]:
+                        amount_to_allocate += amount
+                        amount = 0
+                    else:
+                        amount += amount_to_allocate
+                        amount_to_allocate = 0.0
+                if line["date"] == last_date:
+                    # ensure that the last entry of the table always
+                    # depreciates the remaining value
+                    amount = self.depreciation_base - depreciated_value
+                    if self.method in ["linear-limit", "degr-limit"]:
+                        amount -= self.salvage_value
+                if amount or self.carry_forward_missed_depreciations:
+                    vals_list.append(
+                        {
+                            "amount": currency.round(amount),
+                            "asset_id": self.id,
+                            "name": name,
+                            "line_date": line["date"],
+                            "line_days": line["days"],
+                            "init_entry": fiscalyear_lock_date >= line["date"],
+                        }
+                    )
+                    depreciated_value += currency.round(amount)
+                else:
+                    seq -= 1
+            line_i_start = 0
+        return vals_list
+
+    def _get_depreciation_board_posted_lines(self):
+        """Fetch the posted depreciation lines of all assets in one query.
+
+        :return: dict mapping each asset id to a tuple with the posted
+            (or initial balance) depreciation lines, most recent first,
+            and the number of lines of any type linked to an accounting entry.
+        """
+        line_obj = self.env["account.asset.line"]
+        lines = line_obj.search(
+            [
+                ("asset_id", "in", self.ids),
                 "|",
                 ("move_check", "=", True),
                 ("init_entry", "=", True),
-            ]
-            posted_lines = line_obj.search(domain, order="line_date desc")
-            if posted_lines:
-                last_line = posted_lines[0]
+            ],
+            order="line_date desc, id desc",
+        )
+        posted_ids = {asset_id: [] for asset_id in self.ids}
+        move_check_count = dict.fromkeys(self.ids, 0)
+        for line in lines:
+            asset_id = line.asset_id.id
+            if line.type == "depreciate":
+                posted_ids[asset_id].append(line.id)
+            if line.move_check:
+                move_check_count[asset_id] += 1
+        return {
+            asset_id: (
+                line_obj.browse(posted_ids[asset_id]),
+                move_check_count[asset_id],
+            )
+            for asset_id in self.ids
+        }
+
+    def _get_posted_line_boundaries(self):
+        """Fetch the dates bounding the posted (or initial balance) lines of
+        all assets in one query, to validate changes of their lines.
+
+        :return: dict mapping each asset id to a dict with
+            ``first_posted_date``, the date of the first posted depreciation,
+            ``first_date``, the date of the first posted line that is not the
+            creation line, and ``last_lines``, the ids and dates of the two
+            most recent posted lines.
+        """
+        boundaries = {
+            asset_id: {"first_posted_date": None, "first_date": None, "last_lines": []}
+            for asset_id in self.ids
+        }
+        if not self.ids:
+            return boundaries
+        self.env["account.asset.line"].flush_model(
+            ["asset_id", "line_date", "type", "move_check", "init_entry"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT asset_id,
+                MIN(line_date) FILTER (WHERE type = 'depreciate' AND move_check),
+                MIN(line_date) FILTER (WHERE type != 'create'),
+                (ARRAY_AGG(id ORDER BY line_date DESC, id DESC))[1:2],
+                (ARRAY_AGG(line_date ORDER BY line_date DESC, id DESC))[1:2]
+            FROM account_asset_line
+            WHERE asset_id IN %s AND (move_check OR init_entry)
+            GROUP BY asset_id
+            """,
+            (tuple(self.ids),),
+        )
+        for (
+            asset_id,
+            first_posted,
+            first,
+            last_ids,
+            last_dates,
+        ) in self.env.cr.fetchall():
+            boundaries[asset_id] = {
+                "first_posted_date": first_posted,
+                "first_date": first,
+                "last_lines": list(zip(last_ids, last_dates)),
+            }
+        return boundaries
+
+    def _prepare_depreciation_board_vals(
+        self, posted_lines, move_check_count, table=None
+    ):
+        """Compute the depreciation table of the asset and return the values
+        of the unposted depreciation lines it requires.
+
+        :param posted_lines: posted or initial balance depreciation lines of
+            the asset, most recent first.
+        :param move_check_count: number of asset lines linked to an entry.
+        :param table: depreciation table of the asset when it is already
+            computed.
+        """
+        self.ensure_one()
+        if table is None:
+            table = self._compute_depreciation_schedule()
+        if not table:
+            return []
+        return self._prepare_depreciation_line_vals(
+            *self._get_depreciation_board_start(posted_lines, move_check_count, table),
+            table,
+            posted_lines,
+        )
+
+    def _get_depreciation_board_start(self, posted_lines, move_check_count, table):
+        """Return the depreciated value of the posted lines of the asset and
+        the indexes of the entry and of the line of the depreciation table
+        following the last posted line. The table is adjusted to the posted
+        value.
+        """
+        currency = self.company_id.currency_id
+        # check table with posted entries and
+        # recompute in case of deviation
+        depreciated_value_posted = depreciated_value = 0.0
+        if posted_lines:
+            total_table_lines = sum(len(entry["lines"]) for entry in table)
+            last_depreciation_date = posted_lines[0].line_date
+            last_date_in_table = table[-1]["lines"][-1]["date"]
+            # If the number of lines in the table is the same as the depreciation
+            # lines, we will not show an error even if the dates are the same.
+            if (last_date_in_table < last_depreciation_date) or (
+                last_date_in_table == last_depreciation_date
+                and total_table_lines != move_check_count
+            ):
+                raise UserError(
+                    _(
+                        "The duration of the asset conflicts with the "
+                        "posted depreciation table entry dates."
+                    )
+                )
+
+            for _table_i, entry in enumerate(table):
+                residual_amount_table = entry["lines"][-1]["remaining_value"]
+                if entry["date_start"] <= last_depreciation_date <= entry["date_stop"]:
+                    break
+
+            if entry["date_stop"] == last_depreciation_date:
+                _table_i += 1
+                _line_i = 0
             else:
-                last_line = line_obj
-            domain = [
-                ("asset_id", "=", asset.id),
+                entry = table[_table_i]
+                date_min = entry["date_start"]
+                for _line_i, line in enumerate(entry["lines"]):
+                    residual_amount_table = line["remaining_value"]
+                    if date_min <= last_depreciation_date <= line["date"]:
+                        break
+                    date_min = line["date"]
+                if line["date"] == last_depreciation_date:
+                    _line_i += 1
+            table_i_start = _table_i
+            line_i_start = _line_i
+
+            # check if residual value corresponds with table
+            # and adjust table when needed
+            depreciated_value_posted = depreciated_value = sum(
+                posted_line.amount for posted_line in posted_lines
+            )
+            residual_amount = self.depreciation_base - depreciated_value
+            amount_diff = currency.round(residual_amount_table - residual_amount)
+            if amount_diff:
+                # We will auto-create a new line because the number of lines in
+                # the tables are the same as the posted depreciations and there
+                # is still a residual value. Only in this case we will need to
+                # add a new line to the table with the amount of the difference.
+                if move_check_count == total_table_lines:
+                    table[table_i_start]["lines"].append(
+                        table[table_i_start]["lines"][line_i_start - 1]
+                    )
+                    line = table[table_i_start]["lines"][line_i_start]
+                    line["days"] = 0
+                    line["amount"] = amount_diff
+                # compensate in first depreciation entry
+                # after last posting
+                line = table[table_i_start]["lines"][line_i_start]
+                line["amount"] -= amount_diff
+
+        else:  # no posted lines
+            table_i_start = 0
+            line_i_start = 0
+
+        return depreciated_value_posted, table_i_start, line_i_start
+
+    def _compute_depreciation_board_legacy(self):
+        """Compute the depreciation tables of the assets one by one with
+        ``_compute_depreciation_line``, for the modules overriding it.
+        """
+        line_obj = self.env["account.asset.line"]
+        posted_data = self._get_depreciation_board_posted_lines()
+        line_obj.search(
+            [
+                ("asset_id", "in", self.ids),
                 ("type", "=", "depreciate"),
                 ("move_id", "=", False),
                 ("init_entry", "=", False),
             ]
-            old_lines = line_obj.search(domain)
-            if old_lines:
-                old_lines.unlink()
-
-            table = asset._compute_depreciation_table()
+        ).unlink()
+        for asset in self:
+            posted_lines, move_check_count = posted_data[asset.id]
+            table = asset._compute_depreciation_schedule()
             if not table:
                 continue
+            asset._compute_depreciation_line(
+                *asset._get_depreciation_board_start(
+                    posted_lines, move_check_count, table
+                ),
+                table,
+                posted_lines[:1],
+                posted_lines,
+            )
 
-            asset._group_lines(table)
-
-            # check table with posted entries and
-            # recompute in case of deviation
-            depreciated_value_posted = depreciated_value = 0.0
-            if posted_lines:
-                total_table_lines = sum(len(entry["lines"]) for entry in table)
-                move_check_lines = asset.depreciation_line_ids.filtered("move_check")
-                last_depreciation_date = last_line.line_date
-                last_date_in_table = table[-1]["lines"][-1]["date"]
-                # If the number of lines in the table is the same as the depreciation
-                # lines, we will not show an error even if the dates are the same.
-                if (last_date_in_table < last_depreciation_date) or (
-                    last_date_in_table == last_depreciation_date
-                    and total_table_lines != len(move_check_lines)
-                ):
-                    raise UserError(
-                        _(
-                            "The duration of the asset conflicts with the "
-                            "posted depreciation table entry dates."
-                        )
-                    )
+    def compute_depreciation_board(self):
+        """Compute the depreciation tables of all the assets in ``self``.
 
-                for _table_i, entry in enumerate(table):
-                    residual_amount_table = entry["lines"][-1]["remaining_value"]
-                    if (
-                        entry["date_start"]
-                        <= last_depreciation_date
-                        <= entry["date_stop"]
-                    ):
-                        break
+        The posted lines of the assets are fetched at once and the new
+        tables are compared with the unposted depreciation lines: the lines
+        are matched on their date, so that only the changed lines are
+        updated, the surplus lines deleted and the missing lines created.
 
-                if entry["date_stop"] == last_depreciation_date:
-                    _table_i += 1
-                    _line_i = 0
-                else:
-                    entry = table[_table_i]
-                    date_min = entry["date_start"]
-                    for _line_i, line in enumerate(entry["lines"]):
-                        residual_amount_table = line["remaining_value"]
-                        if date_min <= last_depreciation_date <= line["date"]:
-                            break
-                        date_min = line["date"]
-                    if line["date"] == last_depreciation_date:
-                        _line_i += 1
-                table_i_start = _table_i
-                line_i_start = _line_i
-
-                # check if residual value corresponds with table
-                # and adjust table when needed
-                depreciated_value_posted = depreciated_value = sum(
-                    posted_line.amount for posted_line in posted_lines
+        With ``asset_board_processes`` in the context, the depreciation
+        tables are computed by a pool of that many processes.
+
+        When other modules override ``_compute_depreciation_line``, the
+        tables are computed asset by asset through it instead.
+        """
+        assets = self.filtered(
+            lambda a: not a.company_id.currency_id.is_zero(a.value_residual)
+        )
+        if not assets:
+            return True
+        with compute_phase(self.env, "board", count=len(assets)):
+            if (
+                type(self)._compute_depreciation_line
+                is not AccountAsset._compute_depreciation_line
+            ):
+                assets._compute_depreciation_board_legacy()
+            else:
+                assets._compute_depreciation_board_batch()
+        return True
+
+    def _compute_depreciation_board_batch(self):
+        """Compute the depreciation tables of the assets in batch, see
+        ``compute_depreciation_board``."""
+        line_obj = self.env["account.asset.line"]
+        posted_data = self._get_depreciation_board_posted_lines()
+        old_lines = line_obj.search(
+            [
+                ("asset_id", "in", self.ids),
+                ("type", "=", "depreciate"),
+                ("move_id", "=", False),
+                ("init_entry", "=", False),
+            ],
+            order="line_date, id",
+        )
+        old_lines_by_date = {}
+        surplus_ids = []
+        for line in old_lines:
+            key = (line.asset_id.id, line.line_date)
+            if key in old_lines_by_date:
+                surplus_ids.append(line.id)
+            else:
+                old_lines_by_date[key] = line
+
+        tables = {}
+        processes = self.env.context.get("asset_board_processes") or 0
+        if processes > 1 and len(self) > BOARD_PROCESS_CHUNK_SIZE:
+            tables = self._compute_depreciation_schedules_parallel(processes)
+
+        vals_list = []
+        kept_ids = []
+        updates = defaultdict(list)
+        # first date of the board of each asset from which the amounts
+        # changed, the values of the following lines must be recomputed
+        changed_dates = {}
+
+        def _set_changed(asset_id, line_date):
+            if asset_id not in changed_dates or line_date < changed_dates[asset_id]:
+                changed_dates[asset_id] = line_date
+
+        for asset in self:
+            currency = asset.company_id.currency_id
+            for vals in asset._prepare_depreciation_board_vals(
+                *posted_data[asset.id], table=tables.pop(asset.id, None)
+            ):
+                line = old_lines_by_date.pop((asset.id, vals["line_date"]), None)
+                if line is None:
+                    vals_list.append(vals)
+                    _set_changed(asset.id, vals["line_date"])
+                    continue
+                kept_ids.append(line.id)
+                changes = tuple(
+                    (fname, vals[fname])
+                    for fname in ("name", "line_days", "init_entry")
+                    if line[fname] != vals[fname]
                 )
-                residual_amount = asset.depreciation_base - depreciated_value
-                amount_diff = currency.round(residual_amount_table - residual_amount)
-                if amount_diff:
-                    # We will auto-create a new line because the number of lines in
-                    # the tables are the same as the posted depreciations and there
-                    # is still a residual value. Only in this case we will need to
-                    # add a new line to the table with the amount of the difference.
-                    if len(move_check_lines) == total_table_lines:
-                        table[table_i_start]["lines"].append(
-                            table[table_i_start]["lines"][line_i_start - 1]
-                        )
-                        line = table[table_i_start]["lines"][line_i_start]
-                        line["days"] = 0
-                        line["amount"] = amount_diff
-                    # compensate in first depreciation entry
-                    # after last posting
-                    line = table[table_i_start]["lines"][line_i_start]
-                    line["amount"] -= amount_diff
+                if currency.compare_amounts(line.amount, vals["amount"]):
+                    changes += (("amount", vals["amount"]),)
+                    _set_changed(asset.id, line.line_date)
+                if changes:
+                    updates[changes].append(line.id)
+        surplus_ids += [line.id for line in old_lines_by_date.values()]
+        for line in line_obj.browse(surplus_ids):
+            _set_changed(line.asset_id.id, line.line_date)
+
+        if surplus_ids:
+            line_obj.browse(surplus_ids).unlink()
+        for changes, line_ids in updates.items():
+            line_obj.browse(line_ids).write(dict(changes))
+        lines = line_obj.browse(kept_ids)
+        if vals_list:
+            lines |= line_obj.create(vals_list)
+        lines._link_previous_lines()
+        # the depreciated and remaining values of a line depend on the
+        # amounts of the previous lines, which may have changed
+        lines.filtered(
+            lambda l: l.asset_id.id in changed_dates
+            and l.line_date >= changed_dates[l.asset_id.id]
+        ).modified(["amount"])
+
+    @api.model
+    def get_depreciation_forecast(
+        self, date_from=None, date_to=None, overrides=None, domain=None
+    ):
+        """Return the projected depreciation of the running assets, without
+        writing depreciation lines.
+
+        :param date_from: start of the forecast, today by default.
+        :param date_to: end of the forecast, five years after its start by
+            default.
+        :param overrides: what-if depreciation parameters by profile id,
+            e.g. ``{profile_id: {"method_number": 3}}``.
+        :param domain: domain of the assets, the running assets by default.
+        :return: dict with the ``columns`` of the forecast cube and the
+            ``errors`` of the assets of which the forecast failed, see
+            ``_compute_depreciation_forecast``.
+        """
+        date_from = fields.Date.to_date(date_from) or fields.Date.context_today(self)
+        date_to = fields.Date.to_date(date_to) or date_from + relativedelta(
+            years=5, days=-1
+        )
+        spec_overrides = {}
+        for profile_id, vals in (overrides or {}).items():
+            unknown = set(vals) - FORECAST_OVERRIDE_FIELDS
+            if unknown:
+                raise UserError(
+                    _("The depreciation parameters %s cannot be changed.")
+                    % ", ".join(sorted(unknown))
+                )
+            vals = dict(vals)
+            if "method_end" in vals:
+                vals["method_end"] = fields.Date.to_date(vals["method_end"])
+            spec_overrides[int(profile_id)] = vals
+        assets = self.search(domain or [("state", "=", "open")])
+        return assets.with_context(
+            asset_spec_overrides=spec_overrides
+        )._compute_depreciation_forecast(date_from, date_to)
+
+    def _compute_depreciation_forecast(self, date_from, date_to):
+        """Compute the depreciation tables of the assets in memory and
+        aggregate their unposted depreciations between ``date_from`` and
+        ``date_to`` by month, expense account, analytic distribution and
+        asset group.
+
+        The cube is columnar: ``columns`` maps ``month`` (first day of the
+        month), ``account_id``, ``analytic_distribution``, ``group_id``
+        (first group of the asset) and ``amount`` to lists of the same
+        length, one item per cell.
+        """
+        assets = self.filtered(
+            lambda a: not a.company_id.currency_id.is_zero(a.value_residual)
+        )
+        posted_data = assets._get_depreciation_board_posted_lines()
+        tables = {}
+        processes = self.env.context.get("asset_board_processes") or 0
+        if processes > 1 and len(assets) > BOARD_PROCESS_CHUNK_SIZE:
+            tables = assets._compute_depreciation_schedules_parallel(processes)
+
+        amounts = defaultdict(float)
+        currencies = {}
+        distributions = {}
+        errors = {}
+        for asset in assets:
+            distribution = asset.analytic_distribution or {}
+            distribution_key = tuple(sorted(distribution.items()))
+            distributions[distribution_key] = asset.analytic_distribution
+            key = (
+                asset.profile_id.account_expense_depreciation_id.id,
+                distribution_key,
+                asset.group_ids[:1].id,
+            )
+            currencies[key] = asset.company_id.currency_id
+            try:
+                vals_list = asset._prepare_depreciation_board_vals(
+                    *posted_data[asset.id], table=tables.pop(asset.id, None)
+                )
+            except UserError as e:
+                errors[asset.id] = str(e)
+                continue
+            for vals in vals_list:
+                line_date = vals["line_date"]
+                if vals["init_entry"] or not date_from <= line_date <= date_to:
+                    continue
+                amounts[(line_date.replace(day=1),) + key] += vals["amount"]
+
+        columns = {
+            "month": [],
+            "account_id": [],
+            "analytic_distribution": [],
+            "group_id": [],
+            "amount": [],
+        }
+        for month, account_id, distribution_key, group_id in sorted(amounts):
+            key = (account_id, distribution_key, group_id)
+            columns["month"].append(month)
+            columns["account_id"].append(account_id)
+            columns["analytic_distribution"].append(distributions[distribution_key])
+            columns["group_id"].append(group_id)
+            columns["amount"].append(currencies[key].round(amounts[(month,) + key]))
+        return {"columns": columns, "errors": errors}
+
+    def _get_depreciation_kernel_class(self):
+        """Localization: return a subclass of ``DepreciationKernel`` to
+        change the depreciation logic.
+        """
+        return DepreciationKernel
 
-            else:  # no posted lines
-                table_i_start = 0
-                line_i_start = 0
+    def _get_depreciation_spec(self):
+        self.ensure_one()
+        company = self.company_id
+        spec = DepreciationSpec(
+            depreciation_base=self.depreciation_base,
+            salvage_value=self.salvage_value,
+            date_start=self.date_start,
+            method=self.method,
+            method_number=self.method_number,
+            method_period=self.method_period,
+            method_end=self.method_end,
+            method_time=self.method_time,
+            method_progress_factor=self.method_progress_factor,
+            prorata=self.prorata,
+            days_calc=self.days_calc,
+            use_leap_years=self.use_leap_years,
+            fiscalyear_lock_date=company.fiscalyear_lock_date
+            or fields.Date.to_date("1901-01-01"),
+            rounding=company.currency_id.rounding,
+        )
+        overrides = self.env.context.get("asset_spec_overrides") or {}
+        if self.profile_id.id in overrides:
+            spec = dataclasses.replace(spec, **overrides[self.profile_id.id])
+        return spec
 
-            asset._compute_depreciation_line(
-                depreciated_value_posted,
-                table_i_start,
-                line_i_start,
-                table,
-                last_line,
-                posted_lines,
+    @api.model
+    def _get_overridden_kernel_methods(self):
+        """Return the names of the ``KERNEL_LEGACY_METHODS`` overridden by
+        other modules, to which the kernel delegates."""
+        return frozenset(
+            name
+            for name in KERNEL_LEGACY_METHODS
+            if getattr(type(self), name) is not getattr(AccountAsset, name)
+        )
+
+    def _get_depreciation_kernel(self, bypass=None):
+        """Return the kernel computing the depreciation table of the asset.
+
+        :param bypass: name of a method of ``KERNEL_LEGACY_METHODS`` for
+            which the kernel runs its own step instead of delegating to the
+            asset, used by the method itself.
+        """
+        self.ensure_one()
+        kernel_class = self._get_depreciation_kernel_class()
+        delegated = self._get_overridden_kernel_methods() - {bypass}
+        if not delegated:
+            return kernel_class(
+                self._get_depreciation_spec(),
+                CompanyFiscalYearCalendar(self.company_id),
             )
-        return True
+        if "_get_fy_info" in delegated:
+            fiscal_year_calendar = AssetFiscalYearCalendar(self)
+        else:
+            fiscal_year_calendar = CompanyFiscalYearCalendar(self.company_id)
+        kernel = asset_depreciation_kernel_class(kernel_class)(
+            self._get_depreciation_spec(), fiscal_year_calendar
+        )
+        kernel.asset = self
+        kernel.delegated = delegated
+        kernel.fiscal_year_records = {}
+        return kernel
 
     def _get_fy_duration(self, fy, option="days"):
         """Returns fiscal year duration.
@@ -766,136 +1474,49 @@ class AccountAsset(models.Model):
                   a started month is counted as a full month
         - years: duration in calendar years, considering also leap years
         """
-        fy_date_start = fy.date_from
-        fy_date_stop = fy.date_to
-        days = (fy_date_stop - fy_date_start).days + 1
-        months = (
-            (fy_date_stop.year - fy_date_start.year) * 12
-            + (fy_date_stop.month - fy_date_start.month)
-            + 1
+        return self._get_depreciation_kernel(bypass="_get_fy_duration").fy_duration(
+            fy, option=option
         )
-        if option == "days":
-            return days
-        elif option == "months":
-            return months
-        elif option == "years":
-            year = fy_date_start.year
-            cnt = fy_date_stop.year - fy_date_start.year + 1
-            for i in range(cnt):
-                cy_days = calendar.isleap(year) and 366 or 365
-                if i == 0:  # first year
-                    if fy_date_stop.year == year:
-                        duration = (fy_date_stop - fy_date_start).days + 1
-                    else:
-                        duration = (date(year, 12, 31) - fy_date_start).days + 1
-                    factor = float(duration) / cy_days
-                elif i == cnt - 1:  # last year
-                    duration = (fy_date_stop - date(year, 1, 1)).days + 1
-                    factor += float(duration) / cy_days
-                else:
-                    factor += 1.0
-                year += 1
-            return factor
 
     def _get_fy_duration_factor(self, entry, firstyear):
-        """
-        localization: override this method to change the logic used to
-        calculate the impact of extended/shortened fiscal years
-        """
-        duration_factor = 1.0
-        fy = entry["fy"]
-        if self.prorata:
-            if firstyear:
-                depreciation_date_start = self.date_start
-                fy_date_stop = entry["date_stop"]
-                first_fy_asset_days = (fy_date_stop - depreciation_date_start).days + 1
-                first_fy_duration = self._get_fy_duration(fy, option="days")
-                first_fy_year_factor = self._get_fy_duration(fy, option="years")
-                duration_factor = (
-                    float(first_fy_asset_days)
-                    / first_fy_duration
-                    * first_fy_year_factor
-                )
-            else:
-                duration_factor = self._get_fy_duration(fy, option="years")
-        else:
-            fy_months = self._get_fy_duration(fy, option="months")
-            duration_factor = float(fy_months) / 12
-        return duration_factor
+        return self._get_depreciation_kernel(
+            bypass="_get_fy_duration_factor"
+        ).fy_duration_factor(ScheduleEntry.from_dict(entry), firstyear)
 
     def _get_depreciation_start_date(self, fy):
-        """
-        In case of 'Linear': the first month is counted as a full month
-        if the fiscal year starts in the middle of a month.
-        """
-        if self.prorata:
-            depreciation_start_date = self.date_start
-        else:
-            depreciation_start_date = fy.date_from
-        return depreciation_start_date
+        return self._get_depreciation_kernel(
+            bypass="_get_depreciation_start_date"
+        ).depreciation_start_date(fy)
 
     def _get_depreciation_stop_date(self, depreciation_start_date):
-        if self.method_time == "year" and not self.method_end:
-            depreciation_stop_date = depreciation_start_date + relativedelta(
-                years=self.method_number, days=-1
-            )
-        elif self.method_time == "number":
-            if self.method_period == "month":
-                depreciation_stop_date = depreciation_start_date + relativedelta(
-                    months=self.method_number, days=-1
-                )
-            elif self.method_period == "quarter":
-                m = [x for x in [3, 6, 9, 12] if x >= depreciation_start_date.month][0]
-                first_line_date = depreciation_start_date + relativedelta(
-                    month=m, day=31
-                )
-                months = self.method_number * 3
-                depreciation_stop_date = first_line_date + relativedelta(
-                    months=months - 1, days=-1
-                )
-            elif self.method_period == "year":
-                depreciation_stop_date = depreciation_start_date + relativedelta(
-                    years=self.method_number, days=-1
-                )
-        elif self.method_time == "year" and self.method_end:
-            depreciation_stop_date = self.method_end
-        return depreciation_stop_date
+        return self._get_depreciation_kernel(
+            bypass="_get_depreciation_stop_date"
+        ).depreciation_stop_date(depreciation_start_date)
 
     def _get_first_period_amount(
         self, table, entry, depreciation_start_date, line_dates
     ):
-        """
-        Return prorata amount for Time Method 'Year' in case of
-        'Prorata Temporis'
-        """
-        amount = entry.get("period_amount")
-        if self.prorata and self.method_time == "year":
-            dates = [x for x in line_dates if x <= entry["date_stop"]]
-            full_periods = len(dates) - 1
-            amount = entry["fy_amount"] - amount * full_periods
-        return amount
+        return self._get_depreciation_kernel(
+            bypass="_get_first_period_amount"
+        ).first_period_amount(
+            [ScheduleEntry.from_dict(e) for e in table],
+            ScheduleEntry.from_dict(entry),
+            depreciation_start_date,
+            line_dates,
+        )
 
     def _get_amount_linear(
         self, depreciation_start_date, depreciation_stop_date, entry
     ):
-        """
-        Override this method if you want to compute differently the
-        yearly amount.
-        """
-        if not self.use_leap_years and self.method_number:
-            return self.depreciation_base / self.method_number
-        year = entry["date_stop"].year
-        cy_days = calendar.isleap(year) and 366 or 365
-        days = (depreciation_stop_date - depreciation_start_date).days + 1
-        return (self.depreciation_base / days) * cy_days
+        return self._get_depreciation_kernel(bypass="_get_amount_linear").amount_linear(
+            depreciation_start_date,
+            depreciation_stop_date,
+            ScheduleEntry.from_dict(entry),
+        )
 
     def _compute_year_amount(
         self, residual_amount, depreciation_start_date, depreciation_stop_date, entry
     ):
-        """
-        Localization: override this method to change the degressive-linear
-        calculation logic according to local legislation.
-        """
         if self.method_time != "year":
             raise UserError(
                 _(
@@ -903,243 +1524,54 @@ class AccountAsset(models.Model):
                     "Time Method 'Number of Years'."
                 )
             )
-        year_amount_linear = self._get_amount_linear(
-            depreciation_start_date, depreciation_stop_date, entry
-        )
-        if self.method == "linear":
-            return year_amount_linear
-        if self.method == "linear-limit":
-            if (residual_amount - year_amount_linear) < self.salvage_value:
-                return residual_amount - self.salvage_value
-            else:
-                return year_amount_linear
-        year_amount_degressive = residual_amount * self.method_progress_factor
-        if self.method == "degressive":
-            return year_amount_degressive
-        if self.method == "degr-linear":
-            if year_amount_linear > year_amount_degressive:
-                return min(year_amount_linear, residual_amount)
-            else:
-                return min(year_amount_degressive, residual_amount)
-        if self.method == "degr-limit":
-            if (residual_amount - year_amount_degressive) < self.salvage_value:
-                return residual_amount - self.salvage_value
-            else:
-                return year_amount_degressive
-        else:
-            raise UserError(_("Illegal value %s in asset.method.") % self.method)
+        with self._raise_kernel_errors():
+            return self._get_depreciation_kernel(
+                bypass="_compute_year_amount"
+            ).year_amount(
+                residual_amount,
+                depreciation_start_date,
+                depreciation_stop_date,
+                ScheduleEntry.from_dict(entry),
+            )
 
     def _compute_line_dates(self, table, start_date, stop_date):
-        """
-        The posting dates of the accounting entries depend on the
-        chosen 'Period Length' as follows:
-        - month: last day of the month
-        - quarter: last of the quarter
-        - year: last day of the fiscal year
-
-        Override this method if another posting date logic is required.
-        """
-        line_dates = []
-
-        if self.method_period == "month":
-            line_date = start_date + relativedelta(day=31)
-        if self.method_period == "quarter":
-            m = [x for x in [3, 6, 9, 12] if x >= start_date.month][0]
-            line_date = start_date + relativedelta(month=m, day=31)
-        elif self.method_period == "year":
-            line_date = table[0]["date_stop"]
-
-        i = 1
-        while line_date < stop_date:
-            line_dates.append(line_date)
-            if self.method_period == "month":
-                line_date = line_date + relativedelta(months=1, day=31)
-            elif self.method_period == "quarter":
-                line_date = line_date + relativedelta(months=3, day=31)
-            elif self.method_period == "year":
-                line_date = table[i]["date_stop"]
-                i += 1
-
-        # last entry
-        if not (self.method_time == "number" and len(line_dates) == self.method_number):
-            if self.days_calc:
-                line_dates.append(stop_date)
-            else:
-                line_dates.append(line_date)
-
-        return line_dates
+        return self._get_depreciation_kernel(bypass="_compute_line_dates").line_dates(
+            [ScheduleEntry.from_dict(entry) for entry in table], start_date, stop_date
+        )
 
     def _compute_depreciation_amount_per_fiscal_year(
         self, table, line_dates, depreciation_start_date, depreciation_stop_date
     ):
         self.ensure_one()
-        currency = self.company_id.currency_id
-        fy_residual_amount = self.depreciation_base
-        i_max = len(table) - 1
-        asset_sign = self.depreciation_base >= 0 and 1 or -1
-        day_amount = 0.0
-        if self.days_calc:
-            days = (depreciation_stop_date - depreciation_start_date).days + 1
-            day_amount = self.depreciation_base / days
-
-        for i, entry in enumerate(table):
-            if self.method_time == "year":
-                year_amount = self._compute_year_amount(
-                    fy_residual_amount,
-                    depreciation_start_date,
-                    depreciation_stop_date,
-                    entry,
-                )
-                if self.method_period == "year":
-                    period_amount = year_amount
-                elif self.method_period == "quarter":
-                    period_amount = year_amount / 4
-                elif self.method_period == "month":
-                    period_amount = year_amount / 12
-                if i == i_max:
-                    if self.method in ["linear-limit", "degr-limit"]:
-                        fy_amount = fy_residual_amount - self.salvage_value
-                    else:
-                        fy_amount = fy_residual_amount
-                else:
-                    firstyear = i == 0 and True or False
-                    fy_factor = self._get_fy_duration_factor(entry, firstyear)
-                    fy_amount = year_amount * fy_factor
-                if (
-                    currency.compare_amounts(
-                        asset_sign * (fy_amount - fy_residual_amount), 0
-                    )
-                    > 0
-                ):
-                    fy_amount = fy_residual_amount
-                period_amount = currency.round(period_amount)
-                fy_amount = currency.round(fy_amount)
-            else:
-                fy_amount = False
-                if self.method_time == "number":
-                    number = self.method_number
-                else:
-                    number = len(line_dates)
-                period_amount = currency.round(self.depreciation_base / number)
-            entry.update(
+        entries = self._get_depreciation_kernel(
+            bypass="_compute_depreciation_amount_per_fiscal_year"
+        ).amount_per_fiscal_year(
+            [ScheduleEntry.from_dict(entry) for entry in table],
+            line_dates,
+            depreciation_start_date,
+            depreciation_stop_date,
+        )
+        for entry, vals in zip(entries, table):
+            vals.update(
                 {
-                    "period_amount": period_amount,
-                    "fy_amount": fy_amount,
-                    "day_amount": day_amount,
+                    "period_amount": entry.period_amount,
+                    "fy_amount": entry.fy_amount,
+                    "day_amount": entry.day_amount,
                 }
             )
-            if self.method_time == "year":
-                fy_residual_amount -= fy_amount
-                if currency.is_zero(fy_residual_amount):
-                    break
-        i_max = i
-        table = table[: i_max + 1]
-        return table
+        return table[: len(entries)]
 
     def _compute_depreciation_table_lines(
         self, table, depreciation_start_date, depreciation_stop_date, line_dates
     ):
-
         self.ensure_one()
-        currency = self.company_id.currency_id
-        asset_sign = 1 if self.depreciation_base >= 0 else -1
-        i_max = len(table) - 1
-        remaining_value = self.depreciation_base
-        depreciated_value = 0.0
-        company = self.company_id
-        fiscalyear_lock_date = company.fiscalyear_lock_date or fields.Date.to_date(
-            "1901-01-01"
+        entries = [ScheduleEntry.from_dict(entry) for entry in table]
+        self._get_depreciation_kernel(
+            bypass="_compute_depreciation_table_lines"
+        ).table_lines(
+            entries, depreciation_start_date, depreciation_stop_date, line_dates
         )
-
-        for i, entry in enumerate(table):
-
-            lines = []
-            fy_amount_check = 0.0
-            fy_amount = entry["fy_amount"]
-            li_max = len(line_dates) - 1
-            prev_date = max(entry["date_start"], depreciation_start_date)
-            for li, line_date in enumerate(line_dates):
-                line_days = (line_date - prev_date).days + 1
-                if currency.is_zero(remaining_value):
-                    break
-
-                if line_date > min(entry["date_stop"], depreciation_stop_date) and not (
-                    i == i_max and li == li_max
-                ):
-                    prev_date = line_date
-                    break
-                else:
-                    prev_date = line_date + relativedelta(days=1)
-
-                if (
-                    self.method == "degr-linear"
-                    and currency.compare_amounts(
-                        asset_sign * (fy_amount - fy_amount_check), 0
-                    )
-                    < 0
-                ):
-                    break
-
-                if i == 0 and li == 0:
-                    if currency.compare_amounts(entry.get("day_amount"), 0) > 0:
-                        amount = line_days * entry.get("day_amount")
-                    else:
-                        amount = self._get_first_period_amount(
-                            table, entry, depreciation_start_date, line_dates
-                        )
-                        amount = currency.round(amount)
-                else:
-                    if currency.compare_amounts(entry.get("day_amount"), 0) > 0:
-                        amount = line_days * entry.get("day_amount")
-                    else:
-                        amount = entry.get("period_amount")
-
-                # last year, last entry
-                # Handle rounding deviations.
-                if i == i_max and li == li_max:
-                    amount = remaining_value
-                    remaining_value = 0.0
-                else:
-                    remaining_value -= amount
-                fy_amount_check += amount
-                line = {
-                    "date": line_date,
-                    "days": line_days,
-                    "amount": amount,
-                    "depreciated_value": depreciated_value,
-                    "remaining_value": remaining_value,
-                    "init": fiscalyear_lock_date >= line_date,
-                }
-                lines.append(line)
-                depreciated_value += amount
-
-            # Handle rounding and extended/shortened FY deviations.
-            #
-            # Remark:
-            # In account_asset_management version < 8.0.2.8.0
-            # the FY deviation for the first FY
-            # was compensated in the first FY depreciation line.
-            # The code has now been simplified with compensation
-            # always in last FT depreciation line.
-            if self.method_time == "year" and not entry.get("day_amount"):
-                if not currency.is_zero(fy_amount_check - fy_amount):
-                    diff = fy_amount_check - fy_amount
-                    amount = amount - diff
-                    remaining_value += diff
-                    lines[-1].update(
-                        {"amount": amount, "remaining_value": remaining_value}
-                    )
-                    depreciated_value -= diff
-
-            if not lines:
-                table.pop(i)
-            else:
-                entry["lines"] = lines
-            line_dates = line_dates[li:]
-
-        for entry in table:
-            if not entry["fy_amount"]:
-                entry["fy_amount"] = sum(line["amount"] for line in entry["lines"])
+        table[:] = [entry.as_dict() for entry in entries]
 
     def _get_fy_info(self, date):
         """Return an homogeneus data structure for fiscal years."""
@@ -1150,49 +1582,119 @@ class AccountAsset(models.Model):
             )
         return fy_info
 
+    @contextmanager
+    def _raise_kernel_errors(self):
+        """Raise the errors of the depreciation kernel as user errors."""
+        try:
+            yield
+        except IllegalMethodError as e:
+            raise UserError(_("Illegal value %s in asset.method.") % e.method) from e
+
     def _compute_depreciation_table(self):
-        table = []
-        if (
-            self.method_time in ["year", "number"]
-            and not self.method_number
-            and not self.method_end
-        ):
-            return table
-        asset_date_start = self.date_start
-        depreciation_start_date = self._get_depreciation_start_date(
-            self._get_fy_info(asset_date_start)["record"]
-        )
-        depreciation_stop_date = self._get_depreciation_stop_date(
-            depreciation_start_date
-        )
-        fy_date_start = asset_date_start
-        while fy_date_start <= depreciation_stop_date:
-            fy_info = self._get_fy_info(fy_date_start)
-            table.append(
-                {
-                    "fy": fy_info["record"],
-                    "date_start": fy_info["date_from"],
-                    "date_stop": fy_info["date_to"],
-                }
-            )
-            fy_date_start = fy_info["date_to"] + relativedelta(days=1)
-        # Step 1:
-        # Calculate depreciation amount per fiscal year.
-        # This is calculation is skipped for method_time != 'year'.
-        line_dates = self._compute_line_dates(
-            table, depreciation_start_date, depreciation_stop_date
-        )
-        table = self._compute_depreciation_amount_per_fiscal_year(
-            table, line_dates, depreciation_start_date, depreciation_stop_date
-        )
-        # Step 2:
-        # Spread depreciation amount per fiscal year
-        # over the depreciation periods.
-        self._compute_depreciation_table_lines(
-            table, depreciation_start_date, depreciation_stop_date, line_dates
-        )
+        self.ensure_one()
+        with self._raise_kernel_errors():
+            return [
+                entry.as_dict()
+                for entry in self._get_depreciation_kernel(
+                    bypass="_compute_depreciation_table"
+                ).compute_table()
+            ]
 
-        return table
+    def _compute_depreciation_schedule(self):
+        """Return the depreciation table with the lines prior to the
+        depreciation start grouped.
+        """
+        self.ensure_one()
+        with self._raise_kernel_errors():
+            return [
+                entry.as_dict()
+                for entry in self._get_depreciation_kernel(
+                    bypass="_compute_depreciation_schedule"
+                ).compute_schedule()
+            ]
+
+    def _compute_depreciation_schedules_parallel(self, processes):
+        """Return the depreciation tables of the assets by asset id, computed
+        by a pool of ``processes`` processes.
+
+        The specifications of the assets and the fiscal years they span are
+        read beforehand and sent serialized to the workers, so that the
+        workers never access the database. The workers are started by a
+        forkserver which only preloads the depreciation kernel, they share
+        no thread, connection or registry with the server: the kernel class
+        returned by ``_get_depreciation_kernel_class`` must be defined at
+        module level, in a module importable by the workers, see
+        ``_board_process_importable``.
+        The number of processes is capped to the number of CPUs.
+        The tables of the assets are not computed when other modules
+        override ``KERNEL_LEGACY_METHODS``, which need the records.
+        """
+        if self._get_overridden_kernel_methods():
+            return {}
+        specs_by_key = defaultdict(list)
+        for asset in self:
+            key = (asset.company_id, asset._get_depreciation_kernel_class())
+            specs_by_key[key].append((asset.id, asset._get_depreciation_spec()))
+        kernel_modules = {compute_serialized_schedules.__module__} | {
+            kernel_class.__module__ for _company, kernel_class in specs_by_key
+        }
+        if not all(map(_board_process_importable, kernel_modules)):
+            _logger.warning(
+                "The depreciation tables are computed in the server process, "
+                "the modules %s cannot be imported by a forkserver.",
+                ", ".join(sorted(kernel_modules)),
+            )
+            return {}
+        tasks = []
+        for (company, kernel_class), asset_specs in specs_by_key.items():
+            fiscal_year_calendar = CompanyFiscalYearCalendar(company)
+            date_from = date_to = None
+            for _asset_id, spec in asset_specs:
+                if not spec.method_number and not spec.method_end:
+                    continue
+                kernel = kernel_class(spec, fiscal_year_calendar)
+                date_stop = kernel.depreciation_stop_date(
+                    kernel.depreciation_start_date(
+                        fiscal_year_calendar.fiscal_year(spec.date_start)
+                    )
+                )
+                date_from = min(date_from or spec.date_start, spec.date_start)
+                date_to = max(date_to or date_stop, date_stop)
+            if date_from is not None:
+                fiscal_year_calendar = fiscal_year_calendar.snapshot(date_from, date_to)
+            calendar_data = fiscal_year_calendar.serialize()
+            for i in range(0, len(asset_specs), BOARD_PROCESS_CHUNK_SIZE):
+                chunk = asset_specs[i : i + BOARD_PROCESS_CHUNK_SIZE]
+                tasks.append(
+                    (
+                        [asset_id for asset_id, _spec in chunk],
+                        kernel_class,
+                        calendar_data,
+                        [spec.serialize() for _asset_id, spec in chunk],
+                    )
+                )
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload([compute_serialized_schedules.__module__])
+        tables = {}
+        with ProcessPoolExecutor(
+            max_workers=min(processes, os.cpu_count() or 1), mp_context=mp_context
+        ) as executor:
+            futures = [
+                (asset_ids, executor.submit(compute_serialized_schedules, *args))
+                for asset_ids, *args in tasks
+            ]
+            for asset_ids, future in futures:
+                try:
+                    schedules = future.result()
+                except IllegalMethodError:
+                    # the tables of the chunk are computed again asset by
+                    # asset by the callers, which report the asset in error
+                    continue
+                for asset_id, schedule in zip(asset_ids, schedules):
+                    tables[asset_id] = [
+                        ScheduleEntry.deserialize(entry).as_dict() for entry in schedule
+                    ]
+        return tables
 
     def _get_depreciation_entry_name(self, seq):
         """use this method to customise the name of the accounting entry"""
@@ -1201,56 +1703,197 @@ class AccountAsset(models.Model):
     def _compute_entries(self, date_end, check_triggers=False):
         # TODO : add ir_cron job calling this method to
         # generate periodical accounting entries
-        result = []
-        error_log = ""
+        if self.env.context.get("asset_dry_run"):
+            return self._simulate_entries(date_end, check_triggers=check_triggers)
         if check_triggers:
-            recompute_obj = self.env["account.asset.recompute.trigger"]
-            recomputes = recompute_obj.sudo().search([("state", "=", "open")])
-            if recomputes:
-                trigger_companies = recomputes.mapped("company_id")
-                for asset in self:
-                    if asset.company_id.id in trigger_companies.ids:
-                        asset.compute_depreciation_board()
+            with compute_phase(self.env, "board"):
+                self.env[
+                    "account.asset.recompute.trigger"
+                ]._recompute_depreciation_boards(self)
 
         depreciations = self.env["account.asset.line"].search(
-            [
-                ("asset_id", "in", self.ids),
-                ("type", "=", "depreciate"),
-                ("init_entry", "=", False),
-                ("line_date", "<=", date_end),
-                ("move_check", "=", False),
-            ],
-            order="line_date",
+            self._get_due_depreciation_lines_domain(date_end), order="line_date"
+        )
+        consolidated = depreciations.filtered(
+            lambda l: l.asset_id.profile_id.consolidated_posting
         )
+        depreciations -= consolidated
+        result, error_log = self._create_depreciation_moves_consolidated(consolidated)
+        if self.env.context.get("asset_bulk_posting"):
+            moves_result = self._create_depreciation_moves_bulk(depreciations)
+        else:
+            moves_result = self._create_depreciation_moves(depreciations)
+        result += moves_result[0]
+        error_log += moves_result[1]
+        with compute_phase(self.env, "flush"):
+            self.env.flush_all()
+
+        return (result, error_log)
+
+    def _simulate_entries(self, date_end, check_triggers=False):
+        """Dry run of ``_compute_entries``: the depreciation boards are
+        recomputed and the entries prepared, then everything is rolled back.
+
+        :return: tuple with the summary of the entries that would be created,
+            see ``_simulate_depreciation_moves``, and the error log.
+        """
+        with self.env.cr.savepoint() as savepoint:
+            if check_triggers:
+                with compute_phase(self.env, "board"):
+                    self.env[
+                        "account.asset.recompute.trigger"
+                    ]._recompute_depreciation_boards(self)
+            depreciations = self.env["account.asset.line"].search(
+                self._get_due_depreciation_lines_domain(date_end), order="line_date"
+            )
+            with compute_phase(self.env, "moves", count=len(depreciations)):
+                result = self._simulate_depreciation_moves(depreciations)
+            savepoint.rollback()
+        return result
+
+    def _get_due_depreciation_lines_domain(self, date_end):
+        return [
+            ("asset_id", "in", self.ids),
+            ("type", "=", "depreciate"),
+            ("init_entry", "=", False),
+            ("line_date", "<=", date_end),
+            ("move_id", "=", False),
+        ]
+
+    def _create_depreciation_moves(self, depreciations):
+        """Post the depreciation lines one by one, each in its own savepoint.
+
+        :return: tuple with the created move ids and the error log.
+        """
+        result = []
+        error_log = ""
         for depreciation in depreciations:
             try:
                 with self.env.cr.savepoint():
                     result += depreciation.create_move()
             except Exception:
-                e = exc_info()[0]
-                tb = "".join(format_exception(*exc_info()))
-                asset_ref = depreciation.asset_id.name
-                if depreciation.asset_id.code:
-                    asset_ref = "[{}] {}".format(depreciation.asset_id.code, asset_ref)
-                error_log += _(
-                    "\nError while processing asset '{ref}': {exception}"
-                ).format(ref=asset_ref, exception=str(e))
-                error_msg = _("Error while processing asset '{ref}': \n\n{tb}").format(
-                    ref=asset_ref, tb=tb
+                error_log += self._get_depreciation_error(depreciation)
+        return result, error_log
+
+    def _create_depreciation_moves_consolidated(self, depreciations):
+        """Post the depreciation lines of the profiles with consolidated
+        entries, one entry per profile, journal and date.
+
+        When the entry of a group fails, its lines are posted one by one so
+        that the failing assets end up in the error log.
+
+        :return: tuple with the created move ids and the error log.
+        """
+        result = []
+        error_log = ""
+        for lines in depreciations._group_by_consolidated_move():
+            try:
+                with self.env.cr.savepoint():
+                    result += lines._create_consolidated_moves()
+            except Exception:
+                _logger.info(
+                    "%s, consolidated posting of %s depreciation lines failed, "
+                    "posting them one by one",
+                    self._name,
+                    len(lines),
                 )
-                _logger.error("%s, %s", self._name, error_msg)
-
-        if check_triggers and recomputes:
-            companies = recomputes.mapped("company_id")
-            triggers = recomputes.filtered(lambda r: r.company_id.id in companies.ids)
-            if triggers:
-                recompute_vals = {
-                    "date_completed": fields.Datetime.now(),
-                    "state": "done",
-                }
-                triggers.sudo().write(recompute_vals)
+                lines_result, lines_error_log = self._create_depreciation_moves(lines)
+                result += lines_result
+                error_log += lines_error_log
+        return result, error_log
+
+    def _simulate_depreciation_moves(self, depreciations):
+        """Prepare the entries of the depreciation lines without creating
+        them.
+
+        :return: tuple with the summary of the entries and the error log. The
+            summary holds the number of entries (``move_count``), the number
+            of entries and their amount per journal id (``journal_totals``)
+            and the debit and credit per account id (``account_totals``).
+        """
+        summary = {
+            "move_count": 0,
+            "journal_totals": defaultdict(lambda: {"move_count": 0, "amount": 0.0}),
+            "account_totals": defaultdict(lambda: {"debit": 0.0, "credit": 0.0}),
+        }
+        error_log = ""
+        moves_vals = []
+        consolidated_ids = []
+        for depreciation in depreciations:
+            try:
+                move_vals = depreciation._prepare_move_vals()
+                depreciation._check_move_vals(move_vals)
+            except Exception:
+                error_log += self._get_depreciation_error(depreciation)
+                continue
+            if depreciation.asset_id.profile_id.consolidated_posting:
+                consolidated_ids.append(depreciation.id)
+            else:
+                moves_vals.append(move_vals)
+        consolidated = self.env["account.asset.line"].browse(consolidated_ids)
+        moves_vals += [
+            lines._prepare_consolidated_move_vals()
+            for lines in consolidated._group_by_consolidated_move()
+        ]
+        for move_vals in moves_vals:
+            summary["move_count"] += 1
+            journal_totals = summary["journal_totals"][move_vals["journal_id"]]
+            journal_totals["move_count"] += 1
+            for _command, _id, aml_vals in move_vals["line_ids"]:
+                account_totals = summary["account_totals"][aml_vals["account_id"]]
+                account_totals["debit"] += aml_vals["debit"]
+                account_totals["credit"] += aml_vals["credit"]
+                journal_totals["amount"] += aml_vals["debit"]
+        summary["journal_totals"] = dict(summary["journal_totals"])
+        summary["account_totals"] = dict(summary["account_totals"])
+        return summary, error_log
+
+    def _get_depreciation_error(self, depreciation):
+        """Log the exception being handled for a depreciation line and
+        return its line of the error log."""
+        e = exc_info()[0]
+        tb = "".join(format_exception(*exc_info()))
+        asset_ref = depreciation.asset_id.name
+        if depreciation.asset_id.code:
+            asset_ref = "[{}] {}".format(depreciation.asset_id.code, asset_ref)
+        error_msg = _("Error while processing asset '{ref}': \n\n{tb}").format(
+            ref=asset_ref, tb=tb
+        )
+        _logger.error("%s, %s", self._name, error_msg)
+        return _("\nError while processing asset '{ref}': {exception}").format(
+            ref=asset_ref, exception=str(e)
+        )
 
-        return (result, error_log)
+    def _create_depreciation_moves_bulk(self, depreciations):
+        """Post the depreciation lines by chunks.
+
+        The entries of a chunk are created with a single ``create`` and posted
+        with a single ``action_post``. When a chunk fails, its lines are posted
+        one by one so that the failing assets end up in the error log.
+
+        :return: tuple with the created move ids and the error log.
+        """
+        result = []
+        error_log = ""
+        chunk_size = self.env.context.get(
+            "asset_posting_chunk_size", POSTING_CHUNK_SIZE
+        )
+        for i in range(0, len(depreciations), chunk_size):
+            chunk = depreciations[i : i + chunk_size]
+            try:
+                with self.env.cr.savepoint():
+                    result += chunk._create_moves_batch()
+            except Exception:
+                _logger.info(
+                    "%s, bulk posting of %s depreciation lines failed, "
+                    "posting them one by one",
+                    self._name,
+                    len(chunk),
+                )
+                chunk_result, chunk_error_log = self._create_depreciation_moves(chunk)
+                result += chunk_result
+                error_log += chunk_error_log
+        return result, error_log
 
     @api.model
     def _xls_acquisition_fields(self):
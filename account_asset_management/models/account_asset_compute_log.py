@@ -0,0 +1,91 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountAssetComputeLog(models.Model):
+    _name = "account.asset.compute.log"
+    _description = "Asset compute run"
+    _order = "create_date desc, id desc"
+
+    date_end = fields.Date(string="Date", readonly=True)
+    dry_run = fields.Boolean(string="Simulation", readonly=True)
+    move_count = fields.Integer(string="Entries", readonly=True)
+    error_count = fields.Integer(string="Errors", readonly=True)
+    error_log = fields.Text(readonly=True)
+    duration = fields.Float(string="Duration (s)", readonly=True)
+    query_count = fields.Integer(string="Queries", readonly=True)
+    phase_ids = fields.One2many(
+        comodel_name="account.asset.compute.log.phase",
+        inverse_name="log_id",
+        string="Phases",
+        readonly=True,
+    )
+
+    @api.model
+    def _create_from_metrics(self, metrics, date_end, move_count, error_log, dry_run):
+        """Store the metrics of an asset compute run and log them."""
+        log = self.create(
+            {
+                "date_end": date_end,
+                "dry_run": dry_run,
+                "move_count": move_count,
+                "error_count": error_log.count("\n"),
+                "error_log": error_log,
+                "duration": metrics.duration(),
+                "query_count": metrics.query_count(),
+                "phase_ids": [
+                    (0, 0, dict(values, phase=phase))
+                    for phase, values in metrics.phases.items()
+                ],
+            }
+        )
+        _logger.info(
+            "%s, asset compute run to %s: %s entries, %s errors, %.2fs, "
+            "%s queries, phases: %s",
+            self._name,
+            date_end,
+            move_count,
+            log.error_count,
+            log.duration,
+            log.query_count,
+            ", ".join(
+                "{} {}x {:.2f}s {}q".format(
+                    phase.phase, phase.count, phase.duration, phase.query_count
+                )
+                for phase in log.phase_ids
+            ),
+        )
+        return log
+
+
+class AccountAssetComputeLogPhase(models.Model):
+    _name = "account.asset.compute.log.phase"
+    _description = "Asset compute run phase"
+    _order = "log_id, id"
+
+    log_id = fields.Many2one(
+        comodel_name="account.asset.compute.log",
+        string="Run",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    phase = fields.Selection(
+        selection=[
+            ("board", "Depreciation Boards"),
+            ("values", "Depreciation Values"),
+            ("moves", "Entry Creation"),
+            ("post", "Entry Posting"),
+            ("flush", "Recompute and Flush"),
+        ],
+        required=True,
+        readonly=True,
+    )
+    count = fields.Integer(readonly=True)
+    duration = fields.Float(string="Duration (s)", readonly=True)
+    query_count = fields.Integer(string="Queries", readonly=True)
@@ -2,8 +2,24 @@
 # Copyright 2021 Tecnativa - João Marques
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
+from odoo.tools.misc import format_date
+from odoo.tools.sql import create_index
+
+from ..tools.compute_metrics import compute_phase
+
+# Fields of the depreciation lines stored in the asset snapshots
+SNAPSHOT_LINE_FIELDS = {
+    "asset_id",
+    "line_date",
+    "type",
+    "amount",
+    "move_id",
+    "init_entry",
+}
 
 
 class AccountAssetLine(models.Model):
@@ -52,6 +68,7 @@ class AccountAssetLine(models.Model):
         string="Depreciation Entry",
         readonly=True,
         check_company=True,
+        index="btree_not_null",
     )
     move_check = fields.Boolean(
         compute="_compute_move_check", string="Posted", store=True
@@ -75,39 +92,110 @@ class AccountAssetLine(models.Model):
         related="asset_id.company_id.currency_id", store=True, string="Company Currency"
     )
 
+    def init(self):
+        super().init()
+        # Lines of an asset by type and date, e.g. the last posted
+        # depreciation or the creation line of the removal wizard
+        create_index(
+            self._cr,
+            "account_asset_line_asset_type_date_index",
+            self._table,
+            ["asset_id", "type", "line_date"],
+        )
+        # Depreciations without entry, read by the board computation and
+        # by the posting of the due depreciations
+        create_index(
+            self._cr,
+            "account_asset_line_unposted_index",
+            self._table,
+            ["asset_id", "line_date"],
+            where="type = 'depreciate' AND move_id IS NULL",
+        )
+
     @api.depends("amount", "previous_id", "type")
     def _compute_values(self):
-        self.depreciated_value = 0.0
-        self.remaining_value = 0.0
-        dlines = self
-        if self.env.context.get("no_compute_asset_line_ids"):
-            # skip compute for lines in unlink
-            exclude_ids = self.env.context["no_compute_asset_line_ids"]
-            dlines = self.filtered(lambda l: l.id not in exclude_ids)
-        dlines = dlines.filtered(lambda l: l.type == "depreciate")
-        dlines = dlines.sorted(key=lambda l: l.line_date)
-        # Give value 0 to the lines that are not going to be calculated
-        # to avoid cache miss error
-        all_excluded_lines = self - dlines
-        all_excluded_lines.depreciated_value = 0
-        all_excluded_lines.remaining_value = 0
-        # Group depreciation lines per asset
-        asset_ids = dlines.mapped("asset_id")
-        grouped_dlines = []
-        for asset in asset_ids:
-            grouped_dlines.append(dlines.filtered(lambda l: l.asset_id.id == asset.id))
-        for dlines in grouped_dlines:
-            for i, dl in enumerate(dlines):
-                if i == 0:
-                    depreciation_base = dl.depreciation_base
-                    tmp = depreciation_base - dl.previous_id.remaining_value
-                    depreciated_value = dl.previous_id and tmp or 0.0
-                    remaining_value = depreciation_base - depreciated_value - dl.amount
-                else:
-                    depreciated_value += dl.previous_id.amount
-                    remaining_value -= dl.amount
-                dl.depreciated_value = depreciated_value
-                dl.remaining_value = remaining_value
+        with compute_phase(self.env, "values", count=len(self)):
+            self.depreciated_value = 0.0
+            self.remaining_value = 0.0
+            dlines = self
+            if self.env.context.get("no_compute_asset_line_ids"):
+                # skip compute for lines in unlink
+                exclude_ids = set(self.env.context["no_compute_asset_line_ids"])
+                dlines = self.filtered(lambda l: l.id not in exclude_ids)
+            dlines = dlines.filtered(lambda l: l.type == "depreciate")
+            dlines = dlines.sorted(key=lambda l: l.line_date)
+            # Give value 0 to the lines that are not going to be calculated
+            # to avoid cache miss error
+            all_excluded_lines = self - dlines
+            all_excluded_lines.depreciated_value = 0
+            all_excluded_lines.remaining_value = 0
+            # Group depreciation lines per asset, keeping them sorted by date
+            grouped_dlines = defaultdict(list)
+            for dl in dlines:
+                grouped_dlines[dl.asset_id.id].append(dl)
+            for asset_dlines in grouped_dlines.values():
+                previous = None
+                depreciated_value = remaining_value = 0.0
+                for dl in asset_dlines:
+                    if previous is not None and dl.previous_id.id == previous.id:
+                        depreciated_value += previous.amount
+                        remaining_value -= dl.amount
+                    else:
+                        # start of a chain: continue from the stored values
+                        # of the previous line, if any
+                        depreciation_base = dl.depreciation_base
+                        tmp = depreciation_base - dl.previous_id.remaining_value
+                        depreciated_value = dl.previous_id and tmp or 0.0
+                        remaining_value = (
+                            depreciation_base - depreciated_value - dl.amount
+                        )
+                    dl.depreciated_value = depreciated_value
+                    dl.remaining_value = remaining_value
+                    previous = dl
+
+    @api.model
+    def _recompute_values_sql(self, asset_ids):
+        """Recompute the stored depreciated and remaining values of all the
+        depreciation lines of the given assets with a single query.
+
+        The values are cumulated with a window function over the lines of
+        each asset sorted by date, so that large tables can be recomputed
+        without loading the lines, e.g. after a data migration.
+        """
+        if not asset_ids:
+            return
+        self.env["account.asset"].flush_model(["depreciation_base"])
+        self.flush_model(["amount", "asset_id", "line_date", "type"])
+        self.env.cr.execute(
+            """
+            UPDATE account_asset_line AS line
+            SET depreciated_value = value.depreciated_value,
+                remaining_value = value.remaining_value
+            FROM (
+                SELECT dl.id,
+                    SUM(dl.amount) OVER w - dl.amount AS depreciated_value,
+                    asset.depreciation_base - SUM(dl.amount) OVER w
+                        AS remaining_value
+                FROM account_asset_line AS dl
+                JOIN account_asset AS asset ON asset.id = dl.asset_id
+                WHERE dl.type = 'depreciate' AND dl.asset_id IN %s
+                WINDOW w AS (
+                    PARTITION BY dl.asset_id ORDER BY dl.line_date, dl.id
+                    ROWS UNBOUNDED PRECEDING
+                )
+            ) AS value
+            WHERE line.id = value.id
+                AND (
+                    line.depreciated_value IS DISTINCT FROM value.depreciated_value
+                    OR line.remaining_value IS DISTINCT FROM value.remaining_value
+                )
+            """,
+            (tuple(asset_ids),),
+        )
+        self.invalidate_model(["depreciated_value", "remaining_value"])
+        self.env["account.asset.snapshot"]._mark_stale(
+            (asset_id, False) for asset_id in asset_ids
+        )
 
     @api.depends("move_id")
     def _compute_move_check(self):
@@ -121,10 +209,20 @@ class AccountAssetLine(models.Model):
                 self.depreciation_base - self.depreciated_value - self.amount
             )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._mark_snapshots_stale()
+        return lines
+
     def write(self, vals):
+        boundaries = {}
+        if list(vals.keys()) not in (["move_id"], ["asset_id"]) and (
+            vals.get("init_entry") or vals.get("line_date")
+        ):
+            boundaries = self.asset_id._get_posted_line_boundaries()
         for dl in self:
-            line_date = vals.get("line_date") or dl.line_date
-            asset_lines = dl.asset_id.depreciation_line_ids
+            line_date = fields.Date.to_date(vals.get("line_date")) or dl.line_date
             if list(vals.keys()) == ["move_id"] and not vals["move_id"]:
                 # allow to remove an accounting entry via the
                 # 'Delete Move' button on the depreciation lines.
@@ -150,12 +248,8 @@ class AccountAssetLine(models.Model):
                     )
                 )
             elif vals.get("init_entry"):
-                check = asset_lines.filtered(
-                    lambda l: l.move_check
-                    and l.type == "depreciate"
-                    and l.line_date <= line_date
-                )
-                if check:
+                first_posted_date = boundaries[dl.asset_id.id]["first_posted_date"]
+                if first_posted_date and first_posted_date <= line_date:
                     raise UserError(
                         _(
                             "You cannot set the 'Initial Balance Entry' flag "
@@ -164,13 +258,10 @@ class AccountAssetLine(models.Model):
                         )
                     )
             elif vals.get("line_date"):
+                asset_boundaries = boundaries[dl.asset_id.id]
                 if dl.type == "create":
-                    check = asset_lines.filtered(
-                        lambda l: l.type != "create"
-                        and (l.init_entry or l.move_check)
-                        and l.line_date < fields.Date.to_date(vals["line_date"])
-                    )
-                    if check:
+                    first_date = asset_boundaries["first_date"]
+                    if first_date and first_date < line_date:
                         raise UserError(
                             _(
                                 "You cannot set the Asset Start Date "
@@ -178,18 +269,23 @@ class AccountAssetLine(models.Model):
                             )
                         )
                 else:
-                    check = asset_lines.filtered(
-                        lambda al: al != dl
-                        and (al.init_entry or al.move_check)
-                        and al.line_date > fields.Date.to_date(vals["line_date"])
-                    )
-                    if check:
+                    last_dates = [
+                        last_date
+                        for last_id, last_date in asset_boundaries["last_lines"]
+                        if last_id != dl.id
+                    ]
+                    if last_dates and last_dates[0] > line_date:
                         raise UserError(
                             _(
                                 "You cannot set the date on a depreciation line "
                                 "prior to already posted entries."
                             )
                         )
+        if SNAPSHOT_LINE_FIELDS.intersection(vals):
+            self._mark_snapshots_stale()
+            res = super().write(vals)
+            self._mark_snapshots_stale()
+            return res
         return super().write(vals)
 
     def unlink(self):
@@ -205,16 +301,67 @@ class AccountAssetLine(models.Model):
                         "an associated accounting entry."
                     )
                 )
-            previous = dl.previous_id
-            next_line = dl.asset_id.depreciation_line_ids.filtered(
-                lambda l: l.previous_id == dl and l not in self
-            )
-            if next_line:
-                next_line.previous_id = previous
+        # Link the lines following the removed lines to the first
+        # remaining line before them
+        next_lines = self.search(
+            [("previous_id", "in", self.ids), ("id", "not in", self.ids)]
+        )
+        next_lines_by_previous = defaultdict(lambda: self.browse())
+        for next_line in next_lines:
+            previous = next_line.previous_id
+            while previous in self:
+                previous = previous.previous_id
+            next_lines_by_previous[previous] |= next_line
+        for previous, lines in next_lines_by_previous.items():
+            lines.previous_id = previous
+        self._mark_snapshots_stale()
         return super(
             AccountAssetLine, self.with_context(no_compute_asset_line_ids=self.ids)
         ).unlink()
 
+    def _link_previous_lines(self):
+        """Set ``previous_id`` on the depreciation lines in ``self`` to the
+        depreciation line preceding them in the table of their asset.
+
+        This is done with a single query so that depreciation lines can be
+        created in batch without knowing the ids of their predecessors.
+        """
+        lines = self.filtered(lambda l: l.type == "depreciate")
+        if not lines:
+            return
+        self.flush_model(["asset_id", "line_date", "previous_id", "type"])
+        self.env.cr.execute(
+            """
+            UPDATE account_asset_line AS line
+            SET previous_id = chain.previous_id
+            FROM (
+                SELECT id, LAG(id) OVER (
+                    PARTITION BY asset_id ORDER BY line_date, id
+                ) AS previous_id
+                FROM account_asset_line
+                WHERE type = 'depreciate' AND asset_id IN %(asset_ids)s
+            ) AS chain
+            WHERE line.id = chain.id
+                AND line.id IN %(line_ids)s
+                AND line.previous_id IS DISTINCT FROM chain.previous_id
+            RETURNING line.id
+            """,
+            {
+                "asset_ids": tuple(lines.asset_id.ids),
+                "line_ids": tuple(lines.ids),
+            },
+        )
+        updated = self.browse([row[0] for row in self.env.cr.fetchall()])
+        updated.invalidate_recordset(["previous_id"])
+        updated.modified(["previous_id"])
+
+    def _mark_snapshots_stale(self):
+        """Mark the snapshots of the assets of the lines as stale from the
+        dates of the lines onward."""
+        self.env["account.asset.snapshot"]._mark_stale(
+            (line.asset_id.id, line.line_date) for line in self
+        )
+
     def _setup_move_data(self, depreciation_date):
         asset = self.asset_id
         move_data = {
@@ -253,35 +400,193 @@ class AccountAssetLine(models.Model):
         }
         return move_line_data
 
+    def _prepare_move_vals(self):
+        """Prepare the values of the depreciation entry of the line,
+        journal items included."""
+        self.ensure_one()
+        profile = self.asset_id.profile_id
+        depreciation_date = self.line_date
+        move = self.env["account.move"]
+        move_vals = self._setup_move_data(depreciation_date)
+        move_vals["line_ids"] = []
+        for account, ml_type in (
+            (profile.account_depreciation_id, "depreciation"),
+            (profile.account_expense_depreciation_id, "expense"),
+        ):
+            aml_vals = self._setup_move_line_data(
+                depreciation_date, account, ml_type, move
+            )
+            aml_vals.pop("move_id")
+            move_vals["line_ids"].append((0, 0, aml_vals))
+        return move_vals
+
+    def _group_by_consolidated_move(self):
+        """Return the lines grouped by the consolidated entry of their
+        depreciations: one entry per profile, journal and date."""
+        groups = defaultdict(list)
+        for line in self:
+            profile = line.asset_id.profile_id
+            groups[(profile.id, profile.journal_id.id, line.line_date)].append(line.id)
+        return [self.browse(line_ids) for line_ids in groups.values()]
+
+    def _prepare_consolidated_move_vals(self):
+        """Prepare the values of the consolidated entry of the lines, which
+        share their profile, journal and date, with one depreciation line and
+        one expense line per analytic distribution."""
+        line = self[0]
+        profile = line.asset_id.profile_id
+        currency = line.company_id.currency_id
+        depreciation_date = line.line_date
+        move_vals = line._setup_move_data(depreciation_date)
+        move_vals["ref"] = "{} - {}".format(
+            profile.name, format_date(self.env, depreciation_date)
+        )
+        amounts = defaultdict(float)
+        distributions = {}
+        for dl in self:
+            distribution = dl.asset_id.analytic_distribution or {}
+            distribution_key = tuple(sorted(distribution.items()))
+            distributions[distribution_key] = dl.asset_id.analytic_distribution
+            amounts[distribution_key] += dl.amount
+        move_vals["line_ids"] = []
+        for distribution_key, amount in amounts.items():
+            amount = currency.round(amount)
+            amount_comp = currency.compare_amounts(amount, 0)
+            aml_vals = {
+                "name": move_vals["ref"],
+                "journal_id": profile.journal_id.id,
+                "date": depreciation_date,
+            }
+            move_vals["line_ids"] += [
+                (
+                    0,
+                    0,
+                    dict(
+                        aml_vals,
+                        account_id=profile.account_depreciation_id.id,
+                        debit=amount_comp < 0 and -amount or 0.0,
+                        credit=amount_comp > 0 and amount or 0.0,
+                        analytic_distribution=False,
+                    ),
+                ),
+                (
+                    0,
+                    0,
+                    dict(
+                        aml_vals,
+                        account_id=profile.account_expense_depreciation_id.id,
+                        debit=amount_comp > 0 and amount or 0.0,
+                        credit=amount_comp < 0 and -amount or 0.0,
+                        analytic_distribution=distributions[distribution_key],
+                    ),
+                ),
+            ]
+        return move_vals
+
+    def _create_consolidated_moves(self):
+        """Create and post the consolidated entries of the lines, see
+        ``_group_by_consolidated_move``. Every line is linked to the entry of
+        its group.
+
+        :return: list of the created move ids.
+        """
+        if not self:
+            return []
+        groups = self._group_by_consolidated_move()
+        ctx = dict(self.env.context, allow_asset=True, check_move_validity=False)
+        with compute_phase(self.env, "moves", count=len(groups)):
+            moves = (
+                self.env["account.move"]
+                .with_context(**ctx)
+                .create([lines._prepare_consolidated_move_vals() for lines in groups])
+            )
+        with compute_phase(self.env, "post", count=len(moves)):
+            moves.action_post()
+        for lines, move in zip(groups, moves):
+            lines.with_context(allow_asset_line_update=True).write({"move_id": move.id})
+        # we re-evaluate the assets to determine if we can close them
+        self._close_depreciated_assets()
+        return moves.ids
+
+    def _check_move_vals(self, move_vals):
+        """Check the values of the depreciation entry of the line prepared by
+        ``_prepare_move_vals`` as the posting of the entry would."""
+        self.ensure_one()
+        if not move_vals["journal_id"]:
+            raise UserError(
+                _("The profile of asset '%s' has no journal.") % self.asset_id.name
+            )
+        accounts = self.env["account.account"].browse(
+            [aml_vals["account_id"] for _c, _i, aml_vals in move_vals["line_ids"]]
+        )
+        if not all(accounts.ids) or accounts.filtered("deprecated"):
+            raise UserError(
+                _("The profile of asset '%s' has a missing or deprecated account.")
+                % self.asset_id.name
+            )
+        lock_date = self.company_id._get_user_fiscal_lock_date()
+        if move_vals["date"] <= lock_date:
+            raise UserError(
+                _("The depreciation date %(date)s is prior to the lock date %(lock)s.")
+                % {"date": move_vals["date"], "lock": lock_date}
+            )
+
+    def _close_depreciated_assets(self):
+        """Close the assets of the lines that are fully depreciated."""
+        for asset in self.mapped("asset_id"):
+            if asset.currency_id.is_zero(asset.value_residual):
+                asset.state = "close"
+
     def create_move(self):
         created_move_ids = []
-        asset_ids = set()
         ctx = dict(self.env.context, allow_asset=True, check_move_validity=False)
         for line in self:
             asset = line.asset_id
             depreciation_date = line.line_date
             am_vals = line._setup_move_data(depreciation_date)
-            move = self.env["account.move"].with_context(**ctx).create(am_vals)
-            depr_acc = asset.profile_id.account_depreciation_id
-            exp_acc = asset.profile_id.account_expense_depreciation_id
-            aml_d_vals = line._setup_move_line_data(
-                depreciation_date, depr_acc, "depreciation", move
-            )
-            self.env["account.move.line"].with_context(**ctx).create(aml_d_vals)
-            aml_e_vals = line._setup_move_line_data(
-                depreciation_date, exp_acc, "expense", move
-            )
-            self.env["account.move.line"].with_context(**ctx).create(aml_e_vals)
-            move.action_post()
+            with compute_phase(self.env, "moves", count=1):
+                move = self.env["account.move"].with_context(**ctx).create(am_vals)
+                depr_acc = asset.profile_id.account_depreciation_id
+                exp_acc = asset.profile_id.account_expense_depreciation_id
+                aml_d_vals = line._setup_move_line_data(
+                    depreciation_date, depr_acc, "depreciation", move
+                )
+                self.env["account.move.line"].with_context(**ctx).create(aml_d_vals)
+                aml_e_vals = line._setup_move_line_data(
+                    depreciation_date, exp_acc, "expense", move
+                )
+                self.env["account.move.line"].with_context(**ctx).create(aml_e_vals)
+            with compute_phase(self.env, "post", count=1):
+                move.action_post()
             line.with_context(allow_asset_line_update=True).write({"move_id": move.id})
             created_move_ids.append(move.id)
-            asset_ids.add(asset.id)
         # we re-evaluate the assets to determine if we can close them
-        for asset in self.env["account.asset"].browse(list(asset_ids)):
-            if asset.currency_id.is_zero(asset.value_residual):
-                asset.state = "close"
+        self._close_depreciated_assets()
         return created_move_ids
 
+    def _create_moves_batch(self):
+        """Create the depreciation entries of all the lines in ``self`` with
+        a single ``create`` and post them with a single ``action_post``.
+
+        :return: list of the created move ids, in the order of ``self``.
+        """
+        if not self:
+            return []
+        ctx = dict(self.env.context, allow_asset=True, check_move_validity=False)
+        with compute_phase(self.env, "moves", count=len(self)):
+            moves = (
+                self.env["account.move"]
+                .with_context(**ctx)
+                .create([line._prepare_move_vals() for line in self])
+            )
+        with compute_phase(self.env, "post", count=len(moves)):
+            moves.action_post()
+        for line, move in zip(self, moves):
+            line.with_context(allow_asset_line_update=True).write({"move_id": move.id})
+        # we re-evaluate the assets to determine if we can close them
+        self._close_depreciated_assets()
+        return moves.ids
+
     def open_move(self):
         self.ensure_one()
         return {
@@ -323,9 +628,12 @@ class AccountAssetLine(models.Model):
                 }
             else:
                 move = line.move_id
+                # a consolidated entry is linked to the lines of several assets
+                asset_lines = move.asset_line_ids
                 move.button_draft()
                 move.with_context(force_delete=True, unlink_from_asset=True).unlink()
-                line.with_context(
-                    unlink_from_asset=True
-                ).update_asset_line_after_unlink_move()
+                for asset_line in asset_lines:
+                    asset_line.with_context(
+                        unlink_from_asset=True
+                    ).update_asset_line_after_unlink_move()
         return True
@@ -163,6 +163,12 @@ class AccountAssetProfile(models.Model):
         "posted depreciation line will prompt the option to reverse the "
         "journal entry, instead of deleting them.",
     )
+    consolidated_posting = fields.Boolean(
+        string="Consolidated Entries",
+        help="Post the depreciations of the assets of this profile in one "
+        "journal entry per date, with one expense and one depreciation line "
+        "per analytic distribution, instead of one entry per asset.",
+    )
 
     @api.model
     def _default_company_id(self):
@@ -1,7 +1,8 @@
 # Copyright 2009-2018 Noviat
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
+from odoo.tools import split_every
 
 
 class AccountAssetRecomputeTrigger(models.Model):
@@ -10,6 +11,31 @@ class AccountAssetRecomputeTrigger(models.Model):
 
     reason = fields.Char(required=True)
     company_id = fields.Many2one("res.company", string="Company", required=True)
+    date_from = fields.Date(
+        "Changed Period Start",
+        readonly=True,
+        help="Only the assets with depreciation lines after this date are "
+        "recomputed. Leave empty for no lower bound.",
+    )
+    date_to = fields.Date(
+        "Changed Period End",
+        readonly=True,
+        help="Only the assets starting before this date are recomputed. "
+        "Leave empty for no upper bound.",
+    )
+    profile_ids = fields.Many2many(
+        comodel_name="account.asset.profile",
+        string="Asset Profiles",
+        readonly=True,
+        help="Only the assets of these profiles are recomputed. "
+        "Leave empty for all profiles.",
+    )
+    asset_ids = fields.Many2many(
+        comodel_name="account.asset",
+        string="Assets",
+        readonly=True,
+        help="Only these assets are recomputed. Leave empty for all assets.",
+    )
     date_trigger = fields.Datetime(
         "Trigger Date",
         readonly=True,
@@ -21,3 +47,77 @@ class AccountAssetRecomputeTrigger(models.Model):
         default="open",
         readonly=True,
     )
+
+    @api.model
+    def _recompute_depreciation_boards(self, assets=None, chunk_size=1000):
+        """Recompute the depreciation boards in the scope of the open
+        triggers and set these triggers done.
+
+        :param assets: restrict the recompute to these assets, all the
+            running assets by default.
+        :return: the processed triggers
+        """
+        triggers = self.sudo().search([("state", "=", "open")])
+        if not triggers:
+            return triggers
+        asset_ids = triggers._get_triggered_asset_ids(assets)
+        if assets is None:
+            assets = self.env["account.asset"]
+        for ids in split_every(chunk_size, asset_ids):
+            assets.browse(ids).compute_depreciation_board()
+        triggers._set_done()
+        return triggers
+
+    def _get_asset_domain(self):
+        self.ensure_one()
+        domain = [("company_id", "=", self.company_id.id)]
+        if self.profile_ids:
+            domain.append(("profile_id", "in", self.profile_ids.ids))
+        if self.asset_ids:
+            domain.append(("id", "in", self.asset_ids.ids))
+        if self.date_to:
+            domain.append(("date_start", "<=", self.date_to))
+        return domain
+
+    def _get_triggered_asset_ids(self, assets=None):
+        """Return the ids of the assets whose depreciation board crosses the
+        scope of the triggers, sorted.
+        """
+        asset_ids = set()
+        for trigger in self:
+            domain = trigger._get_asset_domain()
+            if assets is None:
+                domain.append(("state", "=", "open"))
+            else:
+                domain.append(("id", "in", assets.ids))
+            ids = self.env["account.asset"].search(domain).ids
+            if trigger.date_from:
+                ids = trigger._filter_asset_ids_after(ids, trigger.date_from)
+            asset_ids.update(ids)
+        return sorted(asset_ids)
+
+    def _filter_asset_ids_after(self, asset_ids, date_from):
+        """Keep the assets without board or with depreciation lines from
+        ``date_from`` on.
+        """
+        if not asset_ids:
+            return asset_ids
+        self.env["account.asset.line"].flush_model(["asset_id", "line_date", "type"])
+        self.env.cr.execute(
+            """
+            SELECT asset_id, MAX(line_date)
+            FROM account_asset_line
+            WHERE asset_id IN %s AND type = 'depreciate'
+            GROUP BY asset_id
+            """,
+            (tuple(asset_ids),),
+        )
+        last_dates = dict(self.env.cr.fetchall())
+        return [
+            asset_id
+            for asset_id in asset_ids
+            if asset_id not in last_dates or last_dates[asset_id] >= date_from
+        ]
+
+    def _set_done(self):
+        self.write({"date_completed": fields.Datetime.now(), "state": "done"})
@@ -0,0 +1,219 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from datetime import date
+
+from odoo import api, fields, models
+
+# key of the snapshots to refresh in the precommit data of the cursor
+STALE_SNAPSHOTS_KEY = "account.asset.snapshot.stale"
+
+
+class AccountAssetSnapshot(models.Model):
+    """Values of an asset at the end of each of its depreciation periods.
+
+    The snapshots are materialized from the depreciation lines so that the
+    reports read the values of the assets at a date without scanning their
+    depreciation lines. The changes of the lines and of the assets mark the
+    snapshots from the changed date onward as stale with ``_mark_stale``;
+    the stale snapshots of the transaction are refreshed together before
+    the commit, or before the snapshots are read.
+    """
+
+    _name = "account.asset.snapshot"
+    _description = "Asset Register Snapshot"
+    _order = "date desc, asset_id"
+
+    asset_id = fields.Many2one(
+        comodel_name="account.asset",
+        string="Asset",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+        index=True,
+    )
+    line_id = fields.Many2one(
+        comodel_name="account.asset.line",
+        string="Depreciation Line",
+        readonly=True,
+        ondelete="cascade",
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+    )
+    currency_id = fields.Many2one(
+        comodel_name="res.currency",
+        string="Company Currency",
+        required=True,
+        readonly=True,
+    )
+    date = fields.Date(string="Period End", required=True, readonly=True, index=True)
+    type = fields.Selection(
+        selection=[("depreciate", "Depreciation"), ("remove", "Asset Removal")],
+        required=True,
+        readonly=True,
+    )
+    depreciated_value = fields.Monetary(readonly=True)
+    value_residual = fields.Monetary(string="Residual Value", readonly=True)
+    posted = fields.Boolean(
+        readonly=True,
+        help="The depreciation of the period is posted or is part of the "
+        "initial balance.",
+    )
+    state = fields.Selection(
+        selection=[
+            ("draft", "Draft"),
+            ("open", "Running"),
+            ("close", "Close"),
+            ("removed", "Removed"),
+        ],
+        string="Status",
+        required=True,
+        readonly=True,
+        help="Status of the asset at the end of the period.",
+    )
+
+    @api.model
+    def _mark_stale(self, asset_dates):
+        """Mark the snapshots of the assets from the given dates onward as
+        stale, to be refreshed by ``_refresh_stale`` at the latest before the
+        commit of the transaction.
+
+        :param asset_dates: iterable of ``(asset_id, date)`` pairs, a falsy
+            date marking all the snapshots of the asset.
+        """
+        precommit = self.env.cr.precommit
+        stale = precommit.data.get(STALE_SNAPSHOTS_KEY)
+        if stale is None:
+            stale = precommit.data[STALE_SNAPSHOTS_KEY] = {}
+            precommit.add(self.sudo()._refresh_stale)
+        for asset_id, date_from in asset_dates:
+            if not asset_id:
+                continue
+            date_from = fields.Date.to_date(date_from) or date.min
+            stale[asset_id] = min(stale.get(asset_id, date.max), date_from)
+
+    @api.model
+    def _refresh_stale(self):
+        """Refresh the snapshots marked as stale by ``_mark_stale``."""
+        stale = self.env.cr.precommit.data.pop(STALE_SNAPSHOTS_KEY, None)
+        if stale:
+            self._refresh_from(stale)
+
+    @api.model
+    def _refresh(self, asset_ids):
+        """Replace all the snapshots of the assets by the values of their
+        current depreciation and removal lines.
+        """
+        self._refresh_from(dict.fromkeys(asset_ids, date.min))
+
+    @api.model
+    def _refresh_from(self, dates_by_asset):
+        """Replace the snapshots of the assets from the given dates onward by
+        the values of their current depreciation and removal lines, with one
+        query for all the assets.
+
+        :param dates_by_asset: dict of the first date to refresh by asset id.
+        """
+        if not dates_by_asset:
+            return
+        self.env["account.asset.line"].flush_model(
+            [
+                "asset_id",
+                "company_id",
+                "currency_id",
+                "line_date",
+                "type",
+                "amount",
+                "depreciated_value",
+                "remaining_value",
+                "move_check",
+                "init_entry",
+            ]
+        )
+        self.env["account.asset"].flush_model(["state", "date_remove"])
+        params = {
+            "uid": self.env.uid,
+            "asset_ids": list(dates_by_asset),
+            "dates": list(dates_by_asset.values()),
+        }
+        self.env.cr.execute(
+            """
+            DELETE FROM account_asset_snapshot AS snapshot
+            USING unnest(%(asset_ids)s::int[], %(dates)s::date[])
+                AS stale(asset_id, date_from)
+            WHERE snapshot.asset_id = stale.asset_id
+                AND snapshot.date >= stale.date_from
+            """,
+            params,
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO account_asset_snapshot (
+                asset_id, line_id, company_id, currency_id, date, type,
+                depreciated_value, value_residual, posted, state,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT line.asset_id, line.id, line.company_id, line.currency_id,
+                line.line_date, line.type,
+                CASE WHEN line.type = 'depreciate'
+                    THEN line.depreciated_value + line.amount
+                    ELSE line.depreciated_value
+                END,
+                line.remaining_value,
+                line.move_check OR line.init_entry,
+                CASE
+                    WHEN asset.state = 'draft' THEN 'draft'
+                    WHEN line.type = 'remove'
+                        OR asset.date_remove <= line.line_date THEN 'removed'
+                    WHEN (line.move_check OR line.init_entry)
+                        AND ABS(line.remaining_value) < currency.rounding / 2
+                        THEN 'close'
+                    ELSE 'open'
+                END,
+                %(uid)s, now() AT TIME ZONE 'UTC',
+                %(uid)s, now() AT TIME ZONE 'UTC'
+            FROM unnest(%(asset_ids)s::int[], %(dates)s::date[])
+                AS stale(asset_id, date_from)
+            JOIN account_asset_line AS line
+                ON line.asset_id = stale.asset_id
+                AND line.line_date >= stale.date_from
+            JOIN account_asset AS asset ON asset.id = line.asset_id
+            JOIN res_currency AS currency ON currency.id = line.currency_id
+            WHERE line.type IN ('depreciate', 'remove')
+            """,
+            params,
+        )
+        self.invalidate_model()
+
+    def flush_model(self, fnames=None):
+        # the snapshots are read after the pending changes of the
+        # depreciation lines, e.g. by the searches
+        self._refresh_stale()
+        return super().flush_model(fnames)
+
+    @api.model
+    def _refresh_missing(self, asset_ids):
+        """Refresh the snapshots of the assets with depreciation lines and
+        without snapshots, e.g. assets created before the snapshots.
+        """
+        if not asset_ids:
+            return
+        self.flush_model(["asset_id"])
+        self.env["account.asset.line"].flush_model(["asset_id", "type"])
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT line.asset_id
+            FROM account_asset_line AS line
+            WHERE line.asset_id IN %s
+                AND line.type IN ('depreciate', 'remove')
+                AND NOT EXISTS (
+                    SELECT 1 FROM account_asset_snapshot AS snapshot
+                    WHERE snapshot.asset_id = line.asset_id
+                )
+            """,
+            (tuple(asset_ids),),
+        )
+        self._refresh([row[0] for row in self.env.cr.fetchall()])
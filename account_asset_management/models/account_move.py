@@ -7,7 +7,7 @@ import logging
 
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
-from odoo.tests.common import Form
+from odoo.tools.sql import column_exists, create_column, table_exists
 
 _logger = logging.getLogger(__name__)
 
@@ -30,15 +30,39 @@ FIELDS_AFFECTS_ASSET_MOVE_LINE = {
 class AccountMove(models.Model):
     _inherit = "account.move"
 
-    asset_count = fields.Integer(compute="_compute_asset_count")
+    asset_line_ids = fields.One2many(
+        comodel_name="account.asset.line",
+        inverse_name="move_id",
+        string="Asset Lines",
+        readonly=True,
+    )
+    asset_count = fields.Integer(compute="_compute_asset_count", store=True)
+
+    def _auto_init(self):
+        # Fill the count of the existing entries with one query instead of
+        # computing it for every entry of the database
+        if not column_exists(self._cr, self._table, "asset_count"):
+            create_column(self._cr, self._table, "asset_count", "int4")
+            if table_exists(self._cr, "account_asset_line"):
+                self._cr.execute(
+                    """
+                    UPDATE account_move AS move
+                    SET asset_count = line.count
+                    FROM (
+                        SELECT move_id, COUNT(*) AS count
+                        FROM account_asset_line
+                        WHERE move_id IS NOT NULL
+                        GROUP BY move_id
+                    ) AS line
+                    WHERE line.move_id = move.id
+                    """
+                )
+        return super()._auto_init()
 
+    @api.depends("asset_line_ids")
     def _compute_asset_count(self):
-        rg_res = self.env["account.asset.line"].read_group(
-            [("move_id", "in", self.ids)], ["move_id"], ["move_id"]
-        )
-        mapped_data = {x["move_id"][0]: x["move_id_count"] for x in rg_res}
         for move in self:
-            move.asset_count = mapped_data.get(move.id, 0)
+            move.asset_count = len(move.asset_line_ids)
 
     def unlink(self):
         # for move in self:
@@ -82,31 +106,45 @@ class AccountMove(models.Model):
             "date_start": self.date,
         }
 
+    def _create_assets_from_lines(self, amls):
+        """Create the assets of the move lines with one ``create``.
+
+        The depreciation parameters of the assets are computed from their
+        profile by the asset model itself.
+        """
+        self.ensure_one()
+        vals_list = []
+        for aml in amls:
+            vals = self._prepare_asset_vals(aml)
+            vals = {
+                key: val.id if isinstance(val, models.BaseModel) else val
+                for key, val in vals.items()
+            }
+            vals["analytic_distribution"] = aml.analytic_distribution
+            vals_list.append(vals)
+        assets = (
+            self.env["account.asset"]
+            .with_company(self.company_id)
+            .with_context(create_asset_from_move_line=True, move_id=self.id)
+            .create(vals_list)
+        )
+        for aml, asset in zip(amls, assets):
+            aml.with_context(
+                allow_asset=True, allow_asset_removal=True
+            ).asset_id = asset.id
+        return assets
+
     def action_post(self):
         ret_val = super().action_post()
         for move in self:
-            for aml in move.line_ids.filtered(
+            amls = move.line_ids.filtered(
                 lambda line: line.asset_profile_id and not line.tax_line_id
-            ):
-                vals = move._prepare_asset_vals(aml)
-                if not aml.name:
-                    raise UserError(
-                        _("Asset name must be set in the label of the line.")
-                    )
-                if aml.asset_id:
-                    continue
-                asset_form = Form(
-                    self.env["account.asset"]
-                    .with_company(move.company_id)
-                    .with_context(create_asset_from_move_line=True, move_id=move.id)
-                )
-                for key, val in vals.items():
-                    setattr(asset_form, key, val)
-                asset = asset_form.save()
-                asset.analytic_distribution = aml.analytic_distribution
-                aml.with_context(
-                    allow_asset=True, allow_asset_removal=True
-                ).asset_id = asset.id
+            )
+            if amls.filtered(lambda line: not line.name):
+                raise UserError(_("Asset name must be set in the label of the line."))
+            move._create_assets_from_lines(
+                amls.filtered(lambda line: not line.asset_id)
+            )
             refs = [
                 "<a href=# data-oe-model=account.asset data-oe-id=%s>%s</a>"
                 % tuple(name_get)
@@ -143,11 +181,7 @@ class AccountMove(models.Model):
         return move_vals
 
     def action_view_assets(self):
-        assets = (
-            self.env["account.asset.line"]
-            .search([("move_id", "=", self.id)])
-            .mapped("asset_id")
-        )
+        assets = self.asset_line_ids.asset_id
         action = self.env.ref("account_asset_management.account_asset_action")
         action_dict = action.sudo().read()[0]
         if len(assets) == 1:
@@ -207,8 +241,7 @@ class AccountMoveLine(models.Model):
                         )
                     )
         records = super().create(vals_list)
-        for record in records:
-            record._expand_asset_line()
+        records._expand_asset_lines()
         return records
 
     def write(self, vals):
@@ -242,18 +275,27 @@ class AccountMoveLine(models.Model):
             )
         super().write(vals)
         if "quantity" in vals or "asset_profile_id" in vals:
-            for record in self:
-                record._expand_asset_line()
+            self._expand_asset_lines()
         return True
 
     def _expand_asset_line(self):
         self.ensure_one()
-        if self.asset_profile_id and self.quantity > 1.0:
-            profile = self.asset_profile_id
-            if profile.asset_product_item:
-                aml = self.with_context(check_move_validity=False)
-                qty = self.quantity
-                name = self.name
-                aml.write({"quantity": 1, "name": "{} {}".format(name, 1)})
-                for i in range(1, int(qty)):
-                    aml.copy({"name": "{} {}".format(name, i + 1)})
+        self._expand_asset_lines()
+
+    def _expand_asset_lines(self):
+        """Split the lines of products managed per item into one line per
+        unit, the additional lines being created with one ``create``.
+        """
+        vals_list = []
+        for aml in self.with_context(check_move_validity=False):
+            profile = aml.asset_profile_id
+            if not (profile.asset_product_item and aml.quantity > 1.0):
+                continue
+            qty = aml.quantity
+            name = aml.name
+            aml.write({"quantity": 1, "name": "{} {}".format(name, 1)})
+            line_vals = aml.copy_data()[0]
+            for i in range(1, int(qty)):
+                vals_list.append(dict(line_vals, name="{} {}".format(name, i + 1)))
+        if vals_list:
+            self.with_context(check_move_validity=False).create(vals_list)
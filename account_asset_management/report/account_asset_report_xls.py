@@ -2,6 +2,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import logging
+from collections import defaultdict
 
 from odoo import _, models
 from odoo.exceptions import UserError
@@ -22,6 +23,13 @@ class AssetReportXlsx(models.AbstractModel):
     _description = "Dynamic XLS asset report generator"
     _inherit = "report.report_xlsx.abstract"
 
+    def get_workbook_options(self):
+        options = super().get_workbook_options()
+        if self.env.context.get("asset_report_streaming"):
+            # rows are flushed to disk as soon as the next row is written
+            options["constant_memory"] = True
+        return options
+
     def _get_ws_params(self, wb, data, wiz):
         self._get_assets(wiz, data)
         s1 = self._get_acquisition_ws_params(wb, data, wiz)
@@ -396,24 +404,10 @@ class AssetReportXlsx(models.AbstractModel):
 
         parent_group = wiz.asset_group_id
         if parent_group:
-
-            def _child_get(parent):
-                groups = [parent]
-                children = parent.child_ids
-                children = children.sorted(lambda r: r.code or r.name)
-                for child in children:
-                    if child in groups:
-                        raise UserError(
-                            _(
-                                "Inconsistent reporting structure."
-                                "\nPlease correct Asset Group '{group}' (id {id})"
-                            ).format(group=child.name, id=child.id)
-                        )
-                    groups.extend(_child_get(child))
-                return groups
-
-            groups = _child_get(parent_group)
-            dom.append(("group_ids", "in", [x.id for x in groups]))
+            groups = self.env["account.asset.group"].search(
+                [("id", "child_of", parent_group.id)]
+            )
+            dom.append(("group_ids", "in", groups.ids))
 
         if not wiz.draft:
             dom.append(("state", "!=", "draft"))
@@ -424,6 +418,33 @@ class AssetReportXlsx(models.AbstractModel):
             {
                 "assets": assets,
                 "grouped_assets": grouped_assets,
+                "depreciated_values": self._get_depreciated_values(wiz, assets),
+            }
+        )
+        self._classify_assets(wiz, data)
+
+    def _get_report_types(self):
+        return ["acquisition", "active", "removal"]
+
+    def _classify_assets(self, wiz, data):
+        """Add to `data` the ids of the assets of each sheet and the values
+        of the assets, computed in one pass over the assets for all sheets.
+        """
+        filters = {
+            report: getattr(self, "{}_filter".format(report))
+            for report in self._get_report_types()
+        }
+        report_asset_ids = {report: set() for report in filters}
+        asset_values = {}
+        for asset in data["assets"]:
+            for report, filt in filters.items():
+                if filt(wiz, asset):
+                    report_asset_ids[report].add(asset.id)
+            asset_values[asset.id] = self._get_asset_entry_values(data, asset)
+        data.update(
+            {
+                "report_asset_ids": report_asset_ids,
+                "asset_values": asset_values,
             }
         )
 
@@ -444,44 +465,89 @@ class AssetReportXlsx(models.AbstractModel):
         )
 
     def _group_assets(self, assets, group, grouped_assets):
-        if group:
-            group_assets = assets.filtered(lambda r: group in r.group_ids)
-        else:
-            group_assets = assets
-        group_assets = group_assets.sorted(
-            lambda r: (r.date_start or "", r.code or "", r.name)
-        )
-        grouped_assets[group] = {"assets": group_assets}
-        for child in group.child_ids:
-            self._group_assets(assets, child, grouped_assets[group])
-
-    def _create_report_entries(
-        self, ws_params, wiz, entries, group, group_val, error_dict
-    ):
-        report = ws_params["report_type"]
+        """Add the assets of ``group`` and of its descendants to
+        ``grouped_assets``, nested by group.
+
+        The assets are indexed by group once and the descendants of the
+        group are read with one query through their ``parent_path``.
+        """
+        assets = assets.sorted(lambda r: (r.date_start or "", r.code or "", r.name))
+        if not group:
+            grouped_assets[group] = {"assets": assets}
+            return
+        asset_ids_by_group = defaultdict(list)
+        for asset in assets:
+            for group_id in asset.group_ids.ids:
+                asset_ids_by_group[group_id].append(asset.id)
+        children_by_parent = defaultdict(list)
+        for child in self.env["account.asset.group"].search(
+            [("id", "child_of", group.id), ("id", "!=", group.id)]
+        ):
+            children_by_parent[child.parent_id.id].append(child)
+
+        def _add_group(group, parent_val):
+            group_val = parent_val[group] = {
+                "assets": assets.browse(asset_ids_by_group[group.id])
+            }
+            for child in children_by_parent[group.id]:
+                _add_group(child, group_val)
 
-        def asset_filter(asset):
-            filt = getattr(self, "{}_filter".format(report))
-            return filt(wiz, asset)
+        _add_group(group, grouped_assets)
 
-        def _has_assets(group, group_val):
-            assets = group_val.get("assets")
-            assets = assets.filtered(asset_filter)
-            if assets:
-                return True
-            for child in group.child_ids:
-                if _has_assets(child, group_val[child]):
-                    return True
-            return False
+    def _get_depreciated_values(self, wiz, assets):
+        """Return the values depreciated at the start and at the end of the
+        period by asset id, for the assets with a depreciation table.
 
-        assets = group_val.get("assets")
-        assets = assets.filtered(asset_filter)
+        The values are read from the snapshot of the period ending last
+        before each date.
+        """
+        if not assets:
+            return {}
+        snapshot_model = self.env["account.asset.snapshot"]
+        snapshot_model._refresh_missing(assets.ids)
+        snapshot_model.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT asset_id,
+                (ARRAY_AGG(depreciated_value ORDER BY date DESC, line_id DESC)
+                    FILTER (WHERE date <= %(date_from)s))[1],
+                (ARRAY_AGG(depreciated_value ORDER BY date DESC, line_id DESC)
+                    FILTER (WHERE date <= %(date_to)s))[1]
+            FROM account_asset_snapshot
+            WHERE asset_id IN %(asset_ids)s AND type = 'depreciate'
+            GROUP BY asset_id
+            """,
+            {
+                "date_from": wiz.date_from,
+                "date_to": wiz.date_to,
+                "asset_ids": tuple(assets.ids),
+            },
+        )
+        return {
+            asset_id: (start_value or 0.0, end_value or 0.0)
+            for asset_id, start_value, end_value in self.env.cr.fetchall()
+        }
 
-        # remove empty entries
-        if not _has_assets(group, group_val):
-            return
+    def _get_asset_entry_values(self, data, asset):
+        """Return the period start and end values of the asset."""
+        depreciated_values = data["depreciated_values"].get(asset.id, (0.0, 0.0))
+        return {
+            "_period_start_value": asset.depreciation_base - depreciated_values[0],
+            "_period_end_value": asset.depreciation_base - depreciated_values[1],
+        }
 
-        asset_entries = []
+    def _create_group_entries(
+        self, ws_params, wiz, data, group, group_val, group_entries
+    ):
+        """Add the entries of the group and of its descendants with assets to
+        report to ``group_entries``, by group.
+
+        The totals of a group include those of its children: they are
+        computed bottom-up, in one pass over the group tree.
+        """
+        report_asset_ids = data["report_asset_ids"][ws_params["report_type"]]
+        asset_values = data["asset_values"]
+        assets = group_val.get("assets").filtered(lambda a: a.id in report_asset_ids)
         group_entry = {
             "_purchase_value": 0.0,
             "_depreciation_base": 0.0,
@@ -489,52 +555,50 @@ class AssetReportXlsx(models.AbstractModel):
             "_period_start_value": 0.0,
             "_period_end_value": 0.0,
             "group": group,
+            "assets": assets,
+            "children": [],
         }
         for asset in assets:
-            asset_entry = {"asset": asset}
+            values = asset_values[asset.id]
             group_entry["_purchase_value"] += asset.purchase_value
             group_entry["_depreciation_base"] += asset.depreciation_base
             group_entry["_salvage_value"] += asset.salvage_value
-            dls_all = asset.depreciation_line_ids.filtered(
-                lambda r: r.type == "depreciate"
-            )
-            dls_all = dls_all.sorted(key=lambda r: r.line_date)
-            if not dls_all:
-                error_dict["no_table"] += asset
-            # period_start_value
-            dls = dls_all.filtered(lambda r: r.line_date <= wiz.date_from)
-            if dls:
-                value_depreciated = dls[-1].depreciated_value + dls[-1].amount
-            else:
-                value_depreciated = 0.0
-            asset_entry["_period_start_value"] = (
-                asset.depreciation_base - value_depreciated
-            )
-            group_entry["_period_start_value"] += asset_entry["_period_start_value"]
-            # period_end_value
-            dls = dls_all.filtered(lambda r: r.line_date <= wiz.date_to)
-            if dls:
-                value_depreciated = dls[-1].depreciated_value + dls[-1].amount
-            else:
-                value_depreciated = 0.0
-            asset_entry["_period_end_value"] = (
-                asset.depreciation_base - value_depreciated
+            group_entry["_period_start_value"] += values["_period_start_value"]
+            group_entry["_period_end_value"] += values["_period_end_value"]
+        for child in group.child_ids:
+            child_entry = self._create_group_entries(
+                ws_params, wiz, data, child, group_val[child], group_entries
             )
-            group_entry["_period_end_value"] += asset_entry["_period_end_value"]
-
-            asset_entries.append(asset_entry)
+            if not child_entry:
+                continue
+            group_entry["children"].append(child)
+            for key in (
+                "_purchase_value",
+                "_depreciation_base",
+                "_salvage_value",
+                "_period_start_value",
+                "_period_end_value",
+            ):
+                group_entry[key] += child_entry[key]
 
-        todos = []
-        for g in group.child_ids:
-            if _has_assets(g, group_val[g]):
-                todos.append(g)
-
-        entries.append(group_entry)
-        entries.extend(asset_entries)
-        for todo in todos:
-            self._create_report_entries(
-                ws_params, wiz, entries, todo, group_val[todo], error_dict
-            )
+        # remove empty entries
+        if not assets and not group_entry["children"]:
+            return None
+        group_entries[group] = group_entry
+        return group_entry
+
+    def _iter_report_entries(self, group, group_entries, asset_values):
+        """Yield the entries of the group and its descendants in report
+        order: each group followed by its assets and its child groups.
+        """
+        group_entry = group_entries.get(group)
+        if not group_entry:
+            return
+        yield group_entry
+        for asset in group_entry["assets"]:
+            yield dict(asset_values[asset.id], asset=asset)
+        for child in group_entry["children"]:
+            yield from self._iter_report_entries(child, group_entries, asset_values)
 
     def _asset_report(self, workbook, ws, ws_params, data, wiz):
         report = ws_params["report_type"]
@@ -559,13 +623,9 @@ class AssetReportXlsx(models.AbstractModel):
         row_pos = 0
         row_pos = self._report_title(ws, row_pos, ws_params, data, wiz)
 
-        def asset_filter(asset):
-            filt = getattr(self, "{}_filter".format(report))
-            return filt(wiz, asset)
-
-        assets = data["assets"].filtered(asset_filter)
+        report_asset_ids = data["report_asset_ids"][report]
 
-        if not assets:
+        if not report_asset_ids:
             return self._empty_report(ws, row_pos, ws_params, data, wiz)
 
         row_pos = self._write_line(
@@ -589,35 +649,22 @@ class AssetReportXlsx(models.AbstractModel):
         )
         period_end_value_pos = "period_end_value" in wl and wl.index("period_end_value")
 
-        entries = []
         root = wiz.asset_group_id
         root_val = data["grouped_assets"][root]
         error_dict = {
-            "no_table": self.env["account.asset"],
+            "no_table": self.env["account.asset"].browse(
+                sorted(report_asset_ids - set(data["depreciated_values"]))
+            ),
             "dups": self.env["account.asset"],
         }
 
-        self._create_report_entries(ws_params, wiz, entries, root, root_val, error_dict)
+        group_entries = {}
+        self._create_group_entries(ws_params, wiz, data, root, root_val, group_entries)
 
-        # traverse entries in reverse order to calc totals
-        for i, entry in enumerate(reversed(entries)):
-            if "group" in entry:
-                parent = entry["group"].parent_id
-                for parent_entry in reversed(entries[: -i - 1]):
-                    if "group" in parent_entry and parent_entry["group"] == parent:
-                        parent_entry["_purchase_value"] += entry["_purchase_value"]
-                        parent_entry["_depreciation_base"] += entry[
-                            "_depreciation_base"
-                        ]
-                        parent_entry["_salvage_value"] += entry["_salvage_value"]
-                        parent_entry["_period_start_value"] += entry[
-                            "_period_start_value"
-                        ]
-                        parent_entry["_period_end_value"] += entry["_period_end_value"]
-                        continue
-
-        processed = []
-        for entry in entries:
+        processed = set()
+        for entry in self._iter_report_entries(
+            root, group_entries, data["asset_values"]
+        ):
 
             period_start_value_cell = period_start_value_pos and self._rowcol_to_cell(
                 row_pos, period_start_value_pos
@@ -652,11 +699,11 @@ class AssetReportXlsx(models.AbstractModel):
 
             else:
                 asset = entry["asset"]
-                if asset in processed:
+                if asset.id in processed:
                     error_dict["dups"] += asset
                     continue
                 else:
-                    processed.append(asset)
+                    processed.add(asset.id)
                 row_pos = self._write_line(
                     ws,
                     row_pos,
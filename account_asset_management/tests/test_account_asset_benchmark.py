@@ -0,0 +1,186 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+import time
+from datetime import date, timedelta
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+from ..tools.depreciation_kernel import (
+    DepreciationKernel,
+    DepreciationSpec,
+    FiscalYearCalendar,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged("post_install", "-at_install", "-standard", "asset_benchmark")
+class TestAssetBenchmark(AccountTestInvoicingCommon):
+    """Benchmarks of the depreciation tables of large asset fleets.
+
+    These tests are not run by default, use ``--test-tags asset_benchmark``.
+    """
+
+    ASSET_COUNT = 10000
+    LINES_PER_ASSET = 10
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dl_model = cls.env["account.asset.line"]
+        profile = cls.env["account.asset.profile"].create(
+            {
+                "account_expense_depreciation_id": cls.company_data[
+                    "default_account_expense"
+                ].id,
+                "account_asset_id": cls.company_data["default_account_assets"].id,
+                "account_depreciation_id": cls.company_data[
+                    "default_account_assets"
+                ].id,
+                "journal_id": cls.company_data["default_journal_purchase"].id,
+                "name": "Benchmark - 10 Years",
+                "method_time": "year",
+                "method_number": cls.LINES_PER_ASSET,
+                "method_period": "year",
+            }
+        )
+        cls.assets = cls.env["account.asset"].create(
+            [
+                {
+                    "name": "Benchmark asset %s" % i,
+                    "profile_id": profile.id,
+                    "purchase_value": 1000.0,
+                    "date_start": "2020-01-01",
+                }
+                for i in range(cls.ASSET_COUNT)
+            ]
+        )
+        cls.env.flush_all()
+        # Insert the depreciation lines directly, their values are computed
+        # by the benchmarks
+        cls.env.cr.execute(
+            """
+            INSERT INTO account_asset_line (
+                asset_id, company_id, currency_id, name, amount, line_date,
+                line_days, type, init_entry, create_uid, create_date,
+                write_uid, write_date
+            )
+            SELECT asset.id, asset.company_id, company.currency_id,
+                'Benchmark line ' || n, 100.0, make_date(2019 + n, 12, 31),
+                365, 'depreciate', false, %(uid)s, now(), %(uid)s, now()
+            FROM account_asset AS asset
+            JOIN res_company AS company ON company.id = asset.company_id
+            CROSS JOIN generate_series(1, %(count)s) AS n
+            WHERE asset.id IN %(asset_ids)s
+            RETURNING id
+            """,
+            {
+                "uid": cls.env.uid,
+                "count": cls.LINES_PER_ASSET,
+                "asset_ids": tuple(cls.assets.ids),
+            },
+        )
+        cls.lines = cls.dl_model.browse([row[0] for row in cls.env.cr.fetchall()])
+        cls.lines._link_previous_lines()
+        cls.env.flush_all()
+
+    def _check_values(self):
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*) FROM account_asset_line
+            WHERE id IN %s
+                AND depreciated_value + amount + remaining_value != 1000.0
+            """,
+            (tuple(self.lines.ids),),
+        )
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
+        self.env.cr.execute(
+            "SELECT SUM(remaining_value) FROM account_asset_line WHERE id IN %s",
+            (tuple(self.lines.ids),),
+        )
+        # 900 + 800 + ... + 0 per asset
+        self.assertEqual(self.env.cr.fetchone()[0], 4500.0 * self.ASSET_COUNT)
+
+    def test_benchmark_compute_values(self):
+        """Recompute the values of 100k lines across 10k assets."""
+        self.env.invalidate_all()
+        start = time.perf_counter()
+        self.lines.modified(["amount"])
+        self.env.flush_all()
+        orm_duration = time.perf_counter() - start
+        self._check_values()
+
+        self.env.cr.execute(
+            """
+            UPDATE account_asset_line
+            SET depreciated_value = 0.0, remaining_value = 0.0
+            WHERE id IN %s
+            """,
+            (tuple(self.lines.ids),),
+        )
+        self.env.invalidate_all()
+        start = time.perf_counter()
+        self.dl_model._recompute_values_sql(self.assets.ids)
+        sql_duration = time.perf_counter() - start
+        self._check_values()
+
+        _logger.info(
+            "Values of %s depreciation lines of %s assets recomputed "
+            "in %.2fs by the ORM and in %.2fs by SQL",
+            len(self.lines),
+            len(self.assets),
+            orm_duration,
+            sql_duration,
+        )
+
+
+@tagged("post_install", "-at_install", "-standard", "asset_benchmark")
+class TestDepreciationKernelBenchmark(BaseCase):
+    """Benchmark of the depreciation kernel, without database.
+
+    Use ``--test-tags asset_benchmark``.
+    """
+
+    ASSET_COUNT = 1000000
+
+    def _iter_specs(self):
+        methods = ("linear", "linear-limit", "degressive", "degr-linear", "degr-limit")
+        periods = ("month", "quarter", "year")
+        for i in range(self.ASSET_COUNT):
+            yield DepreciationSpec(
+                depreciation_base=1000.0 + i % 97,
+                salvage_value=0.0 if i % 3 else 100.0,
+                date_start=date(2015, 1, 1) + timedelta(days=i % 3650),
+                method=methods[i % 5],
+                method_number=3 + i % 8,
+                method_period=periods[i % 3],
+                method_end=False,
+                method_time="year",
+                method_progress_factor=0.3,
+                prorata=bool(i % 2),
+                days_calc=False,
+                use_leap_years=False,
+                fiscalyear_lock_date=date(1901, 1, 1),
+                rounding=0.01,
+            )
+
+    def test_benchmark_kernel(self):
+        """Compute the schedules of 1M synthetic assets."""
+        fiscal_year_calendar = FiscalYearCalendar()
+        line_count = 0
+        start = time.perf_counter()
+        for spec in self._iter_specs():
+            schedule = DepreciationKernel(spec, fiscal_year_calendar).compute_schedule()
+            line_count += sum(len(entry.lines) for entry in schedule)
+        duration = time.perf_counter() - start
+        self.assertTrue(line_count)
+        _logger.info(
+            "Schedules of %s assets with %s lines computed in %.2fs",
+            self.ASSET_COUNT,
+            line_count,
+            duration,
+        )
@@ -6,13 +6,19 @@
 import calendar
 import time
 from datetime import date, datetime
+from unittest.mock import patch
 
 from odoo import Command, fields
+from odoo.exceptions import UserError, ValidationError
 from odoo.tests import tagged
 from odoo.tests.common import Form
 
 from odoo.addons.account.tests.common import AccountTestInvoicingCommon
 
+from ..models import account_asset
+from ..wizard import account_asset_compute
+from ..tools.depreciation_kernel import DepreciationKernel, FiscalYearCalendar
+
 
 @tagged("post_install", "-at_install")
 class TestAssetManagement(AccountTestInvoicingCommon):
@@ -955,3 +961,1099 @@ class TestAssetManagement(AccountTestInvoicingCommon):
         last_line.create_move()
         self.assertEqual(asset.value_residual, 0)
         self.assertEqual(asset.state, "close")
+
+    def test_21_batch_depreciation_board(self):
+        """Boards computed in batch match boards computed asset by asset."""
+        asset_vals = [
+            {
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "month",
+                "prorata": True,
+                "date_start": "2019-07-07",
+            },
+            {
+                "method_time": "year",
+                "method": "degr-linear",
+                "method_progress_factor": 0.40,
+                "method_number": 5,
+                "method_period": "quarter",
+                "prorata": False,
+                "date_start": "2019-07-07",
+            },
+            {
+                "method_time": "number",
+                "method_number": 10,
+                "method_period": "month",
+                "prorata": False,
+                "date_start": "2019-01-01",
+            },
+            {
+                "method_time": "year",
+                "method_number": 3,
+                "method_period": "year",
+                "salvage_value": 100,
+                "method": "linear-limit",
+                "date_start": "2019-01-01",
+            },
+        ]
+        batch_assets = self.asset_model.browse()
+        single_assets = self.asset_model.browse()
+        for vals in asset_vals:
+            vals = dict(
+                vals, name="test asset", profile_id=self.car5y.id, purchase_value=3333
+            )
+            batch_assets |= self.asset_model.create(vals)
+            single_assets |= self.asset_model.create(vals)
+        # Post an initial entry on the first asset of each set
+        for asset in (batch_assets[0], single_assets[0]):
+            self.dl_model.create(
+                {
+                    "asset_id": asset.id,
+                    "amount": 325.08,
+                    "line_date": "2019-12-31",
+                    "type": "depreciate",
+                    "init_entry": True,
+                }
+            )
+        batch_assets.compute_depreciation_board()
+        # An override of _compute_depreciation_line computes the boards asset
+        # by asset with the former per asset path
+        asset_class = type(single_assets)
+        compute_depreciation_line = asset_class._compute_depreciation_line
+        legacy_asset_ids = []
+
+        def _compute_depreciation_line(self, *args):
+            legacy_asset_ids.append(self.id)
+            return compute_depreciation_line(self, *args)
+
+        with patch.object(
+            asset_class, "_compute_depreciation_line", _compute_depreciation_line
+        ):
+            single_assets.compute_depreciation_board()
+        self.assertEqual(legacy_asset_ids, single_assets.ids)
+        (batch_assets | single_assets).invalidate_recordset()
+        fnames = [
+            "name",
+            "line_date",
+            "line_days",
+            "amount",
+            "depreciated_value",
+            "remaining_value",
+            "init_entry",
+        ]
+        for batch_asset, single_asset in zip(batch_assets, single_assets):
+            batch_lines = batch_asset.depreciation_line_ids.filtered(
+                lambda l: l.type == "depreciate"
+            )
+            single_lines = single_asset.depreciation_line_ids.filtered(
+                lambda l: l.type == "depreciate"
+            )
+            self.assertTrue(batch_lines)
+            self.assertEqual(len(batch_lines), len(single_lines))
+            for batch_line, single_line in zip(batch_lines, single_lines):
+                for fname in fnames:
+                    batch_value = batch_line[fname]
+                    if fname == "name":
+                        # the entry name is prefixed with the asset id
+                        batch_value = batch_value.split("/")[-1]
+                        single_value = single_line[fname].split("/")[-1]
+                    else:
+                        single_value = single_line[fname]
+                    self.assertEqual(batch_value, single_value)
+            # the depreciation lines are chained in date order
+            self.assertFalse(batch_lines[0].previous_id)
+            for previous, line in zip(batch_lines, batch_lines[1:]):
+                self.assertEqual(line.previous_id, previous)
+            self.assertEqual(batch_asset.value_residual, single_asset.value_residual)
+
+    def test_22_bulk_posting(self):
+        """Bulk posting creates one entry per line and logs failing assets."""
+        expense_account = self.env["account.account"].create(
+            {
+                "name": "Depreciation Expense",
+                "code": "DEPEXP",
+                "account_type": "expense",
+            }
+        )
+        failing_profile = self.ict3Y.copy(
+            {
+                "name": "Failing profile",
+                "account_expense_depreciation_id": expense_account.id,
+            }
+        )
+        assets = self.asset_model.browse()
+        for name, profile in (
+            ("Laptop 1", self.ict3Y),
+            ("Laptop 2", self.ict3Y),
+            ("Failing Laptop", failing_profile),
+        ):
+            assets |= self.asset_model.create(
+                {
+                    "name": name,
+                    "profile_id": profile.id,
+                    "purchase_value": 1500.0,
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 3,
+                    "method_period": "year",
+                }
+            )
+        assets.validate()
+        expense_account.deprecated = True
+        move_ids, error_log = assets.with_context(
+            asset_bulk_posting=True, asset_posting_chunk_size=2
+        )._compute_entries(date(2019, 12, 31))
+        self.assertEqual(len(move_ids), 2)
+        self.assertIn("Failing Laptop", error_log)
+        posted_lines = assets.depreciation_line_ids.filtered("move_id")
+        self.assertEqual(posted_lines.asset_id, assets[:2])
+        for line in posted_lines:
+            self.assertEqual(line.move_id.state, "posted")
+            self.assertEqual(line.move_id.date, date(2019, 12, 31))
+            self.assertEqual(len(line.move_id.line_ids), 2)
+            self.assertEqual(sum(line.move_id.line_ids.mapped("debit")), line.amount)
+            self.assertEqual(line.move_id.line_ids.asset_id, line.asset_id)
+        self.assertEqual(assets[:2].mapped("value_depreciated"), [500.0, 500.0])
+        self.assertEqual(assets[2].value_depreciated, 0.0)
+
+    def test_23_scoped_recompute_triggers(self):
+        """Only the boards crossing the scope of a trigger are recomputed."""
+        assets = self.asset_model.browse()
+        for profile, date_start in (
+            (self.ict3Y, "2019-01-01"),
+            (self.car5y, "2019-01-01"),
+            (self.ict3Y, "2025-01-01"),
+            (self.ict3Y, "2010-01-01"),
+        ):
+            assets |= self.asset_model.create(
+                {
+                    "name": "Asset %s" % date_start,
+                    "profile_id": profile.id,
+                    "purchase_value": 3000.0,
+                    "date_start": date_start,
+                    "method_time": "year",
+                    "method_number": 3,
+                    "method_period": "year",
+                }
+            )
+        assets.validate()
+        trigger_model = self.env["account.asset.recompute.trigger"]
+        trigger = trigger_model.create(
+            {
+                "reason": "Fiscal year change",
+                "company_id": assets.company_id.id,
+                "date_from": "2020-01-01",
+                "date_to": "2020-12-31",
+                "profile_ids": [(6, 0, self.ict3Y.ids)],
+            }
+        )
+        self.assertEqual(trigger._get_triggered_asset_ids(assets), assets[0].ids)
+        trigger.write({"profile_ids": [(5,)], "asset_ids": [(6, 0, assets[1].ids)]})
+        self.assertEqual(trigger._get_triggered_asset_ids(assets), assets[1].ids)
+        trigger.write({"asset_ids": [(5,)], "date_from": False, "date_to": False})
+        self.assertEqual(trigger._get_triggered_asset_ids(assets), sorted(assets.ids))
+        # The board of an asset in the scope is rebuilt
+        trigger.write({"asset_ids": [(6, 0, assets[0].ids)]})
+        last_line = assets[0].depreciation_line_ids[-1]
+        last_line.unlink()
+        assets._compute_entries(date(2018, 12, 31), check_triggers=True)
+        self.assertEqual(trigger.state, "done")
+        self.assertEqual(len(assets[0].depreciation_line_ids), 4)
+
+    def test_24_depreciation_board_diff(self):
+        """Recomputing a board keeps the unposted lines of unchanged dates."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.compute_depreciation_board()
+        lines = asset.depreciation_line_ids.filtered(lambda l: l.type == "depreciate")
+        self.assertEqual(len(lines), 5)
+        # Unchanged board: the lines are kept
+        asset.compute_depreciation_board()
+        self.assertEqual(
+            asset.depreciation_line_ids.filtered(lambda l: l.type == "depreciate"),
+            lines,
+        )
+        asset.method_number = 3
+        asset.compute_depreciation_board()
+        new_lines = asset.depreciation_line_ids.filtered(
+            lambda l: l.type == "depreciate"
+        )
+        # The lines of the first 3 years are updated, the other ones removed
+        self.assertEqual(new_lines, lines[:3])
+        self.assertFalse(lines[3:].exists())
+        self.assertEqual(new_lines.mapped("amount"), [1666.67, 1666.67, 1666.66])
+        self.assertEqual(new_lines[1].previous_id, new_lines[0])
+        self.assertEqual(new_lines[2].previous_id, new_lines[1])
+        self.assertEqual(new_lines[-1].remaining_value, 0.0)
+        asset.method_number = 4
+        asset.compute_depreciation_board()
+        new_lines = asset.depreciation_line_ids.filtered(
+            lambda l: l.type == "depreciate"
+        )
+        self.assertEqual(new_lines[:3], lines[:3])
+        self.assertEqual(len(new_lines), 4)
+        self.assertEqual(new_lines[3].previous_id, new_lines[2])
+        self.assertEqual(new_lines.mapped("amount"), [1250.0] * 4)
+
+    def test_25_recompute_values_sql(self):
+        """The SQL recompute of the line values matches the ORM compute."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % i,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 5000.0 + i,
+                    "salvage_value": 100.0,
+                    "date_start": "2019-04-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "month",
+                    "prorata": True,
+                }
+                for i in range(3)
+            ]
+        )
+        assets.compute_depreciation_board()
+        lines = assets.depreciation_line_ids.filtered(lambda l: l.type == "depreciate")
+        expected = lines.read(["depreciated_value", "remaining_value"])
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE account_asset_line SET depreciated_value = 0.0, "
+            "remaining_value = 0.0 WHERE id IN %s",
+            (tuple(lines.ids),),
+        )
+        self.dl_model._recompute_values_sql(assets.ids)
+        self.assertEqual(lines.read(["depreciated_value", "remaining_value"]), expected)
+
+    def test_26_depreciated_values_aggregate(self):
+        """The residual value sums the posted lines, also on new records."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 6000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "month",
+            }
+        )
+        asset.validate()
+        self.assertEqual(len(asset.depreciation_line_ids), 61)
+        asset._compute_entries(date(2019, 3, 31))
+        posted_lines = asset.depreciation_line_ids.filtered("move_check")
+        self.assertEqual(len(posted_lines), 3)
+        self.assertEqual(asset.value_depreciated, 300.0)
+        self.assertEqual(asset.value_residual, 5700.0)
+        asset.invalidate_recordset(["value_depreciated", "value_residual"])
+        asset._compute_depreciation()
+        self.assertEqual(asset.value_depreciated, 300.0)
+        self.assertEqual(asset.value_residual, 5700.0)
+        new_asset = self.asset_model.new(
+            {
+                "profile_id": self.car5y.id,
+                "purchase_value": 6000.0,
+                "date_start": "2019-01-01",
+                "depreciation_line_ids": [
+                    Command.create(
+                        {
+                            "amount": 250.0,
+                            "line_date": "2019-01-31",
+                            "init_entry": True,
+                        }
+                    )
+                ],
+            }
+        )
+        self.assertEqual(new_asset.value_depreciated, 250.0)
+        self.assertEqual(new_asset.value_residual, 5750.0)
+
+    def test_27_depreciation_kernel(self):
+        """The depreciation table is computed by a replaceable kernel."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 3333.0,
+                "date_start": "2019-07-11",
+                "method_time": "year",
+                "method": "degr-linear",
+                "method_progress_factor": 0.4,
+                "method_number": 5,
+                "method_period": "quarter",
+                "prorata": True,
+            }
+        )
+        schedule = asset._compute_depreciation_schedule()
+        kernel = DepreciationKernel(
+            asset._get_depreciation_spec(), FiscalYearCalendar()
+        )
+        self.assertEqual(
+            [entry.as_dict() for entry in kernel.compute_schedule()], schedule
+        )
+        self.assertEqual(
+            sum(line["amount"] for entry in schedule for line in entry["lines"]),
+            3333.0,
+        )
+        self.assertEqual(asset._get_fy_duration(schedule[0]["fy"], "months"), 12)
+
+        class HalfKernel(DepreciationKernel):
+            def amount_linear(self, *args):
+                return super().amount_linear(*args) / 2
+
+        with patch.object(
+            type(asset), "_get_depreciation_kernel_class", lambda self: HalfKernel
+        ):
+            self.assertEqual(
+                asset._compute_year_amount(
+                    3333.0, date(2019, 7, 11), date(2024, 7, 10), schedule[1]
+                ),
+                3333.0 * 0.4,
+            )
+            asset.method = "linear"
+            self.assertEqual(
+                asset._compute_year_amount(
+                    3333.0, date(2019, 7, 11), date(2024, 7, 10), schedule[1]
+                ),
+                3333.0 / 10,
+            )
+
+    def test_28_parallel_depreciation_board(self):
+        """The depreciation tables computed by a process pool are the same."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % method,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 3333.0,
+                    "salvage_value": 333.0,
+                    "date_start": "2019-07-11",
+                    "method_time": "year",
+                    "method": method,
+                    "method_progress_factor": 0.4,
+                    "method_number": 5,
+                    "method_period": period,
+                    "prorata": True,
+                }
+                for method, period in [
+                    ("linear", "month"),
+                    ("degressive", "quarter"),
+                    ("degr-linear", "year"),
+                ]
+            ]
+        )
+        tables = assets._compute_depreciation_schedules_parallel(2)
+        for asset in assets:
+            self.assertEqual(tables[asset.id], asset._compute_depreciation_schedule())
+
+        assets.compute_depreciation_board()
+        serial_values = assets.depreciation_line_ids.read(["line_date", "amount"])
+        with patch.object(account_asset, "BOARD_PROCESS_CHUNK_SIZE", 1):
+            assets.with_context(asset_board_processes=2).compute_depreciation_board()
+        self.assertEqual(
+            assets.depreciation_line_ids.read(["line_date", "amount"]), serial_values
+        )
+
+    def test_29_asset_snapshots(self):
+        """The snapshots follow the depreciation table and the postings."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.validate()
+        snapshots = self.env["account.asset.snapshot"].search(
+            [("asset_id", "=", asset.id)], order="date"
+        )
+        self.assertEqual(len(snapshots), 5)
+        self.assertEqual(
+            snapshots.mapped("depreciated_value"), [1000.0 * n for n in range(1, 6)]
+        )
+        self.assertEqual(snapshots[-1].value_residual, 0.0)
+        self.assertFalse(any(snapshots.mapped("posted")))
+        self.assertEqual(set(snapshots.mapped("state")), {"open"})
+
+        lines = asset.depreciation_line_ids.filtered(lambda l: l.type == "depreciate")
+        lines.sorted("line_date")[:2].create_move()
+        snapshots = self.env["account.asset.snapshot"].search(
+            [("asset_id", "=", asset.id)], order="date"
+        )
+        self.assertEqual(snapshots.mapped("posted"), [True, True, False, False, False])
+        lines.filtered(lambda l: not l.move_check).create_move()
+        self.assertEqual(asset.state, "close")
+        snapshots = self.env["account.asset.snapshot"].search(
+            [("asset_id", "=", asset.id)], order="date"
+        )
+        self.assertEqual(snapshots[-1].state, "close")
+        self.assertEqual(snapshots[0].state, "open")
+
+    def test_30_bulk_assets_from_invoice(self):
+        """The assets of a bill with many units are created in bulk."""
+        all_assets = self.env["account.asset"].search([])
+        invoice = self.invoice
+        asset_profile = self.car5y
+        asset_profile.asset_product_item = True
+        asset_profile.open_asset = True
+        line = invoice.invoice_line_ids[0]
+        line.write({"quantity": 50, "asset_profile_id": asset_profile.id})
+        self.assertEqual(len(invoice.invoice_line_ids.filtered("asset_profile_id")), 50)
+        invoice.action_post()
+        new_assets = self.env["account.asset"].search([]) - all_assets
+        self.assertEqual(len(new_assets), 50)
+        self.assertEqual(set(new_assets.mapped("state")), {"open"})
+        self.assertEqual(
+            invoice.line_ids.filtered("asset_profile_id").asset_id, new_assets
+        )
+        create_lines = new_assets.depreciation_line_ids.filtered(
+            lambda l: l.type == "create"
+        )
+        self.assertEqual(len(create_lines), 50)
+        self.assertEqual(create_lines.move_id, invoice)
+
+    def test_31_multi_asset_removal(self):
+        """Several assets are removed with one wizard run."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test multi asset removal %s" % i,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 5000,
+                    "salvage_value": 0,
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "quarter",
+                    "prorata": False,
+                }
+                for i in range(3)
+            ]
+        )
+        assets.compute_depreciation_board()
+        assets.validate()
+        wiz_ctx = {
+            "active_model": "account.asset",
+            "active_id": assets[0].id,
+            "active_ids": assets.ids,
+        }
+        wiz = self.remove_model.with_context(**wiz_ctx).create(
+            {
+                "date_remove": "2019-01-31",
+                "posting_regime": "gain_loss_on_sale",
+                "account_plus_value_id": self.company_data[
+                    "default_account_revenue"
+                ].id,
+                "account_min_value_id": self.company_data["default_account_expense"].id,
+                "group_moves": True,
+            }
+        )
+        self.assertTrue(wiz.multi_asset)
+        action = wiz.remove()
+        moves = self.env["account.move"].search(action["domain"])
+        self.assertEqual(len(moves), 1)
+        self.assertEqual(moves.line_ids.asset_id, assets)
+        self.assertEqual(set(assets.mapped("state")), {"removed"})
+        for asset in assets:
+            lines = asset.depreciation_line_ids
+            self.assertEqual(len(lines), 3)
+            self.assertAlmostEqual(lines[1].amount, 81.46, places=2)
+            self.assertTrue(lines[1].move_check)
+            self.assertAlmostEqual(lines[2].amount, 4918.54, places=2)
+            self.assertEqual(lines[2].move_id, moves)
+
+    def _get_plan_indexes(self, model, domain):
+        """Return the names of the indexes in the plan of a search query."""
+        query_str, params = model._where_calc(domain).select()
+        self.env.cr.execute("EXPLAIN (FORMAT JSON) " + query_str, params)
+        indexes = set()
+        nodes = [self.env.cr.fetchone()[0][0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if "Index Name" in node:
+                indexes.add(node["Index Name"])
+            nodes += node.get("Plans", [])
+        return indexes
+
+    def test_32_asset_line_query_plans(self):
+        """The hot filters on the depreciation lines use their indexes."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % i,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 1200.0,
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "month",
+                }
+                for i in range(50)
+            ]
+        )
+        assets.validate()
+        assets.depreciation_line_ids.filtered(
+            lambda l: l.type == "depreciate" and l.line_date.year == 2019
+        )._create_moves_batch()
+        self.env.flush_all()
+        self.env.cr.execute("ANALYZE account_asset_line")
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        self.addCleanup(self.env.cr.execute, "SET LOCAL enable_seqscan = on")
+
+        self.assertIn(
+            "account_asset_line_unposted_index",
+            self._get_plan_indexes(
+                self.dl_model,
+                assets._get_due_depreciation_lines_domain(date(2020, 6, 30)),
+            ),
+        )
+        self.assertIn(
+            "account_asset_line_unposted_index",
+            self._get_plan_indexes(
+                self.dl_model,
+                [
+                    ("asset_id", "in", assets.ids),
+                    ("type", "=", "depreciate"),
+                    ("move_id", "=", False),
+                    ("init_entry", "=", False),
+                ],
+            ),
+        )
+        self.assertIn(
+            "account_asset_line_asset_type_date_index",
+            self._get_plan_indexes(
+                self.dl_model,
+                [("asset_id", "=", assets[0].id), ("type", "=", "create")],
+            ),
+        )
+        moves = assets.depreciation_line_ids.move_id
+        self.assertIn(
+            "account_asset_line__move_id_index",
+            self._get_plan_indexes(
+                self.dl_model,
+                [("move_id", "in", moves[:10].ids), ("type", "=", "depreciate")],
+            ),
+        )
+
+    def test_33_move_asset_count(self):
+        """The asset count of the entries is stored with their asset lines."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.validate()
+        line = asset.depreciation_line_ids.filtered(
+            lambda l: l.type == "depreciate"
+        ).sorted("line_date")[0]
+        line.create_move()
+        move = line.move_id
+        self.assertEqual(move.asset_line_ids, line)
+        self.assertEqual(move.asset_count, 1)
+        self.env.flush_all()
+        self.env.cr.execute(
+            "SELECT asset_count FROM account_move WHERE id = %s", (move.id,)
+        )
+        self.assertEqual(self.env.cr.fetchone()[0], 1)
+        self.assertEqual(move.action_view_assets()["res_id"], asset.id)
+        line.with_context(unlink_from_asset=True).write({"move_id": False})
+        self.assertEqual(move.asset_count, 0)
+
+    def test_34_batch_line_validation(self):
+        """The changes of the lines are validated against their posted lines."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % i,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 5000.0,
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "year",
+                }
+                for i in range(3)
+            ]
+        )
+        assets.validate()
+        dlines = assets.depreciation_line_ids.filtered(lambda l: l.type == "depreciate")
+        dlines.filtered(lambda l: l.line_date.year == 2019)._create_moves_batch()
+        unposted = dlines.filtered(lambda l: not l.move_check)
+        with self.assertRaises(UserError):
+            unposted.write({"line_date": "2019-06-30"})
+        with self.assertRaises(UserError):
+            unposted.write({"init_entry": True})
+        create_lines = assets.depreciation_line_ids.filtered(
+            lambda l: l.type == "create"
+        )
+        with self.assertRaises(UserError):
+            create_lines.write({"line_date": "2020-01-01"})
+
+        # Removing consecutive lines links the next line to the last line
+        # before them
+        lines = assets[0].depreciation_line_ids.filtered(
+            lambda l: l.type == "depreciate"
+        )
+        lines = lines.sorted(lambda l: (l.line_date, l.id))
+        lines[1:3].unlink()
+        self.assertEqual(lines[3].previous_id, lines[0])
+
+    def test_35_depreciation_forecast(self):
+        """The forecast projects the depreciations without writing lines."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.validate()
+        asset.depreciation_line_ids.filtered(lambda l: l.type == "depreciate").sorted(
+            "line_date"
+        )[0].create_move()
+        line_count = len(asset.depreciation_line_ids)
+        forecast = self.asset_model.get_depreciation_forecast(
+            date_from="2019-01-01",
+            date_to="2023-12-31",
+            domain=[("id", "=", asset.id)],
+        )
+        columns = forecast["columns"]
+        self.assertEqual(
+            columns["month"],
+            [
+                date(2020, 12, 1),
+                date(2021, 12, 1),
+                date(2022, 12, 1),
+                date(2023, 12, 1),
+            ],
+        )
+        self.assertEqual(columns["amount"], [1000.0] * 4)
+        self.assertEqual(
+            set(columns["account_id"]),
+            {self.car5y.account_expense_depreciation_id.id},
+        )
+        self.assertFalse(forecast["errors"])
+        self.assertEqual(len(asset.depreciation_line_ids), line_count)
+
+        # What-if: depreciate over 10 years, the excess posted in 2019 is
+        # compensated in 2020
+        forecast = self.asset_model.get_depreciation_forecast(
+            date_from="2019-01-01",
+            date_to="2023-12-31",
+            overrides={self.car5y.id: {"method_number": 10}},
+            domain=[("id", "=", asset.id)],
+        )
+        self.assertEqual(
+            forecast["columns"]["month"],
+            [date(2021, 12, 1), date(2022, 12, 1), date(2023, 12, 1)],
+        )
+        self.assertEqual(forecast["columns"]["amount"], [500.0] * 3)
+        self.assertEqual(len(asset.depreciation_line_ids), line_count)
+        with self.assertRaises(UserError):
+            self.asset_model.get_depreciation_forecast(
+                overrides={self.car5y.id: {"depreciation_base": 1.0}}
+            )
+
+    def test_36_compute_entries_dry_run(self):
+        """The simulation reports the entries without creating them."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.validate()
+        summary, error_log = asset.with_context(asset_dry_run=True)._compute_entries(
+            date(2020, 12, 31), check_triggers=True
+        )
+        self.assertFalse(error_log)
+        self.assertEqual(summary["move_count"], 2)
+        self.assertEqual(
+            summary["journal_totals"],
+            {self.car5y.journal_id.id: {"move_count": 2, "amount": 2000.0}},
+        )
+        self.assertEqual(
+            summary["account_totals"][self.car5y.account_expense_depreciation_id.id],
+            {"debit": 2000.0, "credit": 0.0},
+        )
+        self.assertFalse(asset.depreciation_line_ids.move_id)
+
+        wiz = self.env["account.asset.compute"].create(
+            {"date_end": "2020-12-31", "dry_run": True}
+        )
+        wiz.asset_compute()
+        self.assertIn(asset.profile_id.journal_id.display_name, wiz.note)
+        self.assertFalse(asset.depreciation_line_ids.move_id)
+
+    def test_37_consolidated_posting(self):
+        """The depreciations of a profile are posted in one entry per date."""
+        self.car5y.consolidated_posting = True
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % i,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 5000.0 * (i + 1),
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "year",
+                }
+                for i in range(3)
+            ]
+        )
+        assets.validate()
+        move_ids, error_log = assets._compute_entries(date(2020, 12, 31))
+        self.assertFalse(error_log)
+        moves = self.env["account.move"].browse(move_ids)
+        self.assertEqual(len(moves), 2)
+        self.assertEqual(set(moves.mapped("state")), {"posted"})
+        move_2019 = moves.filtered(lambda m: m.date == date(2019, 12, 31))
+        self.assertEqual(move_2019.asset_count, 3)
+        self.assertEqual(len(move_2019.line_ids), 2)
+        expense_line = move_2019.line_ids.filtered(
+            lambda l: l.account_id == self.car5y.account_expense_depreciation_id
+        )
+        self.assertEqual(expense_line.debit, 6000.0)
+        self.assertEqual(
+            expense_line.analytic_distribution, assets[0].analytic_distribution
+        )
+        self.assertEqual(
+            assets.depreciation_line_ids.filtered(
+                lambda l: l.line_date == date(2019, 12, 31)
+            ).move_id,
+            move_2019,
+        )
+        self.assertEqual(assets.mapped("value_depreciated"), [2000.0, 4000.0, 6000.0])
+
+        # Deleting the entry sets the lines of all its assets back to unposted
+        move_2020 = moves - move_2019
+        line = move_2020.asset_line_ids[0]
+        line.unlink_move()
+        self.assertFalse(move_2020.exists())
+        self.assertEqual(assets.mapped("value_depreciated"), [1000.0, 2000.0, 3000.0])
+
+    def test_38_compute_run_log(self):
+        """The compute wizard stores the metrics of the run per phase."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.validate()
+        wiz = self.env["account.asset.compute"].create({"date_end": "2020-12-31"})
+        action = wiz.asset_compute()
+        self.assertEqual(action["res_id"], wiz.id)
+        log = wiz.log_id
+        self.assertEqual(log.move_count, 2)
+        self.assertFalse(log.error_count)
+        self.assertTrue(log.query_count)
+        phases = {phase.phase: phase for phase in log.phase_ids}
+        self.assertEqual(phases["moves"].count, 2)
+        self.assertEqual(phases["post"].count, 2)
+        self.assertIn("flush", phases)
+        self.assertEqual(wiz.phase_ids, log.phase_ids)
+        self.assertEqual(
+            len(asset.depreciation_line_ids.filtered("move_id")), log.move_count
+        )
+
+    def test_39_depreciation_board_diff_values(self):
+        """The values of the lines following a changed line are recomputed."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.compute_depreciation_board()
+        lines = asset.depreciation_line_ids.filtered(lambda l: l.type == "depreciate")
+        lines = lines.sorted("line_date")
+        lines[2].amount = 500.0
+        self.dl_model._recompute_values_sql(asset.ids)
+        self.assertEqual(lines.mapped("remaining_value"), [4000, 3000, 2500, 1500, 500])
+        # Only the amount of the third line is changed back by the recompute
+        asset.compute_depreciation_board()
+        self.assertEqual(lines.mapped("amount"), [1000.0] * 5)
+        self.assertEqual(
+            lines.mapped("depreciated_value"), [0.0, 1000.0, 2000.0, 3000.0, 4000.0]
+        )
+        self.assertEqual(
+            lines.mapped("remaining_value"), [4000.0, 3000.0, 2000.0, 1000.0, 0.0]
+        )
+
+    def test_40_snapshots_follow_line_changes(self):
+        """The snapshots from a changed depreciation line onward are
+        refreshed, the previous ones are kept."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset.validate()
+        snapshot_model = self.env["account.asset.snapshot"]
+        snapshots = snapshot_model.search([("asset_id", "=", asset.id)], order="date")
+        self.assertEqual(len(snapshots), 5)
+        lines = asset.depreciation_line_ids.filtered(lambda l: l.type == "depreciate")
+        lines = lines.sorted("line_date")
+        lines[2].amount = 500.0
+        new_snapshots = snapshot_model.search(
+            [("asset_id", "=", asset.id)], order="date"
+        )
+        self.assertEqual(new_snapshots[:2], snapshots[:2])
+        self.assertEqual(
+            new_snapshots.mapped("depreciated_value"),
+            [1000.0, 2000.0, 2500.0, 3500.0, 4500.0],
+        )
+        self.assertEqual(new_snapshots[-1].value_residual, 500.0)
+        lines[-1].unlink()
+        new_snapshots = snapshot_model.search(
+            [("asset_id", "=", asset.id)], order="date"
+        )
+        self.assertEqual(len(new_snapshots), 4)
+        self.assertEqual(new_snapshots[:2], snapshots[:2])
+        lines[0].init_entry = True
+        new_snapshots = snapshot_model.search(
+            [("asset_id", "=", asset.id)], order="date"
+        )
+        self.assertEqual(new_snapshots.mapped("posted"), [True, False, False, False])
+
+    def test_41_depreciation_kernel_delegation(self):
+        """The kernel delegates to the overridden methods of the assets."""
+        asset = self.asset_model.create(
+            {
+                "name": "test asset",
+                "profile_id": self.car5y.id,
+                "purchase_value": 5000.0,
+                "date_start": "2019-01-01",
+                "method_time": "year",
+                "method_number": 5,
+                "method_period": "year",
+            }
+        )
+        asset_class = type(asset)
+        compute_year_amount = asset_class._compute_year_amount
+
+        def half_year_amount(self, *args):
+            return compute_year_amount(self, *args) / 2
+
+        with patch.object(asset_class, "_compute_year_amount", half_year_amount):
+            self.assertEqual(
+                asset._get_overridden_kernel_methods(), {"_compute_year_amount"}
+            )
+            self.assertEqual(asset._compute_depreciation_schedules_parallel(2), {})
+            asset.compute_depreciation_board()
+            lines = asset.depreciation_line_ids.filtered(
+                lambda l: l.type == "depreciate"
+            )
+            self.assertEqual(
+                lines.sorted("line_date").mapped("amount"),
+                [500.0, 500.0, 500.0, 500.0, 3000.0],
+            )
+        self.assertFalse(asset._get_overridden_kernel_methods())
+        # The delegated methods get the fiscal years of _get_fy_info
+        get_fy_duration_factor = asset_class._get_fy_duration_factor
+        fiscal_years = []
+
+        def _get_fy_duration_factor(self, entry, firstyear):
+            fiscal_years.append(entry["fy"])
+            return get_fy_duration_factor(self, entry, firstyear)
+
+        with patch.object(
+            asset_class, "_get_fy_duration_factor", _get_fy_duration_factor
+        ):
+            asset.compute_depreciation_board()
+        fiscal_year = asset._get_fy_info(date(2019, 1, 1))["record"]
+        self.assertIsInstance(fiscal_years[0], type(fiscal_year))
+        self.assertEqual(fiscal_years[0].date_from, fiscal_year.date_from)
+        asset.compute_depreciation_board()
+        self.assertEqual(
+            asset.depreciation_line_ids.filtered(
+                lambda l: l.type == "depreciate"
+            ).mapped("amount"),
+            [1000.0] * 5,
+        )
+
+    def test_42_compute_board_processes(self):
+        """The compute wizard recomputes the boards in a process pool."""
+        compute_model = self.env["account.asset.compute"]
+        with patch("os.cpu_count", return_value=2):
+            with self.assertRaises(ValidationError):
+                compute_model.create({"date_end": "2019-12-31", "board_processes": 3})
+            with patch.object(
+                account_asset_compute, "_board_process_importable", return_value=False
+            ), self.assertRaises(ValidationError):
+                compute_model.create({"date_end": "2019-12-31", "board_processes": 2})
+            if not account_asset._board_process_importable(
+                DepreciationKernel.__module__
+            ):
+                self.skipTest("The module is not installed in the Python path")
+            wiz = compute_model.create({"date_end": "2019-12-31", "board_processes": 2})
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % method,
+                    "profile_id": self.car5y.id,
+                    "purchase_value": 3333.0,
+                    "date_start": "2019-07-11",
+                    "method_time": "year",
+                    "method": method,
+                    "method_progress_factor": 0.4,
+                    "method_number": 5,
+                    "method_period": "year",
+                    "prorata": True,
+                }
+                for method in ["linear", "degressive", "degr-linear"]
+            ]
+        )
+        assets.validate()
+        serial_values = [
+            (line.asset_id, line.line_date, line.amount)
+            for line in assets.depreciation_line_ids
+        ]
+        self.env["account.asset.recompute.trigger"].create(
+            {
+                "reason": "Test",
+                "company_id": assets.company_id.id,
+                "asset_ids": [(6, 0, assets.ids)],
+            }
+        )
+        for asset in assets:
+            asset.depreciation_line_ids[-1].unlink()
+        with patch.object(account_asset, "BOARD_PROCESS_CHUNK_SIZE", 1), patch.object(
+            account_asset,
+            "ProcessPoolExecutor",
+            wraps=account_asset.ProcessPoolExecutor,
+        ) as pool:
+            wiz.asset_compute()
+        self.assertEqual(pool.call_count, 1)
+        self.assertEqual(
+            pool.call_args.kwargs["mp_context"].get_start_method(), "forkserver"
+        )
+        self.assertEqual(wiz.log_id.move_count, 3)
+        self.assertEqual(
+            [
+                (line.asset_id, line.line_date, line.amount)
+                for line in assets.depreciation_line_ids
+            ],
+            serial_values,
+        )
+
+    def test_43_multi_asset_removal_profiles(self):
+        """The removal accounts of several assets are those of their
+        profiles."""
+        expense_account = self.company_data["default_account_expense"]
+        revenue_account = self.company_data["default_account_revenue"]
+        self.car5y.account_min_value_id = expense_account
+        self.ict3Y.account_min_value_id = revenue_account
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test multi profile removal %s" % profile.name,
+                    "profile_id": profile.id,
+                    "purchase_value": 5000,
+                    "salvage_value": 0,
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "quarter",
+                    "prorata": False,
+                }
+                for profile in (self.car5y, self.ict3Y)
+            ]
+        )
+        assets.validate()
+        wiz = self.remove_model.with_context(
+            active_model="account.asset",
+            active_id=assets[1].id,
+            active_ids=assets.ids,
+            asset_remove_multi=True,
+        ).create({"date_remove": "2019-01-31", "posting_regime": "gain_loss_on_sale"})
+        self.assertEqual(wiz.company_id, assets.company_id)
+        self.assertFalse(wiz.account_min_value_id)
+        action = wiz.remove()
+        moves = self.env["account.move"].search(action["domain"])
+        self.assertEqual(len(moves), 2)
+        for asset, account in zip(assets, expense_account | revenue_account):
+            min_value_line = moves.line_ids.filtered(
+                lambda l: l.asset_id == asset and l.account_id == account
+            )
+            self.assertAlmostEqual(min_value_line.debit, 4918.54, places=2)
+        self.assertEqual(set(assets.mapped("state")), {"removed"})
+
+    def test_44_depreciation_kernel_errors(self):
+        """The errors of the kernel are reported per asset."""
+        assets = self.asset_model.create(
+            [
+                {
+                    "name": "test asset %s" % profile.name,
+                    "profile_id": profile.id,
+                    "purchase_value": 5000.0,
+                    "date_start": "2019-01-01",
+                    "method_time": "year",
+                    "method_number": 5,
+                    "method_period": "year",
+                }
+                for profile in (self.car5y, self.ict3Y)
+            ]
+        )
+        assets.validate()
+        overrides = {self.ict3Y.id: {"method": "illegal"}}
+        with self.assertRaisesRegex(UserError, "Illegal value illegal"):
+            assets[1].with_context(
+                asset_spec_overrides=overrides
+            )._compute_depreciation_table()
+        forecast = self.asset_model.get_depreciation_forecast(
+            date_from="2019-01-01",
+            date_to="2023-12-31",
+            overrides=overrides,
+            domain=[("id", "in", assets.ids)],
+        )
+        self.assertEqual(list(forecast["errors"]), assets[1].ids)
+        self.assertIn("Illegal value illegal", forecast["errors"][assets[1].id])
+        self.assertEqual(forecast["columns"]["amount"], [1000.0] * 5)
@@ -19,13 +19,13 @@ class TestAssetManagementXls(AccountTestInvoicingCommon):
         cls.wiz_model = cls.env["wiz.account.asset.report"]
         cls.company = cls.env.ref("base.main_company")
         # Ensure we have something to report on
-        group_fa = cls.env["account.asset.group"].create(
+        cls.group_fa = group_fa = cls.env["account.asset.group"].create(
             {
                 "name": "Fixed Assets",
                 "code": "FA",
             }
         )
-        group_tfa = cls.env["account.asset.group"].create(
+        cls.group_tfa = group_tfa = cls.env["account.asset.group"].create(
             {
                 "name": "Tangible Fixed Assets",
                 "code": "TFA",
@@ -49,7 +49,7 @@ class TestAssetManagementXls(AccountTestInvoicingCommon):
                 "method_period": "year",
             }
         )
-        cls.env["account.asset"].create(
+        cls.asset = cls.env["account.asset"].create(
             {
                 "state": "draft",
                 "method_time": "year",
@@ -61,7 +61,8 @@ class TestAssetManagementXls(AccountTestInvoicingCommon):
                 "profile_id": ict3Y.id,
                 "date_start": time.strftime("%Y-01-01"),
             }
-        ).validate()
+        )
+        cls.asset.validate()
         fy_dates = cls.company.compute_fiscalyear_dates(fields.date.today())
 
         wiz_vals = {
@@ -86,3 +87,51 @@ class TestAssetManagementXls(AccountTestInvoicingCommon):
             active_model=self.xls_report._name, **self.report_action["context"]
         )
         model.create_xlsx_report(self.xls_report.ids, data=self.report_action["data"])
+
+    def test_02_action_xls_streaming(self):
+        """Generate the report row by row with a constant memory usage"""
+        self.xls_report.streaming = True
+        report_action = self.xls_report.xls_export()
+        self.assertTrue(report_action["context"]["asset_report_streaming"])
+        model = self.env["report.%s" % report_action["report_name"]].with_context(
+            active_model=self.xls_report._name, **report_action["context"]
+        )
+        self.assertTrue(model.get_workbook_options()["constant_memory"])
+        content, report_type = model.create_xlsx_report(
+            self.xls_report.ids, data=report_action["data"]
+        )
+        self.assertEqual(report_type, "xlsx")
+        self.assertTrue(content)
+
+    def test_03_depreciated_values(self):
+        """The depreciated values of the period are read in one query"""
+        self.asset.compute_depreciation_board()
+        model = self.env["report.%s" % self.xls_report_name]
+        self.assertEqual(
+            model._get_depreciated_values(self.xls_report, self.asset),
+            {self.asset.id: (0.0, 500.0)},
+        )
+
+    def test_04_group_assets(self):
+        """The assets are nested by group along the group tree"""
+        model = self.env["report.%s" % self.xls_report_name]
+        grouped_assets = {}
+        model._group_assets(self.asset, self.group_fa, grouped_assets)
+        fa_val = grouped_assets[self.group_fa]
+        self.assertFalse(fa_val["assets"])
+        self.assertEqual(fa_val[self.group_tfa]["assets"], self.asset)
+
+    def test_05_classify_assets(self):
+        """The assets of all the sheets are classified in one pass"""
+        model = self.env["report.%s" % self.xls_report_name]
+        data = {}
+        model._get_assets(self.xls_report, data)
+        self.assertEqual(
+            data["report_asset_ids"],
+            {
+                "acquisition": {self.asset.id},
+                "active": {self.asset.id},
+                "removal": set(),
+            },
+        )
+        self.assertEqual(set(data["asset_values"]), {self.asset.id})
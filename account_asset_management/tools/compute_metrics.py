@@ -0,0 +1,60 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class ComputeMetrics:
+    """Counters, durations and query counts of the phases of an asset
+    compute run.
+
+    The duration and the queries of a phase exclude those of the phases
+    nested in it, e.g. the recompute of the depreciation values triggered
+    while the boards are recomputed.
+    """
+
+    def __init__(self, cr):
+        self.cr = cr
+        self.phases = {}
+        self._stack = []
+        self._start = time.perf_counter()
+        self._start_query_count = cr.sql_log_count
+
+    @contextmanager
+    def phase(self, name, count=0):
+        # duration and query count of the nested phases
+        nested = [0.0, 0]
+        self._stack.append(nested)
+        start = time.perf_counter()
+        start_query_count = self.cr.sql_log_count
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            duration = time.perf_counter() - start
+            query_count = self.cr.sql_log_count - start_query_count
+            if self._stack:
+                self._stack[-1][0] += duration
+                self._stack[-1][1] += query_count
+            metrics = self.phases.setdefault(
+                name, {"count": 0, "duration": 0.0, "query_count": 0}
+            )
+            metrics["count"] += count
+            metrics["duration"] += duration - nested[0]
+            metrics["query_count"] += query_count - nested[1]
+
+    def duration(self):
+        return time.perf_counter() - self._start
+
+    def query_count(self):
+        return self.cr.sql_log_count - self._start_query_count
+
+
+def compute_phase(env, name, count=0):
+    """Return a context manager measuring the phase ``name`` of the asset
+    compute run of which the metrics are in the context of ``env``, if any.
+    """
+    metrics = env.context.get("asset_compute_metrics")
+    if metrics is None:
+        return nullcontext()
+    return metrics.phase(name, count=count)
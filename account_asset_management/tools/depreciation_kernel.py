@@ -0,0 +1,734 @@
+# Copyright 2009-2018 Noviat
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+"""Depreciation schedule of an asset, independent from the ORM.
+
+The kernel computes the depreciation table of an immutable asset
+specification within a fiscal year calendar. It has no side effects, so
+that schedules can be computed, compared or benchmarked without records.
+"""
+
+import calendar
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+
+from dateutil.relativedelta import relativedelta
+
+from odoo.tools.date_utils import get_fiscal_year
+from odoo.tools.float_utils import float_compare, float_is_zero, float_round
+
+ONE_DAY = timedelta(days=1)
+# Length in months of the periods ending on calendar dates
+PERIOD_MONTHS = {"month": 1, "quarter": 3}
+
+
+class IllegalMethodError(Exception):
+    """The depreciation method of a spec is not supported by the kernel."""
+
+    def __init__(self, method):
+        super().__init__(method)
+        self.method = method
+
+
+@lru_cache(maxsize=1024)
+def period_end_dates(period_months, first_year, last_year):
+    """Return the last days of the periods of ``period_months`` months of
+    the calendar years from ``first_year`` to ``last_year``.
+
+    The result is cached: the assets depreciated over the same years share
+    the same dates, and only slice them.
+    """
+    return tuple(
+        date(year, month, calendar.monthrange(year, month)[1])
+        for year in range(first_year, last_year + 1)
+        for month in range(period_months, 13, period_months)
+    )
+
+
+@dataclass(frozen=True)
+class DepreciationSpec:
+    """Depreciation parameters of an asset."""
+
+    __slots__ = (
+        "depreciation_base",
+        "salvage_value",
+        "date_start",
+        "method",
+        "method_number",
+        "method_period",
+        "method_end",
+        "method_time",
+        "method_progress_factor",
+        "prorata",
+        "days_calc",
+        "use_leap_years",
+        "fiscalyear_lock_date",
+        "rounding",
+    )
+
+    depreciation_base: float
+    salvage_value: float
+    date_start: date
+    method: str
+    method_number: int
+    method_period: str
+    method_end: date
+    method_time: str
+    method_progress_factor: float
+    prorata: bool
+    days_calc: bool
+    use_leap_years: bool
+    fiscalyear_lock_date: date
+    rounding: float
+
+    def serialize(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def deserialize(cls, data):
+        return cls(*data)
+
+
+@dataclass(frozen=True)
+class FiscalYear:
+    __slots__ = ("date_from", "date_to")
+
+    date_from: date
+    date_to: date
+
+
+@dataclass
+class ScheduleLine:
+    """Depreciation line of a schedule."""
+
+    __slots__ = (
+        "date",
+        "days",
+        "amount",
+        "depreciated_value",
+        "remaining_value",
+        "init",
+    )
+
+    date: date
+    days: int
+    amount: float
+    depreciated_value: float
+    remaining_value: float
+    init: bool
+
+    def serialize(self):
+        return (
+            self.date,
+            self.days,
+            self.amount,
+            self.depreciated_value,
+            self.remaining_value,
+            self.init,
+        )
+
+    def as_dict(self):
+        return {
+            "date": self.date,
+            "days": self.days,
+            "amount": self.amount,
+            "depreciated_value": self.depreciated_value,
+            "remaining_value": self.remaining_value,
+            "init": self.init,
+        }
+
+
+@dataclass
+class ScheduleEntry:
+    """Fiscal year of a schedule with its depreciation lines."""
+
+    __slots__ = (
+        "fiscal_year",
+        "date_start",
+        "date_stop",
+        "period_amount",
+        "fy_amount",
+        "day_amount",
+        "lines",
+    )
+
+    fiscal_year: FiscalYear
+    date_start: date
+    date_stop: date
+    period_amount: float
+    fy_amount: float
+    day_amount: float
+    lines: list
+
+    @classmethod
+    def from_fiscal_year(cls, fiscal_year):
+        return cls(
+            fiscal_year, fiscal_year.date_from, fiscal_year.date_to, 0.0, 0.0, 0.0, []
+        )
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(
+            entry["fy"],
+            entry["date_start"],
+            entry["date_stop"],
+            entry.get("period_amount") or 0.0,
+            entry.get("fy_amount") or 0.0,
+            entry.get("day_amount") or 0.0,
+            [ScheduleLine(**line) for line in entry.get("lines", [])],
+        )
+
+    def serialize(self):
+        return (
+            self.fiscal_year.date_from,
+            self.fiscal_year.date_to,
+            self.date_start,
+            self.date_stop,
+            self.period_amount,
+            self.fy_amount,
+            self.day_amount,
+            tuple(line.serialize() for line in self.lines),
+        )
+
+    @classmethod
+    def deserialize(cls, data):
+        fy_date_from, fy_date_to, *values, lines = data
+        return cls(
+            FiscalYear(fy_date_from, fy_date_to),
+            *values,
+            [ScheduleLine(*line) for line in lines],
+        )
+
+    def as_dict(self):
+        return {
+            "fy": self.fiscal_year,
+            "date_start": self.date_start,
+            "date_stop": self.date_stop,
+            "period_amount": self.period_amount,
+            "fy_amount": self.fy_amount,
+            "day_amount": self.day_amount,
+            "lines": [line.as_dict() for line in self.lines],
+        }
+
+
+class FiscalYearCalendar:
+    """Fiscal years given by their dates, or ending every year on the same
+    day otherwise.
+
+    Override ``_compute_fiscal_year`` for other calendars. The fiscal years
+    are cached by date, so that a calendar can be shared by many schedules.
+    """
+
+    __slots__ = ("last_day", "last_month", "_date_froms", "_fiscal_years", "_cache")
+
+    def __init__(self, last_day=31, last_month=12, fiscal_years=()):
+        self.last_day = last_day
+        self.last_month = last_month
+        self._fiscal_years = sorted(fiscal_years, key=lambda fy: fy.date_from)
+        self._date_froms = [fy.date_from for fy in self._fiscal_years]
+        self._cache = {}
+
+    def fiscal_year(self, day):
+        fiscal_year = self._cache.get(day)
+        if fiscal_year is None:
+            fiscal_year = self._cache[day] = self._compute_fiscal_year(day)
+        return fiscal_year
+
+    def _compute_fiscal_year(self, day):
+        i = bisect_right(self._date_froms, day) - 1
+        if i >= 0 and day <= self._fiscal_years[i].date_to:
+            return self._fiscal_years[i]
+        return FiscalYear(
+            *get_fiscal_year(day, day=self.last_day, month=self.last_month)
+        )
+
+    def snapshot(self, date_from, date_to):
+        """Return a ``FiscalYearCalendar`` with the fiscal years of this
+        calendar from ``date_from`` to ``date_to``.
+        """
+        fiscal_years = []
+        day = date_from
+        while day <= date_to:
+            fiscal_year = self.fiscal_year(day)
+            fiscal_years.append(fiscal_year)
+            day = fiscal_year.date_to + ONE_DAY
+        return FiscalYearCalendar(self.last_day, self.last_month, fiscal_years)
+
+    def serialize(self):
+        return (
+            self.last_day,
+            self.last_month,
+            tuple((fy.date_from, fy.date_to) for fy in self._fiscal_years),
+        )
+
+    @classmethod
+    def deserialize(cls, data):
+        last_day, last_month, fiscal_years = data
+        return cls(last_day, last_month, [FiscalYear(*fy) for fy in fiscal_years])
+
+
+class DepreciationKernel:
+    """Compute the depreciation schedule of a ``DepreciationSpec``.
+
+    Localization: subclass the kernel and return it from
+    ``account.asset._get_depreciation_kernel_class`` to change the
+    depreciation logic.
+    """
+
+    __slots__ = ("spec", "calendar")
+
+    def __init__(self, spec, calendar):
+        self.spec = spec
+        self.calendar = calendar
+
+    def _round(self, amount):
+        return float_round(amount, precision_rounding=self.spec.rounding)
+
+    def _compare(self, amount1, amount2):
+        return float_compare(amount1, amount2, precision_rounding=self.spec.rounding)
+
+    def _is_zero(self, amount):
+        return float_is_zero(amount, precision_rounding=self.spec.rounding)
+
+    def compute_schedule(self):
+        """Return the depreciation table, with the lines prior to the
+        depreciation start grouped.
+        """
+        table = self.compute_table()
+        if table:
+            self.group_lines(table)
+        return table
+
+    def compute_table(self):
+        spec = self.spec
+        table = []
+        if (
+            spec.method_time in ["year", "number"]
+            and not spec.method_number
+            and not spec.method_end
+        ):
+            return table
+        asset_date_start = spec.date_start
+        depreciation_start_date = self.depreciation_start_date(
+            self.calendar.fiscal_year(asset_date_start)
+        )
+        depreciation_stop_date = self.depreciation_stop_date(depreciation_start_date)
+        fy_date_start = asset_date_start
+        while fy_date_start <= depreciation_stop_date:
+            fiscal_year = self.calendar.fiscal_year(fy_date_start)
+            table.append(ScheduleEntry.from_fiscal_year(fiscal_year))
+            fy_date_start = fiscal_year.date_to + ONE_DAY
+        # Step 1:
+        # Calculate depreciation amount per fiscal year.
+        # This is calculation is skipped for method_time != 'year'.
+        line_dates = self.line_dates(
+            table, depreciation_start_date, depreciation_stop_date
+        )
+        table = self.amount_per_fiscal_year(
+            table, line_dates, depreciation_start_date, depreciation_stop_date
+        )
+        # Step 2:
+        # Spread depreciation amount per fiscal year
+        # over the depreciation periods.
+        self.table_lines(
+            table, depreciation_start_date, depreciation_stop_date, line_dates
+        )
+        return table
+
+    def group_lines(self, table):
+        """group lines prior to depreciation start period."""
+        depreciation_start_date = self.spec.date_start
+        lines = table[0].lines
+        lines1 = []
+        lines2 = []
+        flag = lines[0].date < depreciation_start_date
+        for line in lines:
+            if flag:
+                lines1.append(line)
+                if line.date >= depreciation_start_date:
+                    flag = False
+            else:
+                lines2.append(line)
+        if lines1:
+            grouped_line = lines1[-1]
+            amount = lines1[0].amount
+            for line in lines1[1:]:
+                amount = amount + line.amount
+            grouped_line.amount = amount
+            grouped_line.depreciated_value = 0.0
+            lines1 = [grouped_line]
+        table[0].lines = lines1 + lines2
+
+    def fy_duration(self, fiscal_year, option="days"):
+        """Returns fiscal year duration.
+
+        @param option:
+        - days: duration in days
+        - months: duration in months,
+                  a started month is counted as a full month
+        - years: duration in calendar years, considering also leap years
+        """
+        fy_date_start = fiscal_year.date_from
+        fy_date_stop = fiscal_year.date_to
+        if option == "days":
+            return (fy_date_stop - fy_date_start).days + 1
+        elif option == "months":
+            return (
+                (fy_date_stop.year - fy_date_start.year) * 12
+                + (fy_date_stop.month - fy_date_start.month)
+                + 1
+            )
+        elif option == "years":
+            year = fy_date_start.year
+            cnt = fy_date_stop.year - fy_date_start.year + 1
+            for i in range(cnt):
+                cy_days = calendar.isleap(year) and 366 or 365
+                if i == 0:  # first year
+                    if fy_date_stop.year == year:
+                        duration = (fy_date_stop - fy_date_start).days + 1
+                    else:
+                        duration = (date(year, 12, 31) - fy_date_start).days + 1
+                    factor = float(duration) / cy_days
+                elif i == cnt - 1:  # last year
+                    duration = (fy_date_stop - date(year, 1, 1)).days + 1
+                    factor += float(duration) / cy_days
+                else:
+                    factor += 1.0
+                year += 1
+            return factor
+
+    def fy_duration_factor(self, entry, firstyear):
+        """
+        localization: override this method to change the logic used to
+        calculate the impact of extended/shortened fiscal years
+        """
+        spec = self.spec
+        fiscal_year = entry.fiscal_year
+        if spec.prorata:
+            if firstyear:
+                first_fy_asset_days = (entry.date_stop - spec.date_start).days + 1
+                first_fy_duration = self.fy_duration(fiscal_year, option="days")
+                first_fy_year_factor = self.fy_duration(fiscal_year, option="years")
+                return (
+                    float(first_fy_asset_days)
+                    / first_fy_duration
+                    * first_fy_year_factor
+                )
+            return self.fy_duration(fiscal_year, option="years")
+        fy_months = self.fy_duration(fiscal_year, option="months")
+        return float(fy_months) / 12
+
+    def depreciation_start_date(self, fiscal_year):
+        """
+        In case of 'Linear': the first month is counted as a full month
+        if the fiscal year starts in the middle of a month.
+        """
+        if self.spec.prorata:
+            return self.spec.date_start
+        return fiscal_year.date_from
+
+    def depreciation_stop_date(self, depreciation_start_date):
+        spec = self.spec
+        if spec.method_time == "year" and not spec.method_end:
+            depreciation_stop_date = depreciation_start_date + relativedelta(
+                years=spec.method_number, days=-1
+            )
+        elif spec.method_time == "number":
+            if spec.method_period == "month":
+                depreciation_stop_date = depreciation_start_date + relativedelta(
+                    months=spec.method_number, days=-1
+                )
+            elif spec.method_period == "quarter":
+                m = [x for x in [3, 6, 9, 12] if x >= depreciation_start_date.month][0]
+                first_line_date = depreciation_start_date + relativedelta(
+                    month=m, day=31
+                )
+                months = spec.method_number * 3
+                depreciation_stop_date = first_line_date + relativedelta(
+                    months=months - 1, days=-1
+                )
+            elif spec.method_period == "year":
+                depreciation_stop_date = depreciation_start_date + relativedelta(
+                    years=spec.method_number, days=-1
+                )
+        elif spec.method_time == "year" and spec.method_end:
+            depreciation_stop_date = spec.method_end
+        return depreciation_stop_date
+
+    def first_period_amount(self, table, entry, depreciation_start_date, line_dates):
+        """
+        Return prorata amount for Time Method 'Year' in case of
+        'Prorata Temporis'
+        """
+        amount = entry.period_amount
+        if self.spec.prorata and self.spec.method_time == "year":
+            dates = [x for x in line_dates if x <= entry.date_stop]
+            full_periods = len(dates) - 1
+            amount = entry.fy_amount - amount * full_periods
+        return amount
+
+    def amount_linear(self, depreciation_start_date, depreciation_stop_date, entry):
+        """
+        Override this method if you want to compute differently the
+        yearly amount.
+        """
+        spec = self.spec
+        if not spec.use_leap_years and spec.method_number:
+            return spec.depreciation_base / spec.method_number
+        year = entry.date_stop.year
+        cy_days = calendar.isleap(year) and 366 or 365
+        days = (depreciation_stop_date - depreciation_start_date).days + 1
+        return (spec.depreciation_base / days) * cy_days
+
+    def year_amount(
+        self, residual_amount, depreciation_start_date, depreciation_stop_date, entry
+    ):
+        """
+        Localization: override this method to change the degressive-linear
+        calculation logic according to local legislation.
+        """
+        spec = self.spec
+        year_amount_linear = self.amount_linear(
+            depreciation_start_date, depreciation_stop_date, entry
+        )
+        if spec.method == "linear":
+            return year_amount_linear
+        if spec.method == "linear-limit":
+            if (residual_amount - year_amount_linear) < spec.salvage_value:
+                return residual_amount - spec.salvage_value
+            else:
+                return year_amount_linear
+        year_amount_degressive = residual_amount * spec.method_progress_factor
+        if spec.method == "degressive":
+            return year_amount_degressive
+        if spec.method == "degr-linear":
+            if year_amount_linear > year_amount_degressive:
+                return min(year_amount_linear, residual_amount)
+            else:
+                return min(year_amount_degressive, residual_amount)
+        if spec.method == "degr-limit":
+            if (residual_amount - year_amount_degressive) < spec.salvage_value:
+                return residual_amount - spec.salvage_value
+            else:
+                return year_amount_degressive
+        raise IllegalMethodError(spec.method)
+
+    def line_dates(self, table, start_date, stop_date):
+        """
+        The posting dates of the accounting entries depend on the
+        chosen 'Period Length' as follows:
+        - month: last day of the month
+        - quarter: last of the quarter
+        - year: last day of the fiscal year
+
+        Override this method if another posting date logic is required.
+        """
+        spec = self.spec
+        period_months = PERIOD_MONTHS.get(spec.method_period)
+        if period_months:
+            periods_per_year = 12 // period_months
+            first = (start_date.month - 1) // period_months
+            last = max(
+                first,
+                (stop_date.year - start_date.year) * periods_per_year
+                + (stop_date.month - 1) // period_months,
+            )
+            end_dates = period_end_dates(
+                period_months,
+                start_date.year,
+                max(start_date.year, stop_date.year),
+            )
+            line_dates = list(end_dates[first:last])
+            line_date = end_dates[last]
+        elif spec.method_period == "year":
+            line_dates = []
+            line_date = table[0].date_stop
+            i = 1
+            while line_date < stop_date:
+                line_dates.append(line_date)
+                line_date = table[i].date_stop
+                i += 1
+
+        # last entry
+        if not (spec.method_time == "number" and len(line_dates) == spec.method_number):
+            if spec.days_calc:
+                line_dates.append(stop_date)
+            else:
+                line_dates.append(line_date)
+
+        return line_dates
+
+    def amount_per_fiscal_year(
+        self, table, line_dates, depreciation_start_date, depreciation_stop_date
+    ):
+        spec = self.spec
+        fy_residual_amount = spec.depreciation_base
+        i_max = len(table) - 1
+        asset_sign = spec.depreciation_base >= 0 and 1 or -1
+        day_amount = 0.0
+        if spec.days_calc:
+            days = (depreciation_stop_date - depreciation_start_date).days + 1
+            day_amount = spec.depreciation_base / days
+
+        for i, entry in enumerate(table):
+            if spec.method_time == "year":
+                year_amount = self.year_amount(
+                    fy_residual_amount,
+                    depreciation_start_date,
+                    depreciation_stop_date,
+                    entry,
+                )
+                if spec.method_period == "year":
+                    period_amount = year_amount
+                elif spec.method_period == "quarter":
+                    period_amount = year_amount / 4
+                elif spec.method_period == "month":
+                    period_amount = year_amount / 12
+                if i == i_max:
+                    if spec.method in ["linear-limit", "degr-limit"]:
+                        fy_amount = fy_residual_amount - spec.salvage_value
+                    else:
+                        fy_amount = fy_residual_amount
+                else:
+                    firstyear = i == 0 and True or False
+                    fy_factor = self.fy_duration_factor(entry, firstyear)
+                    fy_amount = year_amount * fy_factor
+                if self._compare(asset_sign * (fy_amount - fy_residual_amount), 0) > 0:
+                    fy_amount = fy_residual_amount
+                period_amount = self._round(period_amount)
+                fy_amount = self._round(fy_amount)
+            else:
+                fy_amount = False
+                if spec.method_time == "number":
+                    number = spec.method_number
+                else:
+                    number = len(line_dates)
+                period_amount = self._round(spec.depreciation_base / number)
+            entry.period_amount = period_amount
+            entry.fy_amount = fy_amount
+            entry.day_amount = day_amount
+            if spec.method_time == "year":
+                fy_residual_amount -= fy_amount
+                if self._is_zero(fy_residual_amount):
+                    break
+        i_max = i
+        table = table[: i_max + 1]
+        return table
+
+    def table_lines(
+        self, table, depreciation_start_date, depreciation_stop_date, line_dates
+    ):
+        spec = self.spec
+        asset_sign = 1 if spec.depreciation_base >= 0 else -1
+        i_max = len(table) - 1
+        remaining_value = spec.depreciation_base
+        depreciated_value = 0.0
+        fiscalyear_lock_date = spec.fiscalyear_lock_date
+
+        for i, entry in enumerate(table):
+
+            lines = []
+            fy_amount_check = 0.0
+            fy_amount = entry.fy_amount
+            li_max = len(line_dates) - 1
+            prev_date = max(entry.date_start, depreciation_start_date)
+            for li, line_date in enumerate(line_dates):
+                line_days = (line_date - prev_date).days + 1
+                if self._is_zero(remaining_value):
+                    break
+
+                if line_date > min(entry.date_stop, depreciation_stop_date) and not (
+                    i == i_max and li == li_max
+                ):
+                    prev_date = line_date
+                    break
+                else:
+                    prev_date = line_date + ONE_DAY
+
+                if (
+                    spec.method == "degr-linear"
+                    and self._compare(asset_sign * (fy_amount - fy_amount_check), 0) < 0
+                ):
+                    break
+
+                if i == 0 and li == 0:
+                    if self._compare(entry.day_amount, 0) > 0:
+                        amount = line_days * entry.day_amount
+                    else:
+                        amount = self.first_period_amount(
+                            table, entry, depreciation_start_date, line_dates
+                        )
+                        amount = self._round(amount)
+                else:
+                    if self._compare(entry.day_amount, 0) > 0:
+                        amount = line_days * entry.day_amount
+                    else:
+                        amount = entry.period_amount
+
+                # last year, last entry
+                # Handle rounding deviations.
+                if i == i_max and li == li_max:
+                    amount = remaining_value
+                    remaining_value = 0.0
+                else:
+                    remaining_value -= amount
+                fy_amount_check += amount
+                lines.append(
+                    ScheduleLine(
+                        line_date,
+                        line_days,
+                        amount,
+                        depreciated_value,
+                        remaining_value,
+                        fiscalyear_lock_date >= line_date,
+                    )
+                )
+                depreciated_value += amount
+
+            # Handle rounding and extended/shortened FY deviations.
+            #
+            # Remark:
+            # In account_asset_management version < 8.0.2.8.0
+            # the FY deviation for the first FY
+            # was compensated in the first FY depreciation line.
+            # The code has now been simplified with compensation
+            # always in last FT depreciation line.
+            if spec.method_time == "year" and not entry.day_amount:
+                if not self._is_zero(fy_amount_check - fy_amount):
+                    diff = fy_amount_check - fy_amount
+                    amount = amount - diff
+                    remaining_value += diff
+                    lines[-1].amount = amount
+                    lines[-1].remaining_value = remaining_value
+                    depreciated_value -= diff
+
+            if not lines:
+                table.pop(i)
+            else:
+                entry.lines = lines
+            line_dates = line_dates[li:]
+
+        for entry in table:
+            if not entry.fy_amount:
+                entry.fy_amount = sum(line.amount for line in entry.lines)
+
+
+def compute_serialized_schedules(kernel_class, calendar_data, specs_data):
+    """Compute the schedules of serialized specs within a serialized
+    calendar and return them serialized.
+
+    This is the task run by the worker processes of a process pool: its
+    arguments and results only hold builtin types, so that they can be
+    pickled.
+    """
+    fiscal_year_calendar = FiscalYearCalendar.deserialize(calendar_data)
+    return [
+        tuple(
+            entry.serialize()
+            for entry in kernel_class(
+                DepreciationSpec.deserialize(spec_data), fiscal_year_calendar
+            ).compute_schedule()
+        )
+        for spec_data in specs_data
+    ]
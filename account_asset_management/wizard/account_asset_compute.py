@@ -1,7 +1,15 @@
 # Copyright 2009-2018 Noviat
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import _, fields, models
+import os
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.tools.misc import formatLang
+
+from ..models.account_asset import _board_process_importable
+from ..tools.compute_metrics import ComputeMetrics
+from ..tools.depreciation_kernel import compute_serialized_schedules
 
 
 class AccountAssetCompute(models.TransientModel):
@@ -15,40 +23,125 @@ class AccountAssetCompute(models.TransientModel):
         help="All depreciation lines prior to this date will be automatically"
         " posted",
     )
+    bulk_posting = fields.Boolean(
+        help="Create and post the depreciation entries by chunks instead of "
+        "one by one. The entries of a chunk that fails are posted one by one.",
+    )
+    board_processes = fields.Integer(
+        string="Parallel Processes",
+        help="Number of processes computing the depreciation tables of the "
+        "assets to recompute. Leave 0 to compute them in the server process. "
+        "It cannot exceed the number of CPUs of the server. The processes are "
+        "started by a forkserver, which requires the module to be installed "
+        "in the Python path of the server, not only in its addons path.",
+    )
+    dry_run = fields.Boolean(
+        string="Simulation",
+        help="Report the entries that would be created and the assets that "
+        "would fail, without creating any entry.",
+    )
     note = fields.Text()
+    log_id = fields.Many2one(
+        comodel_name="account.asset.compute.log", string="Run", readonly=True
+    )
+    phase_ids = fields.One2many(related="log_id.phase_ids")
+
+    @api.constrains("board_processes")
+    def _check_board_processes(self):
+        max_processes = os.cpu_count() or 1
+        for wizard in self:
+            if not 0 <= wizard.board_processes <= max_processes:
+                raise ValidationError(
+                    _("The number of parallel processes must be between 0 and %s.")
+                    % max_processes
+                )
+            if wizard.board_processes > 1 and not _board_process_importable(
+                compute_serialized_schedules.__module__
+            ):
+                raise ValidationError(
+                    _(
+                        "The depreciation tables cannot be computed in parallel "
+                        "processes: the module must be installed in the Python "
+                        "path of the server."
+                    )
+                )
 
     def asset_compute(self):
-        assets = self.env["account.asset"].search([("state", "=", "open")])
-        created_move_ids, error_log = assets._compute_entries(
-            self.date_end, check_triggers=True
+        metrics = ComputeMetrics(self.env.cr)
+        assets = (
+            self.env["account.asset"]
+            .with_context(
+                asset_bulk_posting=self.bulk_posting,
+                asset_board_processes=self.board_processes,
+                asset_dry_run=self.dry_run,
+                asset_compute_metrics=metrics,
+            )
+            .search([("state", "=", "open")])
         )
+        result, error_log = assets._compute_entries(self.date_end, check_triggers=True)
 
-        if error_log:
-            module = __name__.split("addons.")[1].split(".")[0]
-            result_view = self.env.ref(
-                "{}.{}_view_form_result".format(module, self._table)
-            )
-            self.note = _("Compute Assets errors") + ":\n" + error_log
-            return {
-                "name": _("Compute Assets result"),
-                "res_id": self.id,
-                "view_mode": "form",
-                "res_model": "account.asset.compute",
-                "view_id": result_view.id,
-                "target": "new",
-                "type": "ir.actions.act_window",
-                "context": {"asset_move_ids": created_move_ids},
-            }
+        if self.dry_run:
+            move_count = result["move_count"]
+            created_move_ids = []
+            self.note = self._format_simulation(result, error_log)
+        else:
+            move_count = len(result)
+            created_move_ids = result
+            self.note = _("Entries created: %s") % move_count
+            if error_log:
+                self.note += "\n\n" + _("Compute Assets errors") + ":\n" + error_log
+        self.log_id = self.env["account.asset.compute.log"]._create_from_metrics(
+            metrics, self.date_end, move_count, error_log, self.dry_run
+        )
+        return self._get_result_action(created_move_ids)
 
+    def _get_result_action(self, created_move_ids):
+        module = __name__.split("addons.")[1].split(".")[0]
+        result_view = self.env.ref("{}.{}_view_form_result".format(module, self._table))
         return {
-            "name": _("Created Asset Moves"),
-            "view_mode": "tree,form",
-            "res_model": "account.move",
-            "view_id": False,
-            "domain": [("id", "in", created_move_ids)],
+            "name": _("Compute Assets result"),
+            "res_id": self.id,
+            "view_mode": "form",
+            "res_model": "account.asset.compute",
+            "view_id": result_view.id,
+            "target": "new",
             "type": "ir.actions.act_window",
+            "context": {"asset_move_ids": created_move_ids},
         }
 
+    def _format_simulation(self, summary, error_log):
+        """Return the text of the result of a simulation."""
+        currency = self.env.company.currency_id
+        lines = [
+            _("Entries to create: %s") % summary["move_count"],
+            "",
+            _("Per journal") + ":",
+        ]
+        journals = self.env["account.journal"].browse(summary["journal_totals"])
+        for journal in journals:
+            totals = summary["journal_totals"][journal.id]
+            lines.append(
+                "  {}: {} - {}".format(
+                    journal.display_name,
+                    totals["move_count"],
+                    formatLang(self.env, totals["amount"], currency_obj=currency),
+                )
+            )
+        lines += ["", _("Per account") + ":"]
+        accounts = self.env["account.account"].browse(summary["account_totals"])
+        for account in accounts.sorted("code"):
+            totals = summary["account_totals"][account.id]
+            lines.append(
+                "  {}: {} / {}".format(
+                    account.display_name,
+                    formatLang(self.env, totals["debit"], currency_obj=currency),
+                    formatLang(self.env, totals["credit"], currency_obj=currency),
+                )
+            )
+        if error_log:
+            lines += ["", _("Compute Assets errors") + ":" + error_log]
+        return "\n".join(lines)
+
     def view_asset_moves(self):
         self.ensure_one()
         domain = [("id", "in", self.env.context.get("asset_move_ids", []))]
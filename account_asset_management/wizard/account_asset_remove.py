@@ -3,6 +3,7 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import logging
+from collections import defaultdict
 
 from dateutil.relativedelta import relativedelta
 
@@ -49,18 +50,21 @@ class AccountAssetRemove(models.TransientModel):
         string="Plus-Value Account",
         domain="[('deprecated', '=', False), ('company_id', '=', company_id)]",
         default=lambda self: self._default_account_plus_value_id(),
+        help="Leave empty to use the account of the profile of each removed " "asset.",
     )
     account_min_value_id = fields.Many2one(
         comodel_name="account.account",
         string="Min-Value Account",
         domain="[('deprecated', '=', False), ('company_id', '=', company_id)]",
         default=lambda self: self._default_account_min_value_id(),
+        help="Leave empty to use the account of the profile of each removed " "asset.",
     )
     account_residual_value_id = fields.Many2one(
         comodel_name="account.account",
         string="Residual Value Account",
         domain="[('deprecated', '=', False), ('company_id', '=', company_id)]",
         default=lambda self: self._default_account_residual_value_id(),
+        help="Leave empty to use the account of the profile of each removed " "asset.",
     )
     posting_regime = fields.Selection(
         selection=lambda self: self._selection_posting_regime(),
@@ -74,6 +78,17 @@ class AccountAssetRemove(models.TransientModel):
         "the 'Plus-Value Account' or 'Min-Value Account' ",
     )
     note = fields.Text("Notes")
+    asset_ids = fields.Many2many(
+        comodel_name="account.asset",
+        string="Assets",
+        default=lambda self: self._default_asset_ids(),
+    )
+    multi_asset = fields.Boolean(compute="_compute_multi_asset")
+    group_moves = fields.Boolean(
+        string="One Entry per Journal and Date",
+        help="Post the removal of the assets sharing a journal in one entry "
+        "instead of one entry per asset.",
+    )
 
     @api.constrains("sale_value", "company_id")
     def _check_sale_value(self):
@@ -82,10 +97,45 @@ class AccountAssetRemove(models.TransientModel):
 
     @api.model
     def _default_company_id(self):
+        if self._is_multi_asset_removal():
+            assets = self.env["account.asset"].browse(self._default_asset_ids())
+            return assets.company_id[:1]
         asset_id = self.env.context.get("active_id")
         asset = self.env["account.asset"].browse(asset_id)
         return asset.company_id
 
+    @api.model
+    def _is_multi_asset_removal(self):
+        """Return whether the wizard is opened to remove several assets."""
+        return bool(
+            self.env.context.get("asset_remove_multi")
+            or len(self._default_asset_ids()) > 1
+        )
+
+    @api.model
+    def _default_profile(self):
+        """Return the profile of the removed asset, none when several assets
+        are removed: their accounts then default to those of the profile of
+        each asset, see ``_get_removal_accounts``.
+        """
+        if self._is_multi_asset_removal():
+            return self.env["account.asset.profile"]
+        asset_id = self.env.context.get("active_id")
+        return self.env["account.asset"].browse(asset_id).profile_id
+
+    @api.model
+    def _default_asset_ids(self):
+        if self.env.context.get("active_model", "account.asset") != "account.asset":
+            return []
+        return self.env.context.get("active_ids") or []
+
+    @api.depends("asset_ids")
+    @api.depends_context("asset_remove_multi")
+    def _compute_multi_asset(self):
+        remove_multi = self.env.context.get("asset_remove_multi")
+        for wiz in self:
+            wiz.multi_asset = bool(remove_multi) or len(wiz.asset_ids) > 1
+
     @api.model
     def _default_sale_value(self):
         return self._get_sale()["sale_value"]
@@ -96,44 +146,49 @@ class AccountAssetRemove(models.TransientModel):
 
     def _get_sale(self):
         asset_id = self.env.context.get("active_id")
-        sale_value = 0.0
-        account_sale_id = False
+        assets = self.env["account.asset"].browse(asset_id)
+        return self._get_sales(assets).get(
+            asset_id, {"sale_value": 0.0, "account_sale_id": False}
+        )
+
+    def _get_sales(self, assets):
+        """Return the sale value and account of the assets by asset id,
+        from their customer invoices.
+        """
+        sales = {}
         inv_lines = self.env["account.move.line"].search(
             [
-                ("asset_id", "=", asset_id),
+                ("asset_id", "in", assets.ids),
                 ("move_id.move_type", "in", ("out_invoice", "out_refund")),
             ]
         )
         for line in inv_lines:
+            sale = sales.setdefault(
+                line.asset_id.id, {"sale_value": 0.0, "account_sale_id": False}
+            )
             inv = line.move_id
             comp_curr = inv.currency_id
             inv_curr = inv.currency_id
             if line.move_id.payment_state == "paid" or line.parent_state == "draft":
-                account_sale_id = line.account_id.id
+                sale["account_sale_id"] = line.account_id.id
                 amount_inv_cur = line.price_subtotal
                 amount_comp_cur = inv_curr._convert(
                     amount_inv_cur, comp_curr, inv.company_id, inv.date
                 )
-                sale_value += amount_comp_cur
-        return {"sale_value": sale_value, "account_sale_id": account_sale_id}
+                sale["sale_value"] += amount_comp_cur
+        return sales
 
     @api.model
     def _default_account_plus_value_id(self):
-        asset_id = self.env.context.get("active_id")
-        asset = self.env["account.asset"].browse(asset_id)
-        return asset.profile_id.account_plus_value_id
+        return self._default_profile().account_plus_value_id
 
     @api.model
     def _default_account_min_value_id(self):
-        asset_id = self.env.context.get("active_id")
-        asset = self.env["account.asset"].browse(asset_id)
-        return asset.profile_id.account_min_value_id
+        return self._default_profile().account_min_value_id
 
     @api.model
     def _default_account_residual_value_id(self):
-        asset_id = self.env.context.get("active_id")
-        asset = self.env["account.asset"].browse(asset_id)
-        return asset.profile_id.account_residual_value_id
+        return self._default_profile().account_residual_value_id
 
     @api.model
     def _selection_posting_regime(self):
@@ -144,9 +199,7 @@ class AccountAssetRemove(models.TransientModel):
 
     @api.model
     def _get_posting_regime(self):
-        asset_obj = self.env["account.asset"]
-        asset = asset_obj.browse(self.env.context.get("active_id"))
-        country = asset and asset.company_id.country_id.code or False
+        country = self._default_company_id().country_id.code or False
         if country in self._residual_value_regime_countries():
             return "residual_value"
         else:
@@ -157,6 +210,8 @@ class AccountAssetRemove(models.TransientModel):
 
     def remove(self):
         self.ensure_one()
+        if self.multi_asset:
+            return self._remove_assets(self.asset_ids)
         asset_line_obj = self.env["account.asset.line"]
 
         asset_id = self.env.context.get("active_id")
@@ -237,11 +292,17 @@ class AccountAssetRemove(models.TransientModel):
         """
         Generate last depreciation entry on the day before the removal date.
         """
+        return self._prepare_early_removals(asset)[asset.id]
+
+    def _prepare_early_removals(self, assets):
+        """
+        Generate the last depreciation entries of the assets on the day
+        before the removal date, and return the residual values of the
+        assets by asset id.
+        """
         date_remove = self.date_remove
         asset_line_obj = self.env["account.asset.line"]
 
-        currency = asset.company_id.currency_id
-
         def _dlines(asset):
             lines = asset.depreciation_line_ids
             dlines = lines.filtered(
@@ -252,62 +313,223 @@ class AccountAssetRemove(models.TransientModel):
             dlines = dlines.sorted(key=lambda l: l.line_date)
             return dlines
 
-        dlines = _dlines(asset)
-        if not dlines:
-            asset.compute_depreciation_board()
+        assets.filtered(lambda a: not _dlines(a)).compute_depreciation_board()
+        residual_values = {}
+        lines_to_post = asset_line_obj
+        lines_to_unlink = asset_line_obj
+        for asset in assets:
+            currency = asset.company_id.currency_id
             dlines = _dlines(asset)
-        if not dlines:
-            return asset.value_residual
-        first_to_depreciate_dl = dlines[0]
+            if not dlines:
+                residual_values[asset.id] = asset.value_residual
+                continue
+            first_to_depreciate_dl = dlines[0]
+
+            first_date = first_to_depreciate_dl.line_date
+            if date_remove > first_date:
+                raise UserError(
+                    _(
+                        "You can't make an early removal if all the depreciation "
+                        "lines for previous periods are not posted."
+                    )
+                )
 
-        first_date = first_to_depreciate_dl.line_date
-        if date_remove > first_date:
-            raise UserError(
-                _(
-                    "You can't make an early removal if all the depreciation "
-                    "lines for previous periods are not posted."
+            if first_to_depreciate_dl.previous_id:
+                last_depr_date = first_to_depreciate_dl.previous_id.line_date
+            else:
+                create_dl = asset_line_obj.search(
+                    [("asset_id", "=", asset.id), ("type", "=", "create")]
                 )
+                last_depr_date = create_dl.line_date
+
+            # Never create move.
+            same_month = (
+                last_depr_date.month == first_to_depreciate_dl.line_date.month
+                and 1
+                or 0
             )
 
-        if first_to_depreciate_dl.previous_id:
-            last_depr_date = first_to_depreciate_dl.previous_id.line_date
+            period_number_days = (first_date - last_depr_date).days + same_month
+            new_line_date = date_remove + relativedelta(days=-1)
+            to_depreciate_days = (new_line_date - last_depr_date).days + same_month
+            to_depreciate_amount = currency.round(
+                float(to_depreciate_days)
+                / float(period_number_days)
+                * first_to_depreciate_dl.amount,
+            )
+            residual_values[asset.id] = asset.value_residual - to_depreciate_amount
+            if to_depreciate_amount:
+                update_vals = {
+                    "amount": to_depreciate_amount,
+                    "line_date": new_line_date,
+                    "line_days": to_depreciate_days,
+                }
+                first_to_depreciate_dl.write(update_vals)
+                lines_to_post |= first_to_depreciate_dl
+                dlines -= first_to_depreciate_dl
+            lines_to_unlink |= dlines
+        if len(lines_to_post) > 1:
+            lines_to_post._create_moves_batch()
         else:
-            create_dl = asset_line_obj.search(
-                [("asset_id", "=", asset.id), ("type", "=", "create")]
+            lines_to_post.create_move()
+        lines_to_unlink.unlink()
+        return residual_values
+
+    def _get_removal_dates(self, assets):
+        """Return the date and the number of the posted depreciation lines
+        and the date of the creation line of the assets by asset id, read
+        with one query.
+        """
+        asset_line_obj = self.env["account.asset.line"]
+        asset_line_obj.flush_model(["asset_id", "type", "line_date", "move_check"])
+        self.env.cr.execute(
+            """
+            SELECT asset_id,
+                MAX(line_date) FILTER (WHERE type = 'depreciate' AND move_check),
+                COUNT(*) FILTER (WHERE type = 'depreciate' AND move_check),
+                MIN(line_date) FILTER (WHERE type = 'create')
+            FROM account_asset_line
+            WHERE asset_id IN %s
+            GROUP BY asset_id
+            """,
+            (tuple(assets.ids),),
+        )
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    def _remove_assets(self, assets):
+        """Remove several assets at once.
+
+        The removal is the same as for a single asset, except that the sale
+        value of each asset comes from its customer invoices. The early
+        removal depreciations are posted together and, with
+        ``group_moves``, the removal entries of the assets sharing a
+        journal are aggregated in one entry.
+        """
+        if assets.filtered(lambda a: a.company_id != self.company_id):
+            raise UserError(
+                _("The assets to remove must belong to the company of the wizard.")
             )
-            last_depr_date = create_dl.line_date
+        if assets.filtered(lambda a: a.state not in ("open", "close")):
+            raise UserError(_("Only running or closed assets can be removed."))
 
-        # Never create move.
-        same_month = (
-            last_depr_date.month == first_to_depreciate_dl.line_date.month and 1 or 0
+        residual_values = {
+            asset.id: asset.value_residual
+            for asset in assets
+            if not asset._is_early_removal()
+        }
+        residual_values.update(
+            self._prepare_early_removals(
+                assets.filtered(lambda a: a.id not in residual_values)
+            )
         )
+        removal_dates = self._get_removal_dates(assets)
+        sales = self._get_sales(assets)
+        date_remove = self.force_date or self.date_remove
+
+        move_vals_by_key = {}
+        line_vals_by_key = defaultdict(list)
+        for asset in assets:
+            last_date, posted_count, create_date = removal_dates.get(
+                asset.id, (None, 0, None)
+            )
+            last_date = last_date or create_date
+            if last_date and self.date_remove < last_date:
+                raise UserError(
+                    _(
+                        "The removal date of asset '{asset}' must be after "
+                        "the last depreciation date."
+                    ).format(asset=asset.display_name)
+                )
+            if self.posting_regime == "residual_value":
+                regime_accounts = ["residual_value"]
+            else:
+                regime_accounts = ["plus_value", "min_value"]
+            accounts = self._get_removal_accounts(asset)
+            if not all(accounts[account] for account in regime_accounts):
+                raise UserError(
+                    _(
+                        "The profile of asset '{asset}' has no account for the "
+                        "removal entry policy, set it on the wizard."
+                    ).format(asset=asset.display_name)
+                )
+            line_name = asset._get_depreciation_entry_name(posted_count + 1)
+            journal_id = asset.profile_id.journal_id.id
+            key = journal_id if self.group_moves else asset.id
+            if key not in move_vals_by_key:
+                move_vals_by_key[key] = {
+                    "date": date_remove,
+                    "ref": _("Asset removal") if self.group_moves else line_name,
+                    "journal_id": journal_id,
+                    "narration": self.note,
+                    "line_ids": [],
+                }
+            residual_value = residual_values[asset.id]
+            move_vals_by_key[key]["line_ids"] += self._get_removal_data(
+                asset,
+                residual_value,
+                sale=sales.get(asset.id, {"sale_value": 0.0, "account_sale_id": False}),
+            )
+            line_vals_by_key[key].append(
+                {
+                    "amount": residual_value,
+                    "asset_id": asset.id,
+                    "name": line_name,
+                    "line_date": self.date_remove,
+                    "type": "remove",
+                }
+            )
 
-        period_number_days = (first_date - last_depr_date).days + same_month
-        new_line_date = date_remove + relativedelta(days=-1)
-        to_depreciate_days = (new_line_date - last_depr_date).days + same_month
-        to_depreciate_amount = currency.round(
-            float(to_depreciate_days)
-            / float(period_number_days)
-            * first_to_depreciate_dl.amount,
+        moves = (
+            self.env["account.move"]
+            .with_context(allow_asset=True)
+            .create(list(move_vals_by_key.values()))
         )
-        residual_value = asset.value_residual - to_depreciate_amount
-        if to_depreciate_amount:
-            update_vals = {
-                "amount": to_depreciate_amount,
-                "line_date": new_line_date,
-                "line_days": to_depreciate_days,
-            }
-            first_to_depreciate_dl.write(update_vals)
-            dlines[0].create_move()
-            dlines -= dlines[0]
-        dlines.unlink()
-        return residual_value
+        asset_line_vals_list = []
+        for key, move in zip(move_vals_by_key, moves):
+            for vals in line_vals_by_key[key]:
+                asset_line_vals_list.append(dict(vals, move_id=move.id))
+        self.env["account.asset.line"].create(asset_line_vals_list)
+        assets.write({"state": "removed", "date_remove": self.date_remove})
+
+        return {
+            "name": _("Assets Removal Journal Entries"),
+            "view_mode": "tree,form",
+            "res_model": "account.move",
+            "view_id": False,
+            "type": "ir.actions.act_window",
+            "context": self.env.context,
+            "domain": [("id", "in", moves.ids)],
+        }
 
-    def _get_removal_data(self, asset, residual_value):
+    def _get_removal_accounts(self, asset):
+        """Return the residual value, plus-value and min-value accounts of
+        the removal of the asset: those set on the wizard, those of the
+        profile of the asset otherwise.
+        """
+        profile = asset.profile_id
+        return {
+            "residual_value": self.account_residual_value_id
+            or profile.account_residual_value_id,
+            "plus_value": self.account_plus_value_id or profile.account_plus_value_id,
+            "min_value": self.account_min_value_id or profile.account_min_value_id,
+        }
+
+    def _get_removal_data(self, asset, residual_value, sale=None):
+        """Return the commands of the move lines of the asset removal.
+
+        :param sale: sale value and account of the asset, those of the
+            wizard by default.
+        """
+        if sale is None:
+            sale = {
+                "sale_value": self.sale_value,
+                "account_sale_id": self.account_sale_id.id,
+            }
         move_lines = []
         partner_id = asset.partner_id and asset.partner_id.id or False
         profile = asset.profile_id
         currency = asset.company_id.currency_id
+        accounts = self._get_removal_accounts(asset)
 
         # asset and asset depreciation account reversal
         depr_amount = asset.depreciation_base - residual_value
@@ -338,7 +560,7 @@ class AccountAssetRemove(models.TransientModel):
             if self.posting_regime == "residual_value":
                 move_line_vals = {
                     "name": asset.name,
-                    "account_id": self.account_residual_value_id.id,
+                    "account_id": accounts["residual_value"].id,
                     "analytic_distribution": asset.analytic_distribution,
                     "debit": residual_value,
                     "credit": 0.0,
@@ -347,11 +569,11 @@ class AccountAssetRemove(models.TransientModel):
                 }
                 move_lines.append((0, 0, move_line_vals))
             elif self.posting_regime == "gain_loss_on_sale":
-                if self.sale_value:
-                    sale_value = self.sale_value
+                if sale["sale_value"]:
+                    sale_value = sale["sale_value"]
                     move_line_vals = {
                         "name": asset.name,
-                        "account_id": self.account_sale_id.id,
+                        "account_id": sale["account_sale_id"],
                         "analytic_distribution": asset.analytic_distribution,
                         "debit": sale_value,
                         "credit": 0.0,
@@ -359,12 +581,12 @@ class AccountAssetRemove(models.TransientModel):
                         "asset_id": asset.id,
                     }
                     move_lines.append((0, 0, move_line_vals))
-                balance = self.sale_value - residual_value
+                balance = sale["sale_value"] - residual_value
                 balance_comp = currency.compare_amounts(balance, 0)
                 account_id = (
-                    self.account_plus_value_id.id
+                    accounts["plus_value"].id
                     if balance_comp > 0
-                    else self.account_min_value_id.id
+                    else accounts["min_value"].id
                 )
                 move_line_vals = {
                     "name": asset.name,
@@ -19,6 +19,12 @@ class WizAccountAssetReport(models.TransientModel):
     date_from = fields.Date(string="Start Date", required=True)
     date_to = fields.Date(string="End Date", required=True)
     draft = fields.Boolean(string="Include draft assets")
+    streaming = fields.Boolean(
+        string="Large Report",
+        help="Write the rows of the report to a temporary file as they are "
+        "generated, so that the memory usage does not grow with the number "
+        "of assets.",
+    )
     company_id = fields.Many2one(
         comodel_name="res.company",
         string="Company",
@@ -67,7 +73,11 @@ class WizAccountAssetReport(models.TransientModel):
             "type": "ir.actions.report",
             "report_type": "xlsx",
             "report_name": report_name,
-            "context": dict(self.env.context, report_file=report_file),
+            "context": dict(
+                self.env.context,
+                report_file=report_file,
+                asset_report_streaming=self.streaming,
+            ),
             "data": {"dynamic_report": True},
         }
         return report
@@ -53,7 +53,9 @@ class WizAssetMoveReverse(models.TransientModel):
         reversal = move_reversal.with_context(allow_asset=True).reverse_moves()
         reverse_move = self.env["account.move"].browse(reversal["res_id"])
         reverse_move.action_post()
-        self.line_id.with_context(
-            unlink_from_asset=True
-        ).update_asset_line_after_unlink_move()
+        # a consolidated entry is linked to the lines of several assets
+        for asset_line in move.asset_line_ids:
+            asset_line.with_context(
+                unlink_from_asset=True
+            ).update_asset_line_after_unlink_move()
         return True
@@ -30,6 +30,21 @@ class AccountFiscalYear(models.Model):
         default=lambda self: self.env.company,
     )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Reset the fiscal year index of the companies
+        self.clear_caches()
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if {"date_from", "date_to", "company_id"}.intersection(vals):
+            self.clear_caches()
+        return super().write(vals)
+
+    def unlink(self):
+        self.clear_caches()
+        return super().unlink()
+
     @api.constrains("date_from", "date_to", "company_id")
     def _check_dates(self):
         """Check intersection with existing fiscal years."""
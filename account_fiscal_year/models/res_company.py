@@ -1,13 +1,53 @@
 #  License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from bisect import bisect_right
 from datetime import timedelta
 
-from odoo import models
+from odoo import fields, models, tools
 from odoo.tools import date_utils
 
 
 class ResCompany(models.Model):
     _inherit = "res.company"
 
+    @tools.ormcache("self.id")
+    def _get_fiscal_year_index(self):
+        """Return an interval index of the fiscal years of the company.
+
+        The index is cached until an `account.fiscal.year` record is
+        created, updated or deleted.
+
+        :return: A tuple containing:
+            * The starting dates of the fiscal years, sorted.
+            * The matching `(date_from, date_to, id)` fiscal year intervals.
+        """
+        fiscalyears = (
+            self.env["account.fiscal.year"]
+            .sudo()
+            .search_read(
+                [("company_id", "=", self.id)],
+                ["date_from", "date_to"],
+                order="date_from",
+            )
+        )
+        intervals = tuple(
+            (fiscalyear["date_from"], fiscalyear["date_to"], fiscalyear["id"])
+            for fiscalyear in fiscalyears
+        )
+        return tuple(interval[0] for interval in intervals), intervals
+
+    def _get_fiscal_year_interval(self, current_date):
+        """Find the fiscal year record containing the given date.
+
+        :param current_date: A datetime.date object.
+        :return: A `(date_from, date_to, id)` tuple or None.
+        """
+        self.ensure_one()
+        date_froms, intervals = self._get_fiscal_year_index()
+        index = bisect_right(date_froms, current_date) - 1
+        if index >= 0 and intervals[index][1] >= current_date:
+            return intervals[index]
+        return None
+
     def compute_fiscalyear_dates(self, current_date):
         """Computes the start and end dates of the fiscal year
         where the given 'date' belongs to.
@@ -21,19 +61,12 @@ class ResCompany(models.Model):
         self.ensure_one()
 
         # Search a fiscal year record containing the date.
-        fiscalyear = self.env["account.fiscal.year"].search(
-            [
-                ("company_id", "=", self.id),
-                ("date_from", "<=", current_date),
-                ("date_to", ">=", current_date),
-            ],
-            limit=1,
-        )
+        fiscalyear = self._get_fiscal_year_interval(fields.Date.to_date(current_date))
         if fiscalyear:
             return {
-                "date_from": fiscalyear.date_from,
-                "date_to": fiscalyear.date_to,
-                "record": fiscalyear,
+                "date_from": fiscalyear[0],
+                "date_to": fiscalyear[1],
+                "record": self.env["account.fiscal.year"].browse(fiscalyear[2]),
             }
 
         date_from, date_to = date_utils.get_fiscal_year(
@@ -51,27 +84,13 @@ class ResCompany(models.Model):
         # =>
         # The period 2017-02-02 - 2017-02-30 is not covered by a fiscal year record.
 
-        fiscalyear_from = self.env["account.fiscal.year"].search(
-            [
-                ("company_id", "=", self.id),
-                ("date_from", "<=", date_from),
-                ("date_to", ">=", date_from),
-            ],
-            limit=1,
-        )
+        fiscalyear_from = self._get_fiscal_year_interval(fields.Date.to_date(date_from))
         if fiscalyear_from:
-            date_from = fiscalyear_from.date_to + timedelta(days=1)
-
-        fiscalyear_to = self.env["account.fiscal.year"].search(
-            [
-                ("company_id", "=", self.id),
-                ("date_from", "<=", date_to),
-                ("date_to", ">=", date_to),
-            ],
-            limit=1,
-        )
+            date_from = fiscalyear_from[1] + timedelta(days=1)
+
+        fiscalyear_to = self._get_fiscal_year_interval(fields.Date.to_date(date_to))
         if fiscalyear_to:
-            date_to = fiscalyear_to.date_from - timedelta(days=1)
+            date_to = fiscalyear_to[0] - timedelta(days=1)
 
         return {
             "date_from": date_from,
@@ -130,3 +130,50 @@ class TestFiscalPosition(common.TransactionCase):
             "2017-06-01",
             "2017-09-30",
         )
+
+    def test_fiscal_year_index(self):
+        """The fiscal years lookup follows the changes on fiscal years."""
+        company = self.env.ref("base.main_company")
+        company.fiscalyear_last_day = 31
+        company.fiscalyear_last_month = "12"
+        fiscal_year = self.env["account.fiscal.year"].create(
+            {
+                "name": "6 month 2017",
+                "date_from": "2017-01-01",
+                "date_to": "2017-05-31",
+                "company_id": company.id,
+            }
+        )
+        self.check_compute_fiscal_year(
+            company,
+            "2017-02-01",
+            "2017-01-01",
+            "2017-05-31",
+        )
+        self.check_compute_fiscal_year(
+            company,
+            "2017-09-01",
+            "2017-06-01",
+            "2017-12-31",
+        )
+        # Once loaded, the fiscal years are looked up without any query
+        with self.assertQueryCount(0):
+            res = company.compute_fiscalyear_dates(fields.Date.to_date("2017-03-01"))
+            company.compute_fiscalyear_dates(fields.Date.to_date("2017-09-01"))
+        self.assertEqual(res["record"], fiscal_year)
+
+        fiscal_year.date_to = "2017-03-31"
+        self.check_compute_fiscal_year(
+            company,
+            "2017-05-01",
+            "2017-04-01",
+            "2017-12-31",
+        )
+
+        fiscal_year.unlink()
+        self.check_compute_fiscal_year(
+            company,
+            "2017-02-01",
+            "2017-01-01",
+            "2017-12-31",
+        )